@@ -0,0 +1,91 @@
+pragma solidity ^0.5.17;
+pragma experimental ABIEncoderV2;
+
+import "./Openzeppelin/Ownable.sol";
+
+/**
+ * @title A contract to execute a list of calls in a single transaction.
+ * @author Franklin Richards - powerhousefrank@protonmail.com
+ * @notice You can use this contract to run the admin operations of Origins and Locked Fund atomically.
+ * @dev The contract has to be an owner/verifier of Origins and/or an admin of Locked Fund for those calls to succeed,
+ * as it will be the `msg.sender` of every call. If any call fails, the whole batch is reverted.
+ */
+contract BatchExecutor is Ownable {
+	/* Events */
+
+	/**
+	 * @notice Emitted when a batch is executed.
+	 * @param _initiator The address which initiated this event to be emitted.
+	 * @param _callCount The number of calls executed.
+	 */
+	event BatchExecuted(address indexed _initiator, uint256 _callCount);
+
+	/* Functions */
+
+	/**
+	 * @notice Fallback function to receive RBTC, for example proceeds withdrawn to this contract.
+	 */
+	function() external payable {}
+
+	/**
+	 * @notice Executes the calls in order, reverting all of them if any one fails.
+	 * @param _targets The contract addresses to be called.
+	 * @param _values The RBTC values to be sent with each call.
+	 * @param _data The calldata of each call.
+	 * @return _results The return data of each call.
+	 * @dev Only callable by the owner. The revert reason of a failing call is passed on.
+	 */
+	function executeBatch(
+		address[] calldata _targets,
+		uint256[] calldata _values,
+		bytes[] calldata _data
+	) external payable onlyOwner returns (bytes[] memory _results) {
+		_results = _executeBatch(_targets, _values, _data);
+	}
+
+	/**
+	 * @notice Transfers RBTC held by this contract.
+	 * @param _receiver The address which receives the RBTC.
+	 * @param _amount The amount of RBTC to be transferred.
+	 * @dev Only callable by the owner.
+	 */
+	function withdraw(address payable _receiver, uint256 _amount) external onlyOwner {
+		require(_receiver != address(0), "BatchExecutor: Receiver Address cannot be zero.");
+		_receiver.transfer(_amount);
+	}
+
+	/* Internal Functions */
+
+	/**
+	 * @notice Internal function to execute the calls in order.
+	 * @param _targets The contract addresses to be called.
+	 * @param _values The RBTC values to be sent with each call.
+	 * @param _data The calldata of each call.
+	 * @return _results The return data of each call.
+	 */
+	function _executeBatch(
+		address[] memory _targets,
+		uint256[] memory _values,
+		bytes[] memory _data
+	) internal returns (bytes[] memory _results) {
+		require(_targets.length != 0, "BatchExecutor: No calls to execute.");
+		require(_targets.length == _values.length && _targets.length == _data.length, "BatchExecutor: Array lengths do not match.");
+
+		_results = new bytes[](_targets.length);
+		for (uint256 index = 0; index < _targets.length; index++) {
+			require(_targets[index] != address(0), "BatchExecutor: Target Address cannot be zero.");
+			(bool success, bytes memory returnData) = _targets[index].call.value(_values[index])(_data[index]);
+			if (!success) {
+				if (returnData.length > 0) {
+					assembly {
+						revert(add(returnData, 32), mload(returnData))
+					}
+				}
+				revert("BatchExecutor: Call failed.");
+			}
+			_results[index] = returnData;
+		}
+
+		emit BatchExecuted(msg.sender, _targets.length);
+	}
+}
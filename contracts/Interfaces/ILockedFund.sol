@@ -52,6 +52,25 @@ contract ILockedFund {
 		uint256 _unlockedOrWaited
 	) public;
 
+	/**
+	 * @notice Adds Token to the user balance of many users (Vested and Waited Unlocked Balance based on `_basisPoints`).
+	 * @param _userAddresses The users whose locked balances have to be updated.
+	 * @param _amounts The amounts of Token to be added to the locked and/or unlocked balance of each user.
+	 * @param _cliffs The cliff for vesting of each user.
+	 * @param _durations The duration for vesting of each user.
+	 * @param _basisPoints The % (in Basis Point) which determines how much will be (waited) unlocked immediately for each user.
+	 * @param _unlockedOrWaited Determines if the Basis Points determine the Unlocked or Waited Unlock Balance.
+	 * @dev The total amount is transferred from the caller at once.
+	 */
+	function depositVestedMultiple(
+		address[] memory _userAddresses,
+		uint256[] memory _amounts,
+		uint256[] memory _cliffs,
+		uint256[] memory _durations,
+		uint256[] memory _basisPoints,
+		uint256 _unlockedOrWaited
+	) public;
+
 	/**
 	 * @notice Adds Token to the user balance (Locked and Waited Unlocked Balance based on `_basisPoint`).
 	 * @param _userAddress The user whose locked balance has to be updated with `_amount`.
@@ -246,6 +246,27 @@ contract LockedFund is ILockedFund {
 		_depositVested(_userAddress, _amount, _cliff, _duration, _basisPoint, UnlockType(_unlockedOrWaited));
 	}
 
+	/**
+	 * @notice Adds Token to the user balance of many users (Vested and Waited Unlocked Balance based on `_basisPoints`).
+	 * @param _userAddresses The users whose locked balances have to be updated.
+	 * @param _amounts The amounts of Token to be added to the locked and/or unlocked balance of each user.
+	 * @param _cliffs The cliff for vesting of each user.
+	 * @param _durations The duration for vesting of each user.
+	 * @param _basisPoints The % (in Basis Point) which determines how much will be (waited) unlocked immediately for each user.
+	 * @param _unlockedOrWaited Determines if the Basis Points determine the Unlocked or Waited Unlock Balance.
+	 * @dev The total amount is transferred from the caller at once.
+	 */
+	function depositVestedMultiple(
+		address[] memory _userAddresses,
+		uint256[] memory _amounts,
+		uint256[] memory _cliffs,
+		uint256[] memory _durations,
+		uint256[] memory _basisPoints,
+		uint256 _unlockedOrWaited
+	) public onlyAdmin {
+		_depositVestedMultiple(_userAddresses, _amounts, _cliffs, _durations, _basisPoints, UnlockType(_unlockedOrWaited));
+	}
+
 	/**
 	 * @notice Adds Token to the user balance (Locked and Waited Unlocked Balance based on `_basisPoint`).
 	 * @param _userAddress The user whose locked balance has to be updated with `_amount`.
@@ -412,6 +433,73 @@ contract LockedFund is ILockedFund {
 		bool txStatus = token.transferFrom(msg.sender, address(this), _amount);
 		require(txStatus, "LockedFund: Token transfer was not successful. Check receiver address.");
 
+		_addVestedBalance(_userAddress, _amount, _cliff, _duration, _basisPoint, _unlockedOrWaited);
+	}
+
+	/**
+	 * @notice Internal function to add Token to the user balance for many users, with a single token transfer of the total amount.
+	 * @param _userAddresses The users whose locked balances have to be updated.
+	 * @param _amounts The amounts of Token to be added to the locked and/or unlocked balance of each user.
+	 * @param _cliffs The cliff for vesting of each user.
+	 * @param _durations The duration for vesting of each user.
+	 * @param _basisPoints The % (in Basis Point) which determines how much will be (waited) unlocked immediately for each user.
+	 * @param _unlockedOrWaited Determines if the Basis Point determines the Unlocked or Waited Unlock Balance.
+	 */
+	function _depositVestedMultiple(
+		address[] memory _userAddresses,
+		uint256[] memory _amounts,
+		uint256[] memory _cliffs,
+		uint256[] memory _durations,
+		uint256[] memory _basisPoints,
+		UnlockType _unlockedOrWaited
+	) internal {
+		require(
+			_userAddresses.length == _amounts.length &&
+				_userAddresses.length == _cliffs.length &&
+				_userAddresses.length == _durations.length &&
+				_userAddresses.length == _basisPoints.length,
+			"LockedFund: Array lengths do not match."
+		);
+
+		uint256 totalAmount;
+		for (uint256 index = 0; index < _userAddresses.length; index++) {
+			require(_durations[index] != 0, "LockedFund: Duration cannot be zero.");
+			require(_durations[index] <= MAX_DURATION, "LockedFund: Duration is too long.");
+			require(_basisPoints[index] < MAX_BASIS_POINT, "LockedFund: Basis Point has to be less than 10000.");
+
+			_addVestedBalance(
+				_userAddresses[index],
+				_amounts[index],
+				_cliffs[index],
+				_durations[index],
+				_basisPoints[index],
+				_unlockedOrWaited
+			);
+			totalAmount = totalAmount.add(_amounts[index]);
+		}
+
+		bool txStatus = token.transferFrom(msg.sender, address(this), totalAmount);
+		require(txStatus, "LockedFund: Token transfer was not successful. Check receiver address.");
+	}
+
+	/**
+	 * @notice Internal function to update the user balance (Vested and Waited Unlocked Balance based on `_basisPoint`).
+	 * @param _userAddress The user whose locked balance has to be updated with `_amount`.
+	 * @param _amount The amount of Token to be added to the locked and/or unlocked balance.
+	 * @param _cliff The cliff for vesting.
+	 * @param _duration The duration for vesting.
+	 * @param _basisPoint The % (in Basis Point) which determines how much will be (waited) unlocked immediately.
+	 * @param _unlockedOrWaited Determines if the Basis Point determines the Unlocked or Waited Unlock Balance.
+	 */
+	function _addVestedBalance(
+		address _userAddress,
+		uint256 _amount,
+		uint256 _cliff,
+		uint256 _duration,
+		uint256 _basisPoint,
+		UnlockType _unlockedOrWaited
+	) internal {
+		/// @dev The Token is transferred by the caller.
 		uint256 unlockedBal = _amount.mul(_basisPoint).div(MAX_BASIS_POINT);
 
 		if (_unlockedOrWaited == UnlockType.Immediate) {
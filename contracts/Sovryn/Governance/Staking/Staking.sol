@@ -696,6 +696,101 @@ contract Staking is IStaking, WeightedStaking, ApprovalReceiver {
 		}
 	}
 
+	/**
+	 * @notice Get the stakes of a user account on the lock dates within a range.
+	 * @dev Unlike getStakes, only the lock dates of the range are read, so the cost
+	 * does not grow with the time passed since kickoff. Empty lock dates are included.
+	 * @param account The address to get stakes.
+	 * @param from The start of the range, rounded up to a lock date.
+	 * @param to The end of the range, capped at the latest possible lock date.
+	 * @return The arrays of dates and stakes.
+	 * */
+	function getStakesInRange(
+		address account,
+		uint256 from,
+		uint256 to
+	) public view returns (uint256[] memory dates, uint96[] memory stakes) {
+		uint256 first = _firstLockDateFrom(from);
+		uint256 last = timestampToLockDate(block.timestamp + MAX_DURATION);
+		if (to < last) {
+			last = to < first ? 0 : timestampToLockDate(to);
+		}
+
+		uint256 count = last >= first ? (last - first) / TWO_WEEKS + 1 : 0;
+		dates = new uint256[](count);
+		stakes = new uint96[](count);
+		for (uint256 j = 0; j < count; j++) {
+			dates[j] = first + j * TWO_WEEKS;
+			stakes[j] = currentBalance(account, dates[j]);
+		}
+	}
+
+	/**
+	 * @notice Get the non-empty stakes of a user account, reading at most a given number of lock dates.
+	 * @dev To page through all the stakes, start with `from` as 0 and continue with the
+	 * returned `next` until it is 0.
+	 * @param account The address to get stakes.
+	 * @param from The date to start at, rounded up to a lock date.
+	 * @param maxDates The maximum number of lock dates to read.
+	 * @return The arrays of dates and non-empty stakes, and the lock date to continue at (0 if none is left).
+	 * */
+	function getNonEmptyStakes(
+		address account,
+		uint256 from,
+		uint256 maxDates
+	)
+		public
+		view
+		returns (
+			uint256[] memory dates,
+			uint96[] memory stakes,
+			uint256 next
+		)
+	{
+		require(maxDates > 0, "Staking::getNonEmptyStakes: maxDates should be positive");
+		uint256 first = _firstLockDateFrom(from);
+		uint256 latest = timestampToLockDate(block.timestamp + MAX_DURATION);
+		uint256 count = latest >= first ? (latest - first) / TWO_WEEKS + 1 : 0;
+		if (count > maxDates) {
+			count = maxDates;
+			next = first + maxDates * TWO_WEEKS;
+		}
+
+		dates = new uint256[](count);
+		stakes = new uint96[](count);
+		uint256 found = 0;
+		for (uint256 j = 0; j < count; j++) {
+			uint256 date = first + j * TWO_WEEKS;
+			uint96 balance = currentBalance(account, date);
+			if (balance > 0) {
+				dates[found] = date;
+				stakes[found] = balance;
+				found++;
+			}
+		}
+
+		/// @dev Shortens the arrays to the stakes found, in place.
+		assembly {
+			mstore(dates, found)
+			mstore(stakes, found)
+		}
+	}
+
+	/**
+	 * @notice Get the first lock date at or after a timestamp.
+	 * @param from The timestamp.
+	 * @return The lock date, not before the first possible stake date after deployment.
+	 * */
+	function _firstLockDateFrom(uint256 from) internal view returns (uint256 lockDate) {
+		lockDate = kickoffTS + TWO_WEEKS;
+		if (from > lockDate) {
+			lockDate = timestampToLockDate(from);
+			if (lockDate < from) {
+				lockDate += TWO_WEEKS;
+			}
+		}
+	}
+
 	/**
 	 * @notice Overrides default ApprovalReceiver._getToken function to
 	 * register SOV token on this contract.
@@ -0,0 +1,340 @@
+from brownie import *
+from decimal import Decimal, InvalidOperation
+from web3.exceptions import TimeExhausted, TransactionNotFound
+
+import os
+import csv
+import json
+import time
+import random
+import hashlib
+
+resultDir = './build/allocations'
+# The gas limit of one deposit, chunks are sized to stay below it (the block gas limit of RSK is 6.8 million).
+gasLimit = int(os.environ.get('ALLOCATION_GAS_LIMIT', 6000000))
+# Sent as gas limit on top of the estimate of a chunk.
+gasMargin = float(os.environ.get('ALLOCATION_GAS_MARGIN', 1.2))
+firstChunk = int(os.environ.get('ALLOCATION_FIRST_CHUNK', 20))
+maxChunk = int(os.environ.get('ALLOCATION_MAX_CHUNK', 250))
+# Chunks sent before waiting for the oldest one to be mined.
+pipelineDepth = int(os.environ.get('ALLOCATION_PIPELINE', 4))
+receiptTimeout = int(os.environ.get('ALLOCATION_RECEIPT_TIMEOUT', 600))
+# 1 for Immediate, 2 for Waited, what the basis points of the CSV unlock.
+unlockType = int(os.environ.get('ALLOCATION_UNLOCK_TYPE', 2))
+
+# The limits of LockedFund.
+maxDuration = 36
+maxBasisPoint = 10000
+
+def main():
+    loadConfig()
+    path = os.environ.get('ALLOCATION_CSV') or input("Enter the path of the allocation CSV: ")
+    lockedFund = Contract.from_abi("LockedFund", address=values['lockedFund'], abi=LockedFund.abi, owner=acct)
+    token = Contract.from_abi("Token", address=values['token'], abi=Token.abi, owner=acct)
+    importer = AllocationImporter(lockedFund, token, int(values['decimal']), path, thisNetwork, acct)
+    importer.run()
+    importer.printSummary()
+
+# =========================================================================================================================================
+def loadConfig():
+    global values, acct, thisNetwork
+    thisNetwork = network.show_active()
+
+    if thisNetwork == "development":
+        acct = accounts[0]
+        configFile = open('./scripts/origins/values/development.json')
+    elif thisNetwork == "testnet" or thisNetwork == "testnet-ws":
+        acct = accounts.load("rskdeployer")
+        configFile = open('./scripts/origins/values/testnet.json')
+    elif thisNetwork == "rsk-testnet":
+        acct = accounts.load("rskdeployer")
+        configFile = open('./scripts/origins/values/testnet.json')
+    elif thisNetwork == "rsk-mainnet":
+        acct = accounts.load("rskdeployer")
+        configFile = open('./scripts/origins/values/mainnet.json')
+    else:
+        raise Exception("Network not supported.")
+
+    # Load deployment parameters and contracts addresses
+    values = json.load(configFile)
+
+# =========================================================================================================================================
+def readAllocations(path, decimal):
+    # Streams the (index, address, amount, cliff, duration, basis point) allocations of the CSV, amounts in token units
+    # (converted with `decimal`), cliff and duration in 4 week intervals. A header line is skipped.
+    with open(path, newline='') as fileHandle:
+        index = 0
+        for lineNumber, row in enumerate(csv.reader(fileHandle), start=1):
+            if len(row) == 0 or (lineNumber == 1 and not row[0].strip().startswith('0x')):
+                continue
+            try:
+                address = web3.toChecksumAddress(row[0].strip())
+                amount = Decimal(row[1].strip()) * (10 ** decimal)
+                cliff, duration, basisPoint = int(row[2]), int(row[3]), int(row[4])
+            except (ValueError, IndexError, InvalidOperation):
+                raise Exception("Line " + str(lineNumber) + " of " + path + " is not (address, amount, cliff, duration, basis point).")
+            if amount <= 0 or amount != amount.to_integral_value():
+                raise Exception("Line " + str(lineNumber) + " has an amount which is not a positive number of the smallest unit.")
+            if duration == 0 or duration > maxDuration or cliff > duration or basisPoint < 0 or basisPoint >= maxBasisPoint:
+                raise Exception("Line " + str(lineNumber) + " has a cliff, duration or basis point LockedFund does not take.")
+            yield (index, address, int(amount), cliff, duration, basisPoint)
+            index += 1
+
+# =========================================================================================================================================
+class AllocationImporter:
+    # `[NETWORK]-[CSV].json` is the checkpoint of an import: the chunks sent so far with their rows, nonce, transaction
+    # and status. It is written before a chunk is sent and again once it is sent or mined, so a run which stops at any
+    # point can tell which rows are deposited, and continues with the others.
+
+    def __init__(self, lockedFund, token, decimal, path, networkName, sender):
+        self.lockedFund = lockedFund
+        self.token = token
+        self.decimal = decimal
+        self.path = path
+        self.sender = sender
+        os.makedirs(resultDir, exist_ok=True)
+        with open(path, 'rb') as fileHandle:
+            digest = hashlib.sha256(fileHandle.read()).hexdigest()
+        self.checkpointPath = os.path.join(resultDir, networkName + '-' + os.path.splitext(os.path.basename(path))[0] + '.json')
+        self.checkpoint = {'csv': digest, 'chunks': []}
+        if os.path.exists(self.checkpointPath):
+            with open(self.checkpointPath) as fileHandle:
+                self.checkpoint = json.load(fileHandle)
+            if self.checkpoint['csv'] != digest:
+                raise Exception("The CSV changed since the last run, remove " + self.checkpointPath + " to start over.")
+        self.size = firstChunk
+        self.nonce = None
+        self.inFlight = []
+        self.timeBefore = None
+        self.timeAfter = None
+
+    def writeCheckpoint(self):
+        with open(self.checkpointPath + '.tmp', "w") as fileHandle:
+            json.dump(self.checkpoint, fileHandle, indent=1)
+        os.replace(self.checkpointPath + '.tmp', self.checkpointPath)
+
+    def deposited(self):
+        rows = set()
+        for chunk in self.checkpoint['chunks']:
+            if chunk['status'] == 'mined':
+                rows.update(range(chunk['start'], chunk['end']))
+        return rows
+
+    def settle(self, chunk):
+        # Waits for a sent chunk, and records whether its deposit was mined or reverted.
+        receipt = web3.eth.wait_for_transaction_receipt(chunk['txid'], timeout=receiptTimeout)
+        chunk['status'] = 'mined' if receipt.status == 1 else 'reverted'
+        chunk['gasUsed'] = receipt.gasUsed
+        self.writeCheckpoint()
+        print("Rows", chunk['start'], "to", chunk['end'] - 1, chunk['status'], "in block", receipt.blockNumber)
+
+    def settleReplaced(self, chunk):
+        # A sent chunk without a receipt after `receiptTimeout`. Once its nonce is used by a mined transaction and it still
+        # has no receipt, it was replaced (or dropped and the nonce reused), and its rows are sent again.
+        if web3.eth.get_transaction_count(self.sender.address, 'latest') <= chunk['nonce']:
+            raise Exception("The transaction " + chunk['txid'] + " of rows " + str(chunk['start']) + " to " + str(chunk['end'] - 1) + " is not mined yet, run again later.")
+        try:
+            web3.eth.get_transaction_receipt(chunk['txid'])
+        except TransactionNotFound:
+            chunk['status'] = 'dropped'
+            self.writeCheckpoint()
+            print("Rows", chunk['start'], "to", chunk['end'] - 1, "were replaced by another transaction with nonce", chunk['nonce'], "and are sent again.")
+            return
+        self.settle(chunk)
+
+    def recover(self):
+        # Chunks a previous run left behind: a sent one is waited for. One which was about to be sent has no transaction,
+        # and is dropped if its nonce is still unused, which the pending transaction count tells.
+        for chunk in self.checkpoint['chunks']:
+            if chunk['status'] == 'sent':
+                try:
+                    self.settle(chunk)
+                except TimeExhausted:
+                    self.settleReplaced(chunk)
+            elif chunk['status'] == 'sending':
+                if web3.eth.get_transaction_count(self.sender.address, 'pending') > chunk['nonce']:
+                    raise Exception("Nonce " + str(chunk['nonce']) + " was used, check whether rows " + str(chunk['start']) + " to " + str(chunk['end'] - 1) + " were deposited.")
+                chunk['status'] = 'dropped'
+                self.writeCheckpoint()
+        # Rows of a reverted chunk are not deposited, so they are sent again in this run.
+        for chunk in self.checkpoint['chunks']:
+            if chunk['status'] == 'reverted':
+                chunk['status'] = 'failed'
+        self.writeCheckpoint()
+
+    def approve(self, amount):
+        if self.token.allowance(self.sender, self.lockedFund) < amount:
+            self.token.approve(self.lockedFund, amount, {'from': self.sender})
+
+    def fit(self, rows):
+        # The longest prefix of `rows` whose estimate with the margin fits in `gasLimit`. The next chunk is sized by
+        # the gas per allocation of this one.
+        while True:
+            args = [list(column) for column in zip(*rows)][1:] + [unlockType]
+            estimate = self.lockedFund.depositVestedMultiple.estimate_gas(*args, {'from': self.sender})
+            if estimate * gasMargin <= gasLimit or len(rows) == 1:
+                break
+            rows = rows[:max(1, int(len(rows) * gasLimit / (estimate * gasMargin)))]
+        self.size = max(1, min(maxChunk, int(len(rows) * gasLimit / (estimate * gasMargin))))
+        return rows, args, estimate
+
+    def send(self, rows):
+        # Sends the first chunk of `rows`, which have to be contiguous, and returns how many rows it took.
+        rows, args, estimate = self.fit(rows)
+        record = {'start': rows[0][0], 'end': rows[-1][0] + 1, 'nonce': self.nonce, 'estimate': estimate, 'status': 'sending'}
+        self.checkpoint['chunks'].append(record)
+        self.writeCheckpoint()
+
+        # Nonces are assigned locally, so the next chunk is sent without waiting for this one to be mined.
+        tx = self.lockedFund.depositVestedMultiple(*args, {'from': self.sender, 'nonce': self.nonce, 'gas_limit': int(estimate * gasMargin), 'required_confs': 0})
+        self.nonce += 1
+        record['txid'] = tx.txid
+        record['status'] = 'sent'
+        self.writeCheckpoint()
+        self.inFlight.append(record)
+        print("Sent rows", record['start'], "to", record['end'] - 1, "in", tx.txid, "with nonce", record['nonce'])
+
+        while len(self.inFlight) >= pipelineDepth:
+            self.settle(self.inFlight.pop(0))
+        return len(rows)
+
+    def reverted(self):
+        return [chunk for chunk in self.checkpoint['chunks'] if chunk['status'] == 'reverted']
+
+    def run(self):
+        if not self.lockedFund.isAdmin(self.sender):
+            raise Exception("Account " + str(self.sender) + " is not an admin of LockedFund.")
+        self.recover()
+        deposited = self.deposited()
+
+        # A first pass checks every line and sums up what is left to deposit, which is approved at once.
+        remaining = [0, 0]
+        for index, address, amount, cliff, duration, basisPoint in readAllocations(self.path, self.decimal):
+            if index not in deposited:
+                remaining[0] += 1
+                remaining[1] += amount
+        if remaining[0] == 0:
+            print("All allocations of", self.path, "are deposited.")
+            return
+        print("Depositing", remaining[0], "allocations with a total of", remaining[1], "(smallest unit).")
+        self.approve(remaining[1])
+
+        # The second pass keeps no more than a chunk of rows. A chunk ends at a row which was deposited before.
+        self.timeBefore = time.time()
+        self.nonce = self.sender.nonce
+        buffer = []
+        for allocation in readAllocations(self.path, self.decimal):
+            if len(self.reverted()) > 0:
+                break
+            if allocation[0] in deposited:
+                while len(buffer) > 0:
+                    buffer = buffer[self.send(buffer):]
+                continue
+            buffer.append(allocation)
+            while len(buffer) >= self.size:
+                buffer = buffer[self.send(buffer[:self.size]):]
+        while len(buffer) > 0 and len(self.reverted()) == 0:
+            buffer = buffer[self.send(buffer):]
+
+        while len(self.inFlight) > 0:
+            self.settle(self.inFlight.pop(0))
+        self.timeAfter = time.time()
+        if len(self.reverted()) > 0:
+            failed = self.reverted()[0]
+            raise Exception("The deposit of rows " + str(failed['start']) + " to " + str(failed['end'] - 1) + " reverted, check why and run again to send its rows again.")
+
+    def printSummary(self):
+        chunks = [chunk for chunk in self.checkpoint['chunks'] if chunk['status'] == 'mined']
+        rows = sum(chunk['end'] - chunk['start'] for chunk in chunks)
+        gasUsed = sum(chunk['gasUsed'] for chunk in chunks)
+        print("\n=============================================================")
+        print("Allocation Import of", self.path)
+        print("=============================================================")
+        print("Allocations Deposited:       ", rows)
+        print("Transactions:                ", len(chunks))
+        print("Gas Used:                    ", gasUsed)
+        print("Gas per Allocation:          ", gasUsed // rows if rows > 0 else 0)
+        if self.timeBefore is not None:
+            print("Time:                        ", round(self.timeAfter - self.timeBefore, 2), "seconds")
+        print("Checkpoint:                  ", self.checkpointPath)
+        print("=============================================================")
+
+# =========================================================================================================================================
+def benchmark():
+    # Deposits `ALLOCATION_BENCHMARK_USERS` (100) random allocations on the fixture with `depositVested`, one user per
+    # transaction, and with `depositVestedMultiple` in chunks of `ALLOCATION_BENCHMARK_CHUNKS` (10,50,100), then imports
+    # a generated CSV of the same size and checks the balances of its users.
+    global acct
+    from scripts.origins import fixtureCache
+
+    loadConfig()
+    if thisNetwork != "development":
+        raise Exception("Benchmark is only supported on development.")
+    fixtureCache.loadConfig()
+    fixtureValues = fixtureCache.loadFixture()
+    acct = fixtureCache.acct
+    generator = random.Random(int(os.environ.get('ALLOCATION_SEED', 1)))
+    lockedFund = Contract.from_abi("LockedFund", address=fixtureValues['lockedFund'], abi=LockedFund.abi, owner=acct)
+    token = Contract.from_abi("Token", address=fixtureValues['token'], abi=Token.abi, owner=acct)
+    decimal = int(fixtureValues['decimal'])
+
+    userCount = int(os.environ.get('ALLOCATION_BENCHMARK_USERS', 100))
+    chunkSizes = [int(size) for size in os.environ.get('ALLOCATION_BENCHMARK_CHUNKS', '10,50,100').split(',')]
+
+    def allocations():
+        return [
+            (web3.toChecksumAddress('0x' + generator.getrandbits(160).to_bytes(20, 'big').hex()), generator.randint(1, 1000) * (10 ** decimal), 1, generator.randint(1, 12), generator.choice([0, 2000, 5000]))
+            for index in range(userCount)
+        ]
+
+    results = []
+    try:
+        rows = allocations()
+        token.approve(lockedFund, sum(row[1] for row in rows))
+        timeBefore = time.time()
+        gasUsed = sum(lockedFund.depositVested(*row, unlockType).gas_used for row in rows)
+        results.append(("depositVested", userCount, gasUsed, time.time() - timeBefore))
+
+        for size in chunkSizes:
+            rows = allocations()
+            token.approve(lockedFund, sum(row[1] for row in rows))
+            timeBefore = time.time()
+            gasUsed = 0
+            for start in range(0, userCount, size):
+                chunk = rows[start:start + size]
+                gasUsed += lockedFund.depositVestedMultiple(*[list(column) for column in zip(*chunk)], unlockType).gas_used
+            results.append(("depositVestedMultiple " + str(size), (userCount + size - 1) // size, gasUsed, time.time() - timeBefore))
+
+        # The importer on a generated CSV, amounts in token units.
+        rows = allocations()
+        os.makedirs(resultDir, exist_ok=True)
+        path = os.path.join(resultDir, 'benchmark.csv')
+        with open(path, 'w', newline='') as fileHandle:
+            writer = csv.writer(fileHandle)
+            writer.writerow(['address', 'amount', 'cliff', 'duration', 'basisPoint'])
+            for address, amount, cliff, duration, basisPoint in rows:
+                writer.writerow([address, amount // (10 ** decimal), cliff, duration, basisPoint])
+        checkpointPath = os.path.join(resultDir, thisNetwork + '-benchmark.json')
+        if os.path.exists(checkpointPath):
+            os.remove(checkpointPath)
+        importer = AllocationImporter(lockedFund, token, decimal, path, thisNetwork, acct)
+        importer.run()
+        # The unlocked part goes to the unlocked balance with `Immediate`, to the waited unlocked one with `Waited`.
+        unlockedBalance = lockedFund.getUnlockedBalance if unlockType == 1 else lockedFund.getWaitedUnlockedBalance
+        for address, amount, cliff, duration, basisPoint in rows:
+            unlocked = amount * basisPoint // maxBasisPoint
+            if lockedFund.getVestedBalance(address) != amount - unlocked or unlockedBalance(address) != unlocked:
+                raise Exception("The balances of " + address + " do not match the CSV.")
+    finally:
+        fixtureCache.revertToFixture()
+
+    importer.printSummary()
+    single = results[0][2] / userCount
+    print("\n=============================================================")
+    print("Deposits of", userCount, "Allocations")
+    print("=============================================================")
+    print("Path".ljust(26), "Txs".rjust(5), "Gas Used".rjust(11), "Gas/Alloc".rjust(10), "Saved".rjust(7), "Seconds".rjust(8))
+    for name, transactions, gasUsed, seconds in results:
+        perAllocation = gasUsed / userCount
+        print(name.ljust(26), str(transactions).rjust(5), str(gasUsed).rjust(11), str(int(perAllocation)).rjust(10), (str(round(100 * (1 - perAllocation / single), 1)) + "%").rjust(7), str(round(seconds, 2)).rjust(8))
+    print("=============================================================")
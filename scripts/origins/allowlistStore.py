@@ -0,0 +1,411 @@
+from brownie import *
+from scripts.origins.rpcBatch import selector, encodeArgs, concurrentCalls
+
+import os
+import csv
+import mmap
+import json
+import struct
+
+storeDir = os.environ.get('ALLOWLIST_STORE', './build/allowlist')
+# Pending (appended but not yet merged) addresses are merged into the sorted file once there are this many.
+compactThreshold = 10000
+verifyBatchSize = int(os.environ.get('ALLOWLIST_BATCH_SIZE', 100))
+# Addresses whose approval is read from Origins per round of JSON-RPC batches.
+syncChunkSize = 10000
+
+headerFormat = '<4sIQ'
+headerSize = struct.calcsize(headerFormat)
+magic = b'OALS'
+recordSize = 20
+
+def main():
+    loadConfig()
+    store = AllowlistStore(storeDir)
+
+    repeat = True
+    while(repeat):
+        print("\nOptions:")
+        print("1 for Importing addresses from a CSV file.")
+        print("2 for Importing `toVerify` and `verified` from the JSON file.")
+        print("3 for Exporting a tier to `toVerify` and `verified` of the JSON file.")
+        print("4 for Exporting a tier to a CSV file.")
+        print("5 for Marking the addresses verified on chain for a tier.")
+        print("6 for Verifying the next batch of unverified addresses with Tier ID.")
+        print("7 for getting the Allowlist Store Details.")
+        print("8 to exit.")
+        selection = int(input("Enter the choice: "))
+        if(selection == 1):
+            fileName = input("Enter the CSV file (one address per row, optional tier ID in the second column): ")
+            print("Imported", store.importCsv(fileName), "new addresses.")
+        elif(selection == 2):
+            tierID = readTier("import the verified list of")
+            print("Imported", store.importJson(values, tierID), "new addresses.")
+        elif(selection == 3):
+            tierID = readTier("export")
+            store.exportJson(values, tierID)
+            writeToJSON()
+            print("Exported Tier", tierID, "to the JSON file.")
+        elif(selection == 4):
+            tierID = readTier("export")
+            fileName = input("Enter the CSV file: ")
+            store.exportCsv(fileName, tierID)
+            print("Exported Tier", tierID, "to", fileName)
+        elif(selection == 5):
+            tierID = readTier("sync")
+            print("Marked", syncVerified(store, tierID), "addresses as verified.")
+        elif(selection == 6):
+            tierID = readTier("verify the next batch of addresses to")
+            print("Verified", verifyNext(store, tierID, verifyBatchSize), "addresses.")
+        elif(selection == 7):
+            printStore(store)
+        elif(selection == 8):
+            repeat = False
+        else:
+            print("\nSmarter people have written this, enter valid selection ;)\n")
+    store.close()
+
+# =========================================================================================================================================
+def loadConfig():
+    global values, acct, thisNetwork
+    thisNetwork = network.show_active()
+
+    if thisNetwork == "development":
+        acct = accounts[0]
+        configFile = open('./scripts/origins/values/development.json')
+    elif thisNetwork == "testnet" or thisNetwork == "testnet-ws" or thisNetwork == "rsk-testnet":
+        acct = accounts.load("rskdeployer")
+        configFile = open('./scripts/origins/values/testnet.json')
+    elif thisNetwork == "rsk-mainnet":
+        acct = accounts.load("rskdeployer")
+        configFile = open('./scripts/origins/values/mainnet.json')
+    else:
+        raise Exception("Network not supported.")
+
+    # Load deployment parameters and contracts addresses
+    values = json.load(configFile)
+
+# =========================================================================================================================================
+def readTier(reason):
+    print("\nIf you want to",reason,"the first tier, i.e. Index = 1 in JSON `tiers`, enter 1.")
+    tierID = int(input("Enter the Tier ID (Based on JSON File): "))
+    return tierID
+
+# =========================================================================================================================================
+def toRecord(address):
+    return bytes.fromhex(address[2:] if address.startswith('0x') else address)
+
+# =========================================================================================================================================
+def toAddress(record):
+    return web3.toChecksumAddress('0x' + record.hex())
+
+# =========================================================================================================================================
+def writeDurably(path, data):
+    with open(path, 'wb') as fileHandle:
+        fileHandle.write(data)
+        fileHandle.flush()
+        os.fsync(fileHandle.fileno())
+
+# =========================================================================================================================================
+class AllowlistStore:
+    # `addresses-<G>.bin` holds a header and the sorted 20 byte address records, memory-mapped for O(log n) lookups.
+    # `pending.bin` is an append only log of new addresses, merged into the sorted file by `compact()`.
+    # `tier-<ID>-<G>.bitmap` has one bit per sorted record, set once that address is verified for the tier.
+    # `manifest.json` names the generation G whose files belong together. `compact()` writes a new generation next to
+    # the current one and switches the manifest last, so a crash leaves either the old or the new generation whole.
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.manifestFile = os.path.join(directory, 'manifest.json')
+        self.pendingFile = os.path.join(directory, 'pending.bin')
+        self.generation = 0
+        if os.path.exists(self.manifestFile):
+            with open(self.manifestFile) as fileHandle:
+                self.generation = json.load(fileHandle)['generation']
+        self.addressFile = self.addressPath(self.generation)
+        if not os.path.exists(self.addressFile):
+            writeDurably(self.addressFile, struct.pack(headerFormat, magic, 1, 0))
+        self.removeOtherGenerations()
+        self.bitmaps = {}
+        self.openAddresses()
+
+        # The pending log is small by construction and is kept in memory as a set. After a crash between the manifest
+        # switch and the truncation of the log, it still lists addresses which are in the sorted file already.
+        self.pending = set()
+        if os.path.exists(self.pendingFile):
+            with open(self.pendingFile, 'rb') as fileHandle:
+                data = fileHandle.read()
+            for offset in range(0, len(data) - len(data) % recordSize, recordSize):
+                record = data[offset:offset + recordSize]
+                if self.indexOf(record) < 0:
+                    self.pending.add(record)
+        self.pendingHandle = open(self.pendingFile, 'ab')
+
+    def addressPath(self, generation):
+        return os.path.join(self.directory, 'addresses-' + str(generation) + '.bin')
+
+    def bitmapPath(self, tierID, generation):
+        return os.path.join(self.directory, 'tier-' + str(tierID) + '-' + str(generation) + '.bitmap')
+
+    def removeOtherGenerations(self):
+        # Files of an older generation, or of a newer one whose compaction never reached the manifest switch.
+        suffixes = ('-' + str(self.generation) + '.bin', '-' + str(self.generation) + '.bitmap')
+        for fileName in os.listdir(self.directory):
+            if (fileName.startswith('addresses-') or fileName.startswith('tier-')) and not fileName.endswith(suffixes):
+                os.remove(os.path.join(self.directory, fileName))
+
+    def openAddresses(self):
+        self.addressHandle = open(self.addressFile, 'rb')
+        self.addresses = mmap.mmap(self.addressHandle.fileno(), 0, access=mmap.ACCESS_READ)
+        fileMagic, version, self.count = struct.unpack(headerFormat, self.addresses[:headerSize])
+        if fileMagic != magic:
+            raise Exception("Not an allowlist store: " + self.addressFile)
+
+    def closeAddresses(self):
+        for tierID in list(self.bitmaps.keys()):
+            bitmap, handle = self.bitmaps.pop(tierID)
+            bitmap.close()
+            handle.close()
+        self.addresses.close()
+        self.addressHandle.close()
+
+    def close(self):
+        self.closeAddresses()
+        self.pendingHandle.close()
+
+    def record(self, index):
+        offset = headerSize + index * recordSize
+        return self.addresses[offset:offset + recordSize]
+
+    def indexOf(self, address):
+        record = toRecord(address) if isinstance(address, str) else address
+        low = 0
+        high = self.count
+        while low < high:
+            middle = (low + high) // 2
+            current = self.record(middle)
+            if current < record:
+                low = middle + 1
+            elif current > record:
+                high = middle
+            else:
+                return middle
+        return -1
+
+    def contains(self, address):
+        record = toRecord(address)
+        return record in self.pending or self.indexOf(record) >= 0
+
+    def append(self, addressList):
+        # Streams new addresses to the pending log, already known ones are skipped.
+        added = 0
+        for address in addressList:
+            record = toRecord(address)
+            if record in self.pending or self.indexOf(record) >= 0:
+                continue
+            self.pendingHandle.write(record)
+            self.pending.add(record)
+            added += 1
+        self.pendingHandle.flush()
+        if len(self.pending) >= compactThreshold:
+            self.compact()
+        return added
+
+    def bitmap(self, tierID):
+        if tierID not in self.bitmaps:
+            path = self.bitmapPath(tierID, self.generation)
+            size = max(1, (self.count + 7) // 8)
+            if not os.path.exists(path) or os.path.getsize(path) < size:
+                with open(path, 'ab') as fileHandle:
+                    fileHandle.write(bytes(size - (os.path.getsize(path) if os.path.exists(path) else 0)))
+            handle = open(path, 'r+b')
+            self.bitmaps[tierID] = (mmap.mmap(handle.fileno(), 0), handle)
+        return self.bitmaps[tierID][0]
+
+    def tierIDs(self):
+        tierIDs = set(self.bitmaps.keys())
+        suffix = '-' + str(self.generation) + '.bitmap'
+        for fileName in os.listdir(self.directory):
+            if fileName.startswith('tier-') and fileName.endswith(suffix):
+                tierIDs.add(int(fileName[5:-len(suffix)]))
+        return sorted(tierIDs)
+
+    def compact(self):
+        # Merges the pending log into the sorted file, and moves every tier bitmap to the new record positions.
+        if len(self.pending) == 0:
+            return
+        newRecords = sorted(self.pending)
+        oldBitmaps = {tierID: bytes(self.bitmap(tierID)) for tierID in self.tierIDs()}
+        total = self.count + len(newRecords)
+        newBitmaps = {tierID: bytearray((total + 7) // 8) for tierID in oldBitmaps}
+
+        generation = self.generation + 1
+        addressFile = self.addressPath(generation)
+        with open(addressFile, 'wb') as fileHandle:
+            fileHandle.write(struct.pack(headerFormat, magic, 1, total))
+            oldIndex = 0
+            newIndex = 0
+            for position in range(total):
+                if newIndex >= len(newRecords) or (oldIndex < self.count and self.record(oldIndex) < newRecords[newIndex]):
+                    fileHandle.write(self.record(oldIndex))
+                    for tierID, oldBitmap in oldBitmaps.items():
+                        if oldBitmap[oldIndex >> 3] & (1 << (oldIndex & 7)):
+                            newBitmaps[tierID][position >> 3] |= 1 << (position & 7)
+                    oldIndex += 1
+                else:
+                    fileHandle.write(newRecords[newIndex])
+                    newIndex += 1
+            fileHandle.flush()
+            os.fsync(fileHandle.fileno())
+        for tierID, newBitmap in newBitmaps.items():
+            writeDurably(self.bitmapPath(tierID, generation), newBitmap)
+
+        # The switch to the new generation.
+        writeDurably(self.manifestFile + '.tmp', json.dumps({'generation': generation}).encode())
+        os.replace(self.manifestFile + '.tmp', self.manifestFile)
+
+        self.closeAddresses()
+        self.generation = generation
+        self.addressFile = addressFile
+        self.removeOtherGenerations()
+        self.pendingHandle.close()
+        self.pendingHandle = open(self.pendingFile, 'wb')
+        self.pending = set()
+        self.openAddresses()
+
+    def isVerified(self, address, tierID):
+        index = self.indexOf(toRecord(address))
+        if index < 0:
+            return False
+        return bool(self.bitmap(tierID)[index >> 3] & (1 << (index & 7)))
+
+    def markVerified(self, addressList, tierID):
+        records = [toRecord(address) for address in addressList]
+        if any(record in self.pending for record in records):
+            self.compact()
+        bitmap = self.bitmap(tierID)
+        marked = 0
+        for record in records:
+            index = self.indexOf(record)
+            if index < 0:
+                continue
+            bitmap[index >> 3] = bitmap[index >> 3] | (1 << (index & 7))
+            marked += 1
+        bitmap.flush()
+        return marked
+
+    def nextUnverified(self, tierID, limit):
+        # Fully verified bytes are skipped whole, so this stays cheap even late in a sale.
+        self.compact()
+        bitmap = self.bitmap(tierID)
+        result = []
+        for byteIndex in range((self.count + 7) // 8):
+            byte = bitmap[byteIndex]
+            if byte == 0xff:
+                continue
+            for bit in range(8):
+                index = (byteIndex << 3) + bit
+                if index >= self.count or len(result) >= limit:
+                    break
+                if not byte & (1 << bit):
+                    result.append(toAddress(self.record(index)))
+            if len(result) >= limit:
+                break
+        return result
+
+    def verifiedCount(self, tierID):
+        return sum(bin(byte).count('1') for byte in bytes(self.bitmap(tierID)))
+
+    def iterate(self):
+        for index in range(self.count):
+            yield index, self.record(index)
+
+    def importCsv(self, fileName):
+        # Rows are `address` or `address,tierID` (the tier marks the address as already verified).
+        added = 0
+        verified = {}
+        with open(fileName) as fileHandle:
+            batch = []
+            for row in csv.reader(fileHandle):
+                if len(row) == 0 or not row[0].strip().startswith('0x'):
+                    continue
+                batch.append(row[0].strip())
+                if len(row) > 1 and row[1].strip().isdigit():
+                    verified.setdefault(int(row[1]), []).append(row[0].strip())
+                if len(batch) >= 10000:
+                    added += self.append(batch)
+                    batch = []
+            added += self.append(batch)
+        for tierID, addressList in verified.items():
+            self.markVerified(addressList, tierID)
+        return added
+
+    def exportCsv(self, fileName, tierID):
+        self.compact()
+        bitmap = self.bitmap(tierID)
+        with open(fileName, 'w', newline='') as fileHandle:
+            writer = csv.writer(fileHandle)
+            writer.writerow(['address', 'verified'])
+            for index, record in self.iterate():
+                writer.writerow([toAddress(record), int(bool(bitmap[index >> 3] & (1 << (index & 7))))])
+
+    def importJson(self, values, tierID):
+        added = self.append(values['toVerify'] + values['verified'])
+        self.markVerified(values['verified'], tierID)
+        return added
+
+    def exportJson(self, values, tierID):
+        self.compact()
+        bitmap = self.bitmap(tierID)
+        values['toVerify'] = []
+        values['verified'] = []
+        for index, record in self.iterate():
+            if bitmap[index >> 3] & (1 << (index & 7)):
+                values['verified'].append(toAddress(record))
+            else:
+                values['toVerify'].append(toAddress(record))
+
+# =========================================================================================================================================
+def syncVerified(store, tierID):
+    # Marks the addresses which Origins already reports as approved for the tier, read at one block as JSON-RPC batches.
+    store.compact()
+    block = web3.eth.block_number
+    isApproved = selector("isAddressApproved(address,uint256)")
+    approved = []
+    for start in range(0, store.count, syncChunkSize):
+        addressList = [toAddress(store.record(index)) for index in range(start, min(start + syncChunkSize, store.count))]
+        results = concurrentCalls([(values['origins'], isApproved + encodeArgs([address, tierID])) for address in addressList], block)
+        approved += [address for address, result in zip(addressList, results) if int(result, 16) != 0]
+    return store.markVerified(approved, tierID)
+
+# =========================================================================================================================================
+def verifyNext(store, tierID, batchSize):
+    # Takes the next batch of unverified addresses for the tier, verifies them in one transaction and marks them in the store.
+    addressList = store.nextUnverified(tierID, batchSize)
+    if len(addressList) == 0:
+        return 0
+    origins = Contract.from_abi("OriginsBase", address=values['origins'], abi=OriginsBase.abi, owner=acct)
+    origins.multipleAddressSingleTierVerification(addressList, tierID)
+    return store.markVerified(addressList, tierID)
+
+# =========================================================================================================================================
+def printStore(store):
+    print("\n=============================================================")
+    print("Allowlist Store:     ", store.directory)
+    print("=============================================================")
+    print("Addresses:           ", store.count)
+    print("Pending Addresses:   ", len(store.pending))
+    for tierID in store.tierIDs():
+        print("Verified on Tier", tierID, ":  ", store.verifiedCount(tierID))
+    print("=============================================================")
+
+# =========================================================================================================================================
+def writeToJSON():
+    if thisNetwork == "development":
+        fileHandle = open('./scripts/origins/values/development.json', "w")
+    elif thisNetwork == "testnet" or thisNetwork == "rsk-testnet" or thisNetwork == "testnet-ws":
+        fileHandle = open('./scripts/origins/values/testnet.json', "w")
+    elif thisNetwork == "rsk-mainnet":
+        fileHandle = open('./scripts/origins/values/mainnet.json', "w")
+    json.dump(values, fileHandle, indent=4)
@@ -0,0 +1,274 @@
+from brownie import *
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import os
+import time
+import json
+import random
+import asyncio
+import aiohttp
+import requests
+import threading
+
+# Upper bound on the requests in flight, which is also the size of the keep-alive connection pool.
+rpcConcurrency = int(os.environ.get('RPC_CONCURRENCY', 16))
+rpcRetries = int(os.environ.get('RPC_RETRIES', 3))
+# Seconds before the first retry, doubled (with jitter) on every further one.
+rpcBackoff = float(os.environ.get('RPC_BACKOFF', 0.25))
+rpcTimeout = float(os.environ.get('RPC_TIMEOUT', 30))
+
+# Answers which are worth another try: rate limits and unavailable or overloaded nodes. The generic internal error
+# (-32603) is not one of them, as some nodes (Hardhat among them) answer a revert with it.
+retryStatus = [429, 502, 503, 504]
+retryCodes = [-32005]
+
+client = None
+
+def main():
+    # Reads all tiers of the Origins of the JSON file, with the timings of the calls.
+    loadConfig()
+    origins = Contract.from_abi("OriginsBase", address=values['origins'], abi=OriginsBase.abi)
+    tierCount = origins.getTierCount()
+    timeBefore = time.time()
+    readAll([(function, [tierID]) for tierID in range(1, tierCount + 1) for function in (origins.readTierPartA, origins.readTierPartB)])
+    print("Read", tierCount, "tiers in", round(time.time() - timeBefore, 4), "seconds.")
+    if getClient() is not None:
+        printTimings(getClient())
+
+# =========================================================================================================================================
+def loadConfig():
+    global values, thisNetwork
+    thisNetwork = network.show_active()
+
+    if thisNetwork == "development":
+        configFile = open('./scripts/origins/values/development.json')
+    elif thisNetwork == "testnet" or thisNetwork == "testnet-ws" or thisNetwork == "rsk-testnet":
+        configFile = open('./scripts/origins/values/testnet.json')
+    elif thisNetwork == "rsk-mainnet":
+        configFile = open('./scripts/origins/values/mainnet.json')
+    else:
+        raise Exception("Network not supported.")
+
+    # Load deployment parameters and contracts addresses
+    values = json.load(configFile)
+
+# =========================================================================================================================================
+class TransientError(Exception):
+    pass
+
+# =========================================================================================================================================
+class AsyncRpcClient:
+    # JSON-RPC over one aiohttp session, which keeps its connections alive between calls and batches of calls.
+    # The session lives on the client's own event loop, so the synchronous scripts can use it with `run`.
+
+    def __init__(self, endpoint, concurrency=rpcConcurrency):
+        self.endpoint = endpoint
+        self.concurrency = concurrency
+        self.loop = asyncio.new_event_loop()
+        self.session = None
+        self.semaphore = None
+        self.requestId = 0
+        self.timings = []
+        self.retries = 0
+
+    async def open(self):
+        if self.session is None:
+            self.semaphore = asyncio.Semaphore(self.concurrency)
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.concurrency),
+                timeout=aiohttp.ClientTimeout(total=rpcTimeout)
+            )
+
+    async def post(self, payload):
+        async with self.session.post(self.endpoint, json=payload) as response:
+            if response.status in retryStatus:
+                raise TransientError("HTTP " + str(response.status))
+            if response.status != 200:
+                raise Exception("RPC request failed with HTTP " + str(response.status))
+            body = await response.json(content_type=None)
+        if 'error' in body:
+            if body['error'].get('code') in retryCodes:
+                raise TransientError(str(body['error']))
+            raise Exception("RPC request failed: " + str(body['error']))
+        return body['result']
+
+    async def request(self, method, params):
+        await self.open()
+        self.requestId += 1
+        payload = {'jsonrpc': '2.0', 'id': self.requestId, 'method': method, 'params': params}
+        async with self.semaphore:
+            attempt = 0
+            while True:
+                timeBefore = time.time()
+                try:
+                    result = await self.post(payload)
+                    self.timings.append((method, time.time() - timeBefore, attempt + 1))
+                    return result
+                except (aiohttp.ClientError, asyncio.TimeoutError, TransientError):
+                    if attempt == rpcRetries:
+                        raise
+                    self.retries += 1
+                    await asyncio.sleep(rpcBackoff * (2 ** attempt) * (1 + random.random()))
+                    attempt += 1
+
+    def run(self, coroutine):
+        return self.loop.run_until_complete(coroutine)
+
+    def requestMany(self, items):
+        # All the (method, params) at once, bounded by the semaphore, answers in the order of `items`.
+        async def gather():
+            return await asyncio.gather(*[self.request(method, params) for method, params in items])
+        return self.run(gather())
+
+    def close(self):
+        if self.session is not None:
+            self.run(self.session.close())
+        self.loop.close()
+
+# =========================================================================================================================================
+def endpointOf(provider):
+    # Wrapping providers (the view cache, the cassette recorder) keep the real one as `provider`.
+    while hasattr(provider, 'provider'):
+        provider = provider.provider
+    return getattr(provider, 'endpoint_uri', None)
+
+# =========================================================================================================================================
+def getClient():
+    # One client per session, None if the network is not reached over HTTP (websocket), if disabled with `ASYNC_RPC=0`,
+    # or while a wrapping provider (the view cache, the cassette recorder) is installed, which has to see every request.
+    global client
+    if os.environ.get('ASYNC_RPC', '1') == '0' or os.environ.get('RPC_CASSETTE') or hasattr(web3.provider, 'provider'):
+        return None
+    endpoint = endpointOf(web3.provider)
+    if endpoint is None or not str(endpoint).startswith('http'):
+        return None
+    if client is None or client.endpoint != endpoint:
+        client = AsyncRpcClient(str(endpoint))
+    return client
+
+# =========================================================================================================================================
+def readAll(calls, block='latest', rpcClient=None):
+    # Runs the (ContractCall, args) view calls concurrently, the results are decoded as brownie would.
+    # Without an HTTP endpoint the calls are made one after the other, through brownie.
+    rpcClient = rpcClient or getClient()
+    if rpcClient is None:
+        if block == 'latest':
+            return [function(*args) for function, args in calls]
+        return [function(*args, block_identifier=block) for function, args in calls]
+
+    blockTag = hex(block) if isinstance(block, int) else block
+    results = rpcClient.requestMany([
+        ('eth_call', [{'to': function._address, 'data': function.encode_input(*args)}, blockTag])
+        for function, args in calls
+    ])
+    return [function.decode_output(result) for (function, args), result in zip(calls, results)]
+
+# =========================================================================================================================================
+def percentile(items, share):
+    items = sorted(items)
+    return items[min(len(items) - 1, int(len(items) * share))] if len(items) > 0 else 0
+
+# =========================================================================================================================================
+def printTimings(rpcClient):
+    seconds = [timing[1] for timing in rpcClient.timings]
+    print("=============================================================")
+    print("RPC Calls:           ", len(seconds))
+    print("Retries:             ", rpcClient.retries)
+    print("Median Latency:      ", round(percentile(seconds, 0.5) * 1000, 2), "ms")
+    print("95th Percentile:     ", round(percentile(seconds, 0.95) * 1000, 2), "ms")
+    print("Maximum Latency:     ", round(max(seconds) * 1000, 2) if len(seconds) > 0 else 0, "ms")
+    print("=============================================================")
+
+# =========================================================================================================================================
+class LatencyProxy(BaseHTTPRequestHandler):
+    # Forwards JSON-RPC to the `target` of its server after `latency` seconds, plus `stallLatency` for a share of
+    # `stallRate` requests, and answers a share of `errorRate` requests with a 503.
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        time.sleep(self.server.latency + (self.server.stallLatency if random.random() < self.server.stallRate else 0))
+        if random.random() < self.server.errorRate:
+            self.reply(503, b'')
+            return
+        response = requests.post(self.server.target, data=body, headers={'Content-Type': 'application/json'})
+        self.reply(200, response.content)
+
+    def reply(self, status, content):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+# =========================================================================================================================================
+def startProxy(target, port, latency, errorRate, stallRate=0, stallLatency=0):
+    server = ThreadingHTTPServer(('127.0.0.1', port), LatencyProxy)
+    server.target = target
+    server.latency = latency
+    server.errorRate = errorRate
+    server.stallRate = stallRate
+    server.stallLatency = stallLatency
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+# =========================================================================================================================================
+def benchmark():
+    # The same view calls on the fixture, one at a time through brownie and concurrently through the client,
+    # both behind a local proxy which adds `BENCHMARK_LATENCY` and fails `BENCHMARK_ERROR_RATE` of the requests.
+    from scripts.origins import fixtureCache
+    from web3 import HTTPProvider
+
+    if network.show_active() != "development":
+        raise Exception("Benchmark is only supported on development.")
+    fixtureCache.loadConfig()
+    fixtureValues = fixtureCache.loadFixture()
+    acct = fixtureCache.acct
+    origins = Contract.from_abi("OriginsBase", address=fixtureValues['origins'], abi=OriginsBase.abi)
+    token = Contract.from_abi("Token", address=fixtureValues['token'], abi=Token.abi)
+
+    latency = float(os.environ.get('BENCHMARK_LATENCY', 0.05))
+    port = int(os.environ.get('BENCHMARK_PROXY_PORT', 8600))
+    proxyUrl = 'http://127.0.0.1:' + str(port)
+    server = startProxy(endpointOf(web3.provider), port, latency, float(os.environ.get('BENCHMARK_ERROR_RATE', 0)))
+
+    callCount = int(os.environ.get('BENCHMARK_CALLS', 200))
+    calls = []
+    for index in range(callCount):
+        calls.append([
+            (token.balanceOf, [accounts[index % len(accounts)]]),
+            (token.allowance, [acct, origins.address]),
+            (origins.getOwners, []),
+            (origins.getVerifiers, [])
+        ][index % 4])
+
+    # The sequential figure is measured through a plain HTTP provider, as brownie reads without a cache.
+    provider = web3.provider
+    web3.provider = HTTPProvider(proxyUrl)
+    timeBefore = time.time()
+    try:
+        sequential = [function(*args) for function, args in calls]
+    except Exception:
+        # Injected errors are not retried by brownie.
+        sequential = None
+    sequentialTime = time.time() - timeBefore
+    web3.provider = provider
+
+    rpcClient = AsyncRpcClient(proxyUrl)
+    timeBefore = time.time()
+    concurrent = readAll(calls, 'latest', rpcClient)
+    concurrentTime = time.time() - timeBefore
+    rpcClient.close()
+    server.shutdown()
+
+    print("\n=============================================================")
+    print("Injected Latency:    ", latency * 1000, "ms")
+    print("Mode".ljust(20), "Calls".rjust(7), "Seconds".rjust(9), "Calls/s".rjust(9))
+    print("Sequential".ljust(20), str(callCount).rjust(7), str(round(sequentialTime, 2)).rjust(9), str(round(callCount / sequentialTime, 1)).rjust(9) if sequential is not None else "failed".rjust(9))
+    print("Concurrent".ljust(20), str(callCount).rjust(7), str(round(concurrentTime, 2)).rjust(9), str(round(callCount / concurrentTime, 1)).rjust(9))
+    if sequential is not None:
+        print("Same Results:        ", sequential == concurrent)
+    printTimings(rpcClient)
@@ -0,0 +1,273 @@
+from brownie import *
+
+import os
+import time
+import json
+
+# A batch is split so that no transaction estimates above this.
+gasCap = int(os.environ.get('BATCH_GAS_CAP', 6000000))
+# Only used to project the wall time on a live network, where every transaction waits for its own block.
+blockTime = int(os.environ.get('BLOCK_TIME', 30))
+compareTiers = int(os.environ.get('COMPARE_TIERS', 6))
+
+abis = {
+    'origins': ("OriginsBase", OriginsBase.abi),
+    'lockedFund': ("LockedFund", LockedFund.abi),
+    'token': ("Token", Token.abi)
+}
+
+def main():
+    loadConfig()
+
+    repeat = True
+    while(repeat):
+        print("\nOptions:")
+        print("1 for Deploying the Batch Executor.")
+        print("2 for Executing the Sale Setup (deposit address, verifiers, tiers) as a batch.")
+        print("3 for Executing `batchActions` of the JSON file as a batch.")
+        print("4 for Printing the encoded calls without executing them.")
+        print("5 to exit.")
+        selection = int(input("Enter the choice: "))
+        if(selection == 1):
+            deployExecutor()
+        elif(selection == 2):
+            executeActions(setupActions(values, True))
+        elif(selection == 3):
+            executeActions(values['batchActions'])
+        elif(selection == 4):
+            printBatches(encodeActions(setupActions(values, True) + values.get('batchActions', [])))
+        elif(selection == 5):
+            repeat = False
+        else:
+            print("\nSmarter people have written this, enter valid selection ;)\n")
+
+# =========================================================================================================================================
+def loadConfig():
+    global values, acct, thisNetwork
+    thisNetwork = network.show_active()
+
+    if thisNetwork == "development":
+        acct = accounts[0]
+        configFile = open('./scripts/origins/values/development.json')
+    elif thisNetwork == "testnet" or thisNetwork == "testnet-ws":
+        acct = accounts.load("rskdeployer")
+        configFile = open('./scripts/origins/values/testnet.json')
+    elif thisNetwork == "rsk-testnet":
+        acct = accounts.load("rskdeployer")
+        configFile = open('./scripts/origins/values/testnet.json')
+    elif thisNetwork == "rsk-mainnet":
+        acct = accounts.load("rskdeployer")
+        configFile = open('./scripts/origins/values/mainnet.json')
+    else:
+        raise Exception("Network not supported.")
+
+    # Load deployment parameters and contracts addresses
+    values = json.load(configFile)
+
+# =========================================================================================================================================
+def deployExecutor():
+    # The executor is the `msg.sender` of every call in a batch, so it needs the same rights as the deployer.
+    executor = acct.deploy(BatchExecutor)
+    values['batchExecutor'] = str(executor)
+    origins = Contract.from_abi("OriginsBase", address=values['origins'], abi=OriginsBase.abi, owner=acct)
+    origins.addOwner(executor)
+    lockedFund = Contract.from_abi("LockedFund", address=values['lockedFund'], abi=LockedFund.abi, owner=acct)
+    lockedFund.addAdmin(executor)
+    writeToJSON()
+    print("Batch Executor deployed at", executor, "and added as an Origins owner and Locked Fund admin.")
+    return executor
+
+# =========================================================================================================================================
+def action(contract, function, args):
+    return {"contract": contract, "function": function, "args": args}
+
+# =========================================================================================================================================
+def setupActions(values, throughExecutor):
+    # The sale setup which otherwise is a transaction per option of `deployOrigins.py`.
+    actions = [action('origins', 'setDepositAddress', ["$depositAddress"])]
+    # A verifier added twice reverts the whole batch, so the ones Origins already has are left out.
+    origins = Contract.from_abi("OriginsBase", address=values['origins'], abi=OriginsBase.abi)
+    verifiers = [verifier.lower() for verifier in origins.getVerifiers()]
+    for verifier in values['originsVerifiers']:
+        if verifier.lower() not in verifiers:
+            actions.append(action('origins', 'addVerifier', [verifier]))
+
+    decimal = int(values['decimal'])
+    totalTokens = sum(int(tier['tokensForSale']) * (10 ** decimal) for tier in values['tiers'][1:])
+    # `createTier` pulls the tokens from its caller, which is the executor inside a batch.
+    if throughExecutor:
+        actions.append(action('token', 'transferFrom', [str(acct), "$batchExecutor", totalTokens]))
+    actions.append(action('token', 'approve', ["$origins", totalTokens]))
+
+    for tier in values['tiers'][1:]:
+        actions.append(action('origins', 'createTier', [
+            tier['maximumAmount'], int(tier['tokensForSale']) * (10 ** decimal), tier['saleStartTimestamp'], tier['saleEnd'],
+            tier['unlockedBP'], tier['vestOrLockCliff'], tier['vestOrLockDuration'], tier['depositRate'], tier['depositType'],
+            tier['verificationType'], tier['saleEndDurationOrTimestamp'], tier['transferType']
+        ]))
+    actions.append(action('lockedFund', 'changeWaitedTS', ["$waitedTimestamp"]))
+    return actions
+
+# =========================================================================================================================================
+def resolve(arg):
+    # Arguments starting with `$` are read from the JSON file, e.g. "$lockedFund".
+    if isinstance(arg, str) and arg.startswith('$'):
+        return values[arg[1:]]
+    if isinstance(arg, list):
+        return [resolve(item) for item in arg]
+    return arg
+
+# =========================================================================================================================================
+def contractFor(name):
+    contractName, abi = abis[name]
+    return Contract.from_abi(contractName, address=values[name], abi=abi, owner=acct)
+
+# =========================================================================================================================================
+def encodeActions(actions):
+    # Every action turned into (target, value, calldata, description).
+    contracts = {}
+    calls = []
+    for item in actions:
+        if item['contract'] not in contracts:
+            contracts[item['contract']] = contractFor(item['contract'])
+        contract = contracts[item['contract']]
+        args = resolve(item['args'])
+        calldata = getattr(contract, item['function']).encode_input(*args)
+        calls.append((contract.address, int(item.get('value', 0)), calldata, item['contract'] + "." + item['function']))
+    return calls
+
+# =========================================================================================================================================
+def estimateBatch(executor, calls):
+    return executor.executeBatch.estimate_gas(
+        [call[0] for call in calls], [call[1] for call in calls], [call[2] for call in calls],
+        {'from': acct, 'value': sum(call[1] for call in calls)}
+    )
+
+# =========================================================================================================================================
+def sendBatch(executor, calls):
+    return executor.executeBatch(
+        [call[0] for call in calls], [call[1] for call in calls], [call[2] for call in calls],
+        {'from': acct, 'value': sum(call[1] for call in calls)}
+    )
+
+# =========================================================================================================================================
+def chunkAndSend(executor, calls):
+    # Grows a batch one call at a time while its estimate stays under the cap. Later calls may depend on the
+    # state left by earlier ones (e.g. `approve` before `createTier`), so each full batch is sent before estimating the next.
+    batches = []
+    current = []
+    for call in calls:
+        try:
+            fits = estimateBatch(executor, current + [call]) <= gasCap
+        except Exception:
+            # Either the call reverts, or the batch grew past the block gas limit. The current batch is closed,
+            # and the call estimated on its own decides which one it was.
+            if len(current) == 0:
+                raise Exception("The call reverts: " + call[3] + ", " + str(len(batches)) + " batches were sent before it.")
+            fits = False
+        if fits:
+            current.append(call)
+            continue
+        batches.append((current, sendBatch(executor, current)))
+        current = [call]
+        try:
+            gas = estimateBatch(executor, current)
+        except Exception:
+            raise Exception("The call reverts: " + call[3] + ", " + str(len(batches)) + " batches were sent before it.")
+        if gas > gasCap:
+            raise Exception("A single call does not fit into the gas cap: " + call[3])
+    if len(current) > 0:
+        batches.append((current, sendBatch(executor, current)))
+    return batches
+
+# =========================================================================================================================================
+def checkExecutorAllowance(calls):
+    # The `transferFrom` into the executor needs an allowance from the deployer, given once before the batch.
+    token = Contract.from_abi("Token", address=values['token'], abi=Token.abi, owner=acct)
+    required = 0
+    for target, value, calldata, description in calls:
+        if description == 'token.transferFrom':
+            required += token.decode_input(calldata)[1][2]
+    if required > 0 and token.allowance(acct, values['batchExecutor']) < required:
+        token.approve(values['batchExecutor'], required)
+
+# =========================================================================================================================================
+def executeActions(actions):
+    executor = Contract.from_abi("BatchExecutor", address=values['batchExecutor'], abi=BatchExecutor.abi, owner=acct)
+    calls = encodeActions(actions)
+    checkExecutorAllowance(calls)
+    batches = chunkAndSend(executor, calls)
+    for calls, tx in batches:
+        print("Executed", len(calls), "calls in", tx.txid, "using", tx.gas_used, "gas.")
+    return batches
+
+# =========================================================================================================================================
+def printBatches(calls):
+    print("\n=============================================================")
+    print("Encoded Calls")
+    print("=============================================================")
+    for target, value, calldata, description in calls:
+        print(description.ljust(32), target, calldata[:10], len(calldata) // 2 - 1, "bytes")
+    print("=============================================================")
+
+# =========================================================================================================================================
+def compare():
+    # Sets up the same sale twice on a fresh fixture: one transaction per call from the deployer, then through the executor.
+    global values
+    from scripts.origins import fixtureCache
+
+    loadConfig()
+    if thisNetwork != "development":
+        raise Exception("Comparison is only supported on development.")
+    fixtureCache.loadConfig()
+    values = fixtureCache.loadFixture()
+    values['tiers'] = [values['tiers'][0]] + [dict(values['tiers'][1], saleStartTimestamp=chain.time()) for index in range(compareTiers)]
+    values['originsVerifiers'] = [str(account) for account in accounts[1:4]]
+    values['waitedTimestamp'] = chain.time() + 7*24*60*60
+
+    contracts = {}
+    timeBefore = time.time()
+    perCallGas = 0
+    perCallCount = 0
+    for item in setupActions(values, False):
+        if item['contract'] not in contracts:
+            contracts[item['contract']] = contractFor(item['contract'])
+        tx = getattr(contracts[item['contract']], item['function'])(*resolve(item['args']), {'from': acct})
+        perCallGas += tx.gas_used
+        perCallCount += 1
+    perCallTime = time.time() - timeBefore
+    fixtureCache.revertToFixture()
+
+    executor = acct.deploy(BatchExecutor)
+    values['batchExecutor'] = str(executor)
+    contractFor('origins').addOwner(executor)
+    contractFor('lockedFund').addAdmin(executor)
+
+    timeBefore = time.time()
+    batches = executeActions(setupActions(values, True))
+    batchTime = time.time() - timeBefore
+    batchGas = sum(tx.gas_used for calls, tx in batches)
+    # The allowance given to the executor is one more transaction.
+    batchCount = len(batches) + 1
+
+    assert contractFor('origins').getTierCount() == compareTiers, "Not all tiers were created."
+    fixtureCache.revertToFixture()
+
+    print("\n=============================================================")
+    print("Sale Setup with", compareTiers, "Tiers")
+    print("=============================================================")
+    print("Flow".ljust(12), "Transactions".rjust(14), "Gas".rjust(12), "Seconds".rjust(10), "Projected Seconds".rjust(20))
+    print("Per call".ljust(12), str(perCallCount).rjust(14), str(perCallGas).rjust(12), str(round(perCallTime, 2)).rjust(10), str(perCallCount * blockTime).rjust(20))
+    print("Batched".ljust(12), str(batchCount).rjust(14), str(batchGas).rjust(12), str(round(batchTime, 2)).rjust(10), str(batchCount * blockTime).rjust(20))
+    print("=============================================================")
+    print("Projected seconds assume one block of", blockTime, "seconds per transaction.")
+
+# =========================================================================================================================================
+def writeToJSON():
+    if thisNetwork == "development":
+        fileHandle = open('./scripts/origins/values/development.json', "w")
+    elif thisNetwork == "testnet" or thisNetwork == "rsk-testnet" or thisNetwork == "testnet-ws":
+        fileHandle = open('./scripts/origins/values/testnet.json', "w")
+    elif thisNetwork == "rsk-mainnet":
+        fileHandle = open('./scripts/origins/values/mainnet.json', "w")
+    json.dump(values, fileHandle, indent=4)
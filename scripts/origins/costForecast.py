@@ -0,0 +1,209 @@
+from brownie import *
+from brownie._config import CONFIG
+
+import os
+import time
+import json
+import requests
+
+resultDir = './build/forecast'
+# The session to forecast, as the values JSON it would run with. Without one, development uses the fixture.
+valuesFile = os.environ.get('FORECAST_VALUES')
+# The deployer of the real session, impersonated on a fork.
+sender = os.environ.get('FORECAST_SENDER')
+verifyChunk = int(os.environ.get('FORECAST_VERIFY_CHUNK', 100))
+# Gas limit sent with a batch estimated transaction, on top of its estimate.
+gasMargin = float(os.environ.get('FORECAST_GAS_MARGIN', 1.2))
+
+def main():
+    loadConfig()
+    gasPrice = forecastGasPrice()
+
+    # Everything runs on top of a snapshot (`evm_snapshot`), which is reverted (`evm_revert`) at the end.
+    chain.snapshot()
+    try:
+        balances = {'rbtc': acct.balance(), 'token': tokenBalance()}
+        steps = runSession()
+    finally:
+        chain.revert()
+
+    printForecast(steps, gasPrice, balances)
+    writeForecast(steps, gasPrice)
+
+# =========================================================================================================================================
+def loadConfig():
+    global values, acct, thisNetwork
+    thisNetwork = network.show_active()
+
+    # Only a local chain (development, or a development network forking the real one) is ever written to.
+    if CONFIG.network_type != "development":
+        raise Exception("Forecasts only run on development networks, use a fork of the live network.")
+
+    if valuesFile is not None:
+        with open(valuesFile) as fileHandle:
+            values = json.load(fileHandle)
+        acct = accounts.at(sender, force=True) if sender is not None else accounts[0]
+    elif thisNetwork == "development":
+        from scripts.origins import fixtureCache
+        fixtureCache.loadConfig()
+        values = fixtureCache.loadFixture()
+        acct = fixtureCache.acct
+        # The fixture deployer is also its multisig, and Origins takes each owner only once.
+        values['multisig'] = str(accounts[9])
+    else:
+        raise Exception("Set FORECAST_VALUES to the values JSON of the session.")
+
+# =========================================================================================================================================
+def forecastGasPrice():
+    # The local chain's own gas price says nothing about the live network, so a session of FORECAST_VALUES is priced
+    # at `FORECAST_GAS_PRICE`, or at the gas price of the live node the network forks.
+    if os.environ.get('FORECAST_GAS_PRICE'):
+        return int(os.environ['FORECAST_GAS_PRICE'])
+    if valuesFile is None:
+        return web3.eth.gas_price
+    fork = CONFIG.active_network.get('cmd_settings', {}).get('fork')
+    if fork in CONFIG.networks:
+        fork = CONFIG.networks[fork].get('host')
+    if fork is None or not str(fork).startswith('http'):
+        raise Exception("Set FORECAST_GAS_PRICE, the gas price of the live network cannot be read from this network.")
+    response = requests.post(fork, json={'jsonrpc': '2.0', 'id': 1, 'method': 'eth_gasPrice', 'params': []}, timeout=30).json()
+    if 'error' in response:
+        raise Exception("Reading the gas price of " + fork + " failed: " + str(response['error']))
+    return int(response['result'], 16)
+
+# =========================================================================================================================================
+def tokenBalance():
+    return Contract.from_abi("Token", address=values['token'], abi=Token.abi).balanceOf(acct)
+
+# =========================================================================================================================================
+def batchEstimate(transactions):
+    # One JSON-RPC batch of `eth_estimateGas`, answers in the order of `transactions`.
+    payload = [
+        {'jsonrpc': '2.0', 'id': index, 'method': 'eth_estimateGas', 'params': [transaction]}
+        for index, transaction in enumerate(transactions)
+    ]
+    endpoint = getattr(web3.provider, 'endpoint_uri', None)
+    if endpoint is not None and str(endpoint).startswith('http'):
+        response = sorted(requests.post(endpoint, json=payload, timeout=120).json(), key=lambda item: item['id'])
+    else:
+        response = [web3.provider.make_request(item['method'], item['params']) for item in payload]
+    for item in response:
+        if 'error' in item:
+            raise Exception("Gas estimation failed: " + str(item['error']))
+    return [int(item['result'], 16) for item in response]
+
+# =========================================================================================================================================
+class Step:
+    # The transactions of one step of the session. Independent ones are estimated in one batch before they are sent,
+    # and sent with that estimate (plus `gasMargin`). Dependent ones are sent one after the other, estimated by brownie.
+
+    def __init__(self, name, independent):
+        self.name = name
+        self.independent = independent
+        self.calls = []
+        self.estimates = []
+        self.gasUsed = []
+        self.seconds = 0
+
+    def add(self, function, args):
+        self.calls.append((function, args))
+        return self
+
+    def run(self):
+        timeBefore = time.time()
+        if self.independent and len(self.calls) > 0:
+            self.estimates = batchEstimate([
+                {'from': acct.address, 'to': function._address, 'data': function.encode_input(*args)}
+                for function, args in self.calls
+            ])
+            for (function, args), estimate in zip(self.calls, self.estimates):
+                self.gasUsed.append(function(*args, {'from': acct, 'gas_limit': int(estimate * gasMargin)}).gas_used)
+        else:
+            for function, args in self.calls:
+                self.gasUsed.append(function(*args, {'from': acct}).gas_used)
+        self.seconds = time.time() - timeBefore
+
+# =========================================================================================================================================
+def runSession():
+    # The session of `deployOrigins.py`: deploy and configure Origins, create every tier of the JSON, verify `toVerify`
+    # on the `ByAddress` tiers, and hand the sale over to the multisig.
+    steps = []
+    timeBefore = time.time()
+    origins = acct.deploy(OriginsBase, [values['multisig'], acct], values['token'], values['depositAddress'])
+    steps.append({'name': "Deploy", 'transactions': 1, 'estimated': None, 'gasUsed': origins.tx.gas_used, 'seconds': time.time() - timeBefore})
+
+    lockedFund = Contract.from_abi("LockedFund", address=values['lockedFund'], abi=LockedFund.abi)
+    token = Contract.from_abi("Token", address=values['token'], abi=Token.abi)
+    decimal = int(values['decimal'])
+    tiers = values['tiers'][1:]
+
+    configure = Step("Configure", True)
+    configure.add(origins.setLockedFund, [values['lockedFund']])
+    configure.add(lockedFund.addAdmin, [origins.address])
+    configure.add(origins.addVerifier, [acct])
+
+    # Each approval is used up by its tier, so these go one after the other.
+    createTiers = Step("Create Tiers", False)
+    for tier in tiers:
+        remainingTokens = int(tier['tokensForSale']) * (10 ** decimal)
+        # The fixture leaves the start empty, and on a fork a configured start may have passed already (0 stays unstarted).
+        saleStartTimestamp = tier['saleStartTimestamp']
+        if saleStartTimestamp == "" or 0 < int(saleStartTimestamp) < chain.time():
+            saleStartTimestamp = chain.time()
+        createTiers.add(token.approve, [origins.address, remainingTokens])
+        createTiers.add(origins.createTier, [
+            tier['maximumAmount'], remainingTokens, saleStartTimestamp, tier['saleEnd'], tier['unlockedBP'],
+            tier['vestOrLockCliff'], tier['vestOrLockDuration'], tier['depositRate'], tier['depositType'],
+            tier['verificationType'], tier['saleEndDurationOrTimestamp'], tier['transferType']
+        ])
+
+    verify = Step("Verify", True)
+    toVerify = values.get('toVerify', [])
+    for tierID, tier in enumerate(tiers, start=1):
+        if int(tier['verificationType']) != 2:
+            continue
+        for start in range(0, len(toVerify), verifyChunk):
+            verify.add(origins.multipleAddressSingleTierVerification, [toVerify[start:start + verifyChunk], tierID])
+
+    # Estimated together while the deployer is still owner, the owner is removed last.
+    transferOwnership = Step("Transfer Ownership", True)
+    transferOwnership.add(origins.removeVerifier, [acct])
+    transferOwnership.add(origins.removeOwner, [acct])
+
+    for step in [configure, createTiers, verify, transferOwnership]:
+        print("\nStep:", step.name, "with", len(step.calls), "transactions")
+        step.run()
+        steps.append({
+            'name': step.name,
+            'transactions': len(step.calls),
+            'estimated': sum(step.estimates) if step.independent else None,
+            'gasUsed': sum(step.gasUsed),
+            'seconds': step.seconds
+        })
+    return steps
+
+# =========================================================================================================================================
+def printForecast(steps, gasPrice, balances):
+    total = sum(step['gasUsed'] for step in steps)
+    print("\n=============================================================")
+    print("Cost Forecast at a Gas Price of", gasPrice, "wei")
+    print("=============================================================")
+    print("Step".ljust(20), "Txs".rjust(5), "Estimated".rjust(11), "Gas Used".rjust(11), "Cost (RBTC)".rjust(14))
+    for step in steps:
+        estimated = str(step['estimated']) if step['estimated'] is not None else "-"
+        print(step['name'].ljust(20), str(step['transactions']).rjust(5), estimated.rjust(11), str(step['gasUsed']).rjust(11), str(step['gasUsed'] * gasPrice / (10 ** 18)).rjust(14))
+    print("-------------------------------------------------------------")
+    print("Total".ljust(20), str(sum(step['transactions'] for step in steps)).rjust(5), "".rjust(11), str(total).rjust(11), str(total * gasPrice / (10 ** 18)).rjust(14))
+    print("=============================================================")
+    tokensForSale = sum(int(tier['tokensForSale']) for tier in values['tiers'][1:]) * (10 ** int(values['decimal']))
+    print("Deployer RBTC Balance:       ", balances['rbtc'], "(enough)" if balances['rbtc'] >= total * gasPrice else "(NOT enough)")
+    print("Deployer Token Balance:      ", balances['token'], "(enough)" if balances['token'] >= tokensForSale else "(NOT enough)")
+    print("=============================================================")
+
+# =========================================================================================================================================
+def writeForecast(steps, gasPrice):
+    os.makedirs(resultDir, exist_ok=True)
+    path = os.path.join(resultDir, thisNetwork + '-' + time.strftime("%Y%m%d-%H%M%S") + '.json')
+    with open(path, "w") as fileHandle:
+        json.dump({'network': thisNetwork, 'values': valuesFile, 'gasPrice': gasPrice, 'steps': steps}, fileHandle, indent=4)
+    print("Forecast written to", path)
@@ -1,9 +1,12 @@
 from brownie import *
+from scripts.origins.viewCache import installCache, printStats
+from scripts.origins.asyncRpc import readAll
 
 import time
 import json
 import csv
 import math
+import os
 
 def main():
     loadConfig()
@@ -18,9 +21,12 @@ def main():
     print("Gas Used:        ", balanceBefore - balanceAfter)
     print("=============================================================")
 
+    if viewCache is not None:
+        printStats(viewCache)
+
 # =========================================================================================================================================
 def loadConfig():
-    global values, acct, thisNetwork
+    global values, acct, thisNetwork, viewCache
     thisNetwork = network.show_active()
 
     if thisNetwork == "development":
@@ -41,6 +47,16 @@ def loadConfig():
     # Load deployment parameters and contracts addresses
     values = json.load(configFile)
 
+    # With several nodes listed in `RPC_ENDPOINTS` (comma separated), reads go to the fastest healthy one.
+    if os.environ.get('RPC_ENDPOINTS'):
+        from scripts.origins.rpcRouter import installRouter
+        installRouter(os.environ['RPC_ENDPOINTS'].split(','))
+
+    # With `VIEW_CACHE=1`, repeated view calls within a block are answered from memory.
+    viewCache = None
+    if os.environ.get('VIEW_CACHE', '0') == '1':
+        viewCache = installCache()
+
 # =========================================================================================================================================
 def choice():
     repeat = True
@@ -52,7 +68,8 @@ def choice():
         print("4 for Removing yourself as an Admin.")
         print("5 for Updating Vesting Registry.")
         print("6 for Updating waited timestamp.")
-        print("7 to exit.")
+        print("7 for getting the Locked Fund Details.")
+        print("8 to exit.")
         selection = int(input("Enter the choice: "))
         if(selection == 1):
             deployLockedFund()
@@ -67,6 +84,8 @@ def choice():
         elif(selection == 6):
             updateWaitedTS()
         elif(selection == 7):
+            getLockedFundDetails()
+        elif(selection == 8):
             repeat = False
         else:
             print("\nSmarter people have written this, enter valid selection ;)\n")
@@ -150,6 +169,26 @@ def updateWaitedTSMultisig():
 
     print("Updated Waited Timestamp as", values['waitedTimestamp'], "of LockedFund...\n")
 
+# =========================================================================================================================================
+def getLockedFundDetails():
+    lockedFund = Contract.from_abi("LockedFund", address=values['lockedFund'], abi=LockedFund.abi, owner=acct)
+    waitedTS, token, vestingRegistry, isAdmin, isOriginsAdmin = readAll([
+        (lockedFund.getWaitedTS, []),
+        (lockedFund.getToken, []),
+        (lockedFund.getVestingDetails, []),
+        (lockedFund.adminStatus, [acct]),
+        (lockedFund.adminStatus, [values['origins']])
+    ])
+    print("\n=============================================================")
+    print("Locked Fund Details")
+    print("=============================================================")
+    print("Waited Timestamp:    ", waitedTS)
+    print("Token Address:       ", token)
+    print("Vesting Registry:    ", vestingRegistry)
+    print("Am I an Admin:       ", isAdmin)
+    print("Is Origins an Admin: ", isOriginsAdmin)
+    print("=============================================================")
+
 # =========================================================================================================================================
 def writeToJSON():
     if thisNetwork == "development":
@@ -1,10 +1,13 @@
 from brownie import *
+from scripts.origins.viewCache import installCache, printStats
+from scripts.origins.asyncRpc import readAll
 
 import time
 import json
 import sys
 import csv
 import math
+import os
 
 def main():
     loadConfig()
@@ -19,9 +22,12 @@ def main():
     print("Gas Used:        ", balanceBefore - balanceAfter)
     print("=============================================================")
 
+    if viewCache is not None:
+        printStats(viewCache)
+
 # =========================================================================================================================================
 def loadConfig():
-    global values, acct, thisNetwork
+    global values, acct, thisNetwork, viewCache
     thisNetwork = network.show_active()
 
     if thisNetwork == "development":
@@ -42,6 +48,21 @@ def loadConfig():
     # Load deployment parameters and contracts addresses
     values = json.load(configFile)
 
+    # With several nodes listed in `RPC_ENDPOINTS` (comma separated), reads go to the fastest healthy one.
+    if os.environ.get('RPC_ENDPOINTS'):
+        from scripts.origins.rpcRouter import installRouter
+        installRouter(os.environ['RPC_ENDPOINTS'].split(','))
+
+    # With `VIEW_CACHE=1`, repeated view calls within a block are answered from memory.
+    viewCache = None
+    if os.environ.get('VIEW_CACHE', '0') == '1':
+        viewCache = installCache()
+
+    # Optionally record every JSON-RPC request/response of this session to a cassette.
+    if os.environ.get('RPC_CASSETTE'):
+        from scripts.origins.rpcCassette import installRecorder
+        installRecorder(os.environ['RPC_CASSETTE'])
+
 # =========================================================================================================================================
 def choice():
     repeat = True
@@ -67,7 +88,8 @@ def choice():
         print("18 for getting the Tier Details.")
         print("19 for getting the Owner Details.")
         print("20 for getting the Verifier Details.")
-        print("21 to exit.")
+        print("21 for getting the Details of all Tiers.")
+        print("22 to exit.")
         selection = int(input("Enter the choice: "))
         if(selection == 1):
             deployOrigins()
@@ -110,6 +132,8 @@ def choice():
         elif(selection == 20):
             getVerifierList()
         elif(selection == 21):
+            getAllTierDetails()
+        elif(selection == 22):
             repeat = False
         else:
             print("\nSmarter people have written this, enter valid selection ;)\n")
@@ -450,9 +474,22 @@ def getTierDetails():
     # Here +1 is added because readTier will return 0 for entering 1. The index in Smart Contract is 1 itself, unlike the JSON file.
     tierID = readTier("read")
     origins = Contract.from_abi("OriginsBase", address=values['origins'], abi=OriginsBase.abi, owner=acct)
+    partA, partB = readAll([(origins.readTierPartA, [tierID]), (origins.readTierPartB, [tierID])])
+    printTierDetails(tierID, partA, partB)
 
-    minAmount, maxAmount, remainingTokens, saleStartTimestamp, saleEnd, unlockedBP, vestOrLockCliff, vestOrLockDuration, depositRate = origins.readTierPartA(tierID)
-    depositToken, depositType, verificationType, saleEndDurationOrTimestamp, transferType = origins.readTierPartB(tierID)
+# =========================================================================================================================================
+def getAllTierDetails():
+    origins = Contract.from_abi("OriginsBase", address=values['origins'], abi=OriginsBase.abi, owner=acct)
+    tierCount = origins.getTierCount()
+    # Both parts of every tier are read at the same time.
+    parts = readAll([(function, [tierID]) for tierID in range(1, tierCount + 1) for function in (origins.readTierPartA, origins.readTierPartB)])
+    for tierID in range(1, tierCount + 1):
+        printTierDetails(tierID, parts[2 * tierID - 2], parts[2 * tierID - 1])
+
+# =========================================================================================================================================
+def printTierDetails(tierID, partA, partB):
+    minAmount, maxAmount, remainingTokens, saleStartTimestamp, saleEnd, unlockedBP, vestOrLockCliff, vestOrLockDuration, depositRate = partA
+    depositToken, depositType, verificationType, saleEndDurationOrTimestamp, transferType = partB
 
     decimal = int(values['decimal'])
     tokensForSale = remainingTokens / (10 ** decimal)
@@ -0,0 +1,268 @@
+from brownie import *
+from scripts.origins.rpcBatch import eventTopic, getLogs, selector, encodeArgs, concurrentCalls
+
+import os
+import csv
+import json
+import time
+import random
+import numpy as np
+
+# Requires NumPy in the brownie environment (`pip install numpy`).
+resultDir = './build/fees'
+sampleSize = int(os.environ.get('FEE_SAMPLE_SIZE', 50))
+
+# The constants of StakingStorage, which are not all public.
+twoWeeks = 1209600
+maxDuration = 1092 * 24 * 60 * 60
+maxDurationPow2 = 1092 * 1092
+maxVotingWeight = 9
+weightFactor = 10
+
+def main():
+    loadConfig()
+    block = web3.eth.block_number - 1
+    fromBlock = int(values.get('stakingDeployBlock', 0))
+
+    timeBefore = time.time()
+    stakes = indexStakes(values['staking'], fromBlock, block)
+    print("Indexed", len(stakes['seriesUser']), "stake dates of", len(stakes['users']), "stakers in", round(time.time() - timeBefore, 2), "seconds.")
+
+    for token in feeTokens(values['feeSharing'], fromBlock, block):
+        timeBefore = time.time()
+        checkpoints = indexCheckpoints(values['feeSharing'], token, block)
+        starts = processedCheckpoints(values['feeSharing'], token, stakes['users'], block)
+        amounts = accumulatedFees(checkpoints, stakes, starts)
+        print("\nComputed the fees of", token, "over", len(checkpoints['block']), "checkpoints in", round(time.time() - timeBefore, 2), "seconds.")
+        printTotals(token, stakes['users'], amounts)
+        validate(values['feeSharing'], token, stakes['users'], amounts, block)
+        writeResult(token, stakes['users'], amounts, starts)
+
+# =========================================================================================================================================
+def loadConfig():
+    global values, thisNetwork
+    thisNetwork = network.show_active()
+
+    if thisNetwork == "development":
+        configFile = open('./scripts/origins/values/development.json')
+    elif thisNetwork == "testnet" or thisNetwork == "testnet-ws" or thisNetwork == "rsk-testnet":
+        configFile = open('./scripts/origins/values/testnet.json')
+    elif thisNetwork == "rsk-mainnet":
+        configFile = open('./scripts/origins/values/mainnet.json')
+    else:
+        raise Exception("Network not supported.")
+
+    # Load deployment parameters and contracts addresses
+    values = json.load(configFile)
+
+# =========================================================================================================================================
+def words(result):
+    return [int(result[start:start + 64], 16) for start in range(2, len(result), 64)]
+
+# =========================================================================================================================================
+def feeTokens(feeSharingAddress, fromBlock, toBlock):
+    # Every token with at least one checkpoint.
+    topic = eventTopic("CheckpointAdded(address,address,uint256)")
+    return sorted(set('0x' + log['topics'][2].hex()[-40:] for log in getLogs(feeSharingAddress, [topic], fromBlock, toBlock)))
+
+# =========================================================================================================================================
+def indexCheckpoints(feeSharingAddress, token, block):
+    count = words(concurrentCalls([(feeSharingAddress, selector("numTokenCheckpoints(address)") + encodeArgs([token]))], block)[0])[0]
+    getter = selector("tokenCheckpoints(address,uint256)")
+    results = concurrentCalls([(feeSharingAddress, getter + encodeArgs([token, index])) for index in range(count)], block)
+    rows = [words(result) for result in results]
+    return {
+        'block': np.array([row[0] for row in rows], dtype=np.int64),
+        'timestamp': np.array([row[1] for row in rows], dtype=np.int64),
+        'totalWeightedStake': np.array([row[2] for row in rows], dtype=object),
+        'numTokens': np.array([row[3] for row in rows], dtype=object)
+    }
+
+# =========================================================================================================================================
+def indexStakes(stakingAddress, fromBlock, block):
+    # A user stake only ever exists on a date it was staked or extended to, so the events give every (user, date) series.
+    # The checkpoints of each series are then read from `userStakingCheckpoints` as they are stored.
+    kickoff = words(concurrentCalls([(stakingAddress, selector("kickoffTS()"))], block)[0])[0]
+    staked = eventTopic("TokensStaked(address,uint256,uint256,uint256)")
+    extended = eventTopic("ExtendedStakingDuration(address,uint256,uint256)")
+    series = set()
+    for log in getLogs(stakingAddress, [[staked, extended]], fromBlock, block):
+        user = '0x' + log['topics'][1].hex()[-40:]
+        data = log['data'] if isinstance(log['data'], str) else log['data'].hex()
+        data = data[2:] if data.startswith('0x') else data
+        # The date is the second word of both events: `lockedUntil` and `newDate`.
+        date = int(data[64:128], 16)
+        # Dates off the two week grid are never read by the weighted stake of a checkpoint.
+        if (date - kickoff) % twoWeeks == 0:
+            series.add((user, date))
+    series = sorted(series)
+
+    countGetter = selector("numUserStakingCheckpoints(address,uint256)")
+    counts = [words(result)[0] for result in concurrentCalls([(stakingAddress, countGetter + encodeArgs([user, date])) for user, date in series], block)]
+    getter = selector("userStakingCheckpoints(address,uint256,uint32)")
+    calls, owners = [], []
+    for index, ((user, date), count) in enumerate(zip(series, counts)):
+        for position in range(count):
+            calls.append((stakingAddress, getter + encodeArgs([user, date, position])))
+            owners.append(index)
+    rows = [words(result) for result in concurrentCalls(calls, block)]
+
+    users = sorted(set(user for user, date in series))
+    userIndex = {user: index for index, user in enumerate(users)}
+    return {
+        'kickoff': kickoff,
+        'users': users,
+        'seriesUser': np.array([userIndex[user] for user, date in series], dtype=np.int64),
+        'seriesDate': np.array([date for user, date in series], dtype=np.int64),
+        # Checkpoints are stored in block order, so (series, fromBlock) is sorted.
+        'series': np.array(owners, dtype=np.int64),
+        'fromBlock': np.array([row[0] for row in rows], dtype=np.int64),
+        'stake': np.array([row[1] for row in rows], dtype=object)
+    }
+
+# =========================================================================================================================================
+def processedCheckpoints(feeSharingAddress, token, users, block):
+    getter = selector("processedCheckpoints(address,address)")
+    results = concurrentCalls([(feeSharingAddress, getter + encodeArgs([user, token])) for user in users], block)
+    return np.array([words(result)[0] for result in results], dtype=np.int64)
+
+# =========================================================================================================================================
+def lockDates(timestamps, kickoff):
+    return kickoff + (timestamps - kickoff) // twoWeeks * twoWeeks
+
+# =========================================================================================================================================
+def weights(dates, startDates):
+    # `computeWeightByDate` for every (date, start date) pair, 0 where the date is outside the 78 periods after the start.
+    remaining = dates[:, None] - startDates[None, :]
+    inRange = (remaining >= 0) & (remaining <= maxDuration)
+    x = (maxDuration - np.clip(remaining, 0, maxDuration)) // (24 * 60 * 60)
+    weight = weightFactor + (maxVotingWeight * weightFactor * (maxDurationPow2 - x * x)) // maxDurationPow2
+    return np.where(inRange, weight, 0)
+
+# =========================================================================================================================================
+def weightedStakes(checkpoints, stakes):
+    # `getPriorWeightedStake(user, checkpoint.blockNumber - 1, checkpoint.timestamp)` of every user at every checkpoint.
+    seriesCount = len(stakes['seriesDate'])
+    checkpointCount = len(checkpoints['block'])
+    result = np.zeros((len(stakes['users']), checkpointCount), dtype=object)
+    if len(stakes['series']) == 0 or checkpointCount == 0:
+        return result
+
+    # The stake of a series at a block is its last checkpoint at or before it, found with one search over all series.
+    shift = np.int64(2 ** 40)
+    series = np.arange(seriesCount, dtype=np.int64)[:, None]
+    keys = stakes['series'] * shift + stakes['fromBlock']
+    queries = series * shift + (checkpoints['block'] - 1)[None, :]
+    positions = np.searchsorted(keys, queries, side='right') - 1
+    found = (positions >= 0) & (stakes['series'][np.maximum(positions, 0)] == series)
+
+    weight = weights(stakes['seriesDate'], lockDates(checkpoints['timestamp'], stakes['kickoff']))
+    seriesIndex, checkpointIndex = np.nonzero(found & (weight > 0))
+    # Stakes are uint96, so the products are exact Python integers. Each date is rounded down on its own, as on chain.
+    weighted = stakes['stake'][positions[seriesIndex, checkpointIndex]] * weight[seriesIndex, checkpointIndex].astype(object) // weightFactor
+    np.add.at(result, (stakes['seriesUser'][seriesIndex], checkpointIndex), weighted)
+    return result
+
+# =========================================================================================================================================
+def accumulatedFees(checkpoints, stakes, starts):
+    # `_getAccumulatedFees` keeps the weighted stake of the first checkpoint of a lock date for the following checkpoints
+    # with the same lock date, starting again at the first unprocessed checkpoint of the user. So every checkpoint uses the
+    # weighted stake at its anchor: the start of its run of equal lock dates, or the user's start if that is later.
+    checkpointCount = len(checkpoints['block'])
+    if checkpointCount == 0:
+        return np.zeros(len(stakes['users']), dtype=object)
+    weighted = weightedStakes(checkpoints, stakes)
+
+    dates = lockDates(checkpoints['timestamp'], stakes['kickoff'])
+    index = np.arange(checkpointCount)
+    runStart = np.maximum.accumulate(np.where(np.concatenate([[True], dates[1:] != dates[:-1]]), index, 0))
+    anchors = np.maximum(runStart[None, :], starts[:, None])
+    share = np.take_along_axis(weighted, np.minimum(anchors, checkpointCount - 1), axis=1) * checkpoints['numTokens'][None, :]
+    # A checkpoint without any weighted stake makes the view revert on chain, here it adds nothing.
+    total = checkpoints['totalWeightedStake']
+    share = np.where((index[None, :] >= starts[:, None]) & (total > 0)[None, :], share // np.where(total > 0, total, 1)[None, :], 0)
+    return share.sum(axis=1)
+
+# =========================================================================================================================================
+def validate(feeSharingAddress, token, users, amounts, block, size=sampleSize):
+    # Compares a random sample with `getAccumulatedFees` at the same block.
+    sample = random.sample(range(len(users)), min(size, len(users)))
+    getter = selector("getAccumulatedFees(address,address)")
+    timeBefore = time.time()
+    results = concurrentCalls([(feeSharingAddress, getter + encodeArgs([users[index], token])) for index in sample], block)
+    seconds = time.time() - timeBefore
+    mismatches = [(users[index], amounts[index], words(result)[0]) for index, result in zip(sample, results) if words(result)[0] != amounts[index]]
+    print("Validated", len(sample), "stakers against getAccumulatedFees in", round(seconds, 2), "seconds,", len(mismatches), "mismatches.")
+    for user, computed, onChain in mismatches:
+        print("Mismatch for", user, "computed", computed, "on chain", onChain)
+    return mismatches
+
+# =========================================================================================================================================
+def printTotals(token, users, amounts):
+    print("=============================================================")
+    print("Fee Token:           ", token)
+    print("Stakers:             ", len(users))
+    print("With Fees to Claim:  ", int(np.count_nonzero(amounts)))
+    print("Total to Claim:      ", sum(amounts))
+    print("=============================================================")
+
+# =========================================================================================================================================
+def writeResult(token, users, amounts, starts):
+    os.makedirs(resultDir, exist_ok=True)
+    path = os.path.join(resultDir, thisNetwork + '-' + token.lower() + '.csv')
+    with open(path, "w", newline='') as fileHandle:
+        writer = csv.writer(fileHandle)
+        writer.writerow(['user', 'accumulatedFees', 'processedCheckpoints'])
+        for user, amount, start in zip(users, amounts, starts):
+            if amount > 0:
+                writer.writerow([user, amount, start])
+    print("Entitlements written to", path)
+
+# =========================================================================================================================================
+def simulate():
+    # Builds stakes and fee checkpoints on the fixture, and checks every staker against `getAccumulatedFees`.
+    global values
+    from scripts.origins import fixtureCache
+
+    loadConfig()
+    if thisNetwork != "development":
+        raise Exception("Simulation is only supported on development.")
+    fixtureCache.loadConfig()
+    values = fixtureCache.loadFixture()
+    acct = fixtureCache.acct
+    generator = random.Random(int(os.environ.get('FEE_SEED', 1)))
+    staking = Contract.from_abi("Staking", address=values['staking'], abi=Staking.abi, owner=acct)
+    feeSharing = Contract.from_abi("FeeSharingProxy", address=values['feeSharing'], abi=FeeSharingProxy.abi, owner=acct)
+    token = Contract.from_abi("Token", address=values['token'], abi=Token.abi, owner=acct)
+    feeToken = acct.deploy(Token, 10 ** 30, "Fee Token", "FEE", 18)
+    token.approve(staking, 10 ** 27)
+    feeToken.approve(feeSharing, 10 ** 30)
+
+    # Stakers are plain addresses staked for by the deployer, apart from one account which withdraws part of its fees.
+    stakers = [accounts[1].address] + ['0x' + generator.getrandbits(160).to_bytes(20, 'big').hex() for index in range(int(os.environ.get('FEE_STAKERS', 40)))]
+    rounds = int(os.environ.get('FEE_ROUNDS', 8))
+    for iteration in range(rounds):
+        for staker in generator.sample(stakers, len(stakers) // 3):
+            until = chain.time() + generator.randint(2, 75) * twoWeeks
+            staking.stake(generator.randint(1, 1000) * (10 ** 18), until, staker, staker)
+        # Mostly more than a lock date apart, sometimes in the same one.
+        chain.sleep(generator.choice([1, 1, 3, 15]) * 24 * 60 * 60 + 1)
+        chain.mine()
+        feeSharing.transferTokens(feeToken, generator.randint(1, 100) * (10 ** 18))
+        if iteration == rounds // 2:
+            chain.mine()
+            feeSharing.withdraw(feeToken, 2, accounts[1], {'from': accounts[1]})
+    chain.mine()
+
+    block = web3.eth.block_number - 1
+    timeBefore = time.time()
+    stakes = indexStakes(values['staking'], 0, block)
+    checkpoints = indexCheckpoints(values['feeSharing'], feeToken.address, block)
+    starts = processedCheckpoints(values['feeSharing'], feeToken.address, stakes['users'], block)
+    amounts = accumulatedFees(checkpoints, stakes, starts)
+    print("\nIndexed and computed", len(stakes['users']), "stakers in", round(time.time() - timeBefore, 2), "seconds.")
+    printTotals(feeToken.address, stakes['users'], amounts)
+    mismatches = validate(values['feeSharing'], feeToken.address, stakes['users'], amounts, block, len(stakes['users']))
+    fixtureCache.revertToFixture()
+    if len(mismatches) > 0:
+        raise Exception("Computed fees do not match getAccumulatedFees.")
@@ -0,0 +1,257 @@
+from brownie import *
+
+import os
+import time
+import json
+import hashlib
+
+# The cache lives with the other brownie build artifacts.
+fixtureDir = './build/fixtures'
+contractsDir = './contracts'
+templateFile = './scripts/origins/values/template.json'
+
+def main():
+    loadConfig()
+
+    timeBefore = time.time()
+    loadFixture()
+    print("\nFixture ready in", round(time.time() - timeBefore, 2), "seconds.")
+
+    results = runScenarios(scenarioList())
+
+    print("\n=============================================================")
+    print("Scenario Results")
+    print("=============================================================")
+    for result in results:
+        print(result['name'].ljust(30), str(result['status']).ljust(8), result['time'], "seconds")
+    print("=============================================================")
+
+# =========================================================================================================================================
+def loadConfig():
+    global acct, thisNetwork
+    thisNetwork = network.show_active()
+
+    # Snapshots and time travel only exist on a local chain.
+    if thisNetwork == "development":
+        acct = accounts[0]
+    else:
+        raise Exception("Network not supported.")
+
+# =========================================================================================================================================
+def fixtureHash():
+    # Any change to a contract or to the values template invalidates the cached deployment.
+    digest = hashlib.sha256()
+    for root, dirs, files in sorted(os.walk(contractsDir)):
+        dirs.sort()
+        for fileName in sorted(files):
+            path = os.path.join(root, fileName)
+            digest.update(path.encode())
+            with open(path, 'rb') as fileHandle:
+                digest.update(fileHandle.read())
+    with open(templateFile, 'rb') as fileHandle:
+        digest.update(fileHandle.read())
+    return digest.hexdigest()
+
+# =========================================================================================================================================
+def cacheFile():
+    return os.path.join(fixtureDir, fixtureHash() + '.json')
+
+# =========================================================================================================================================
+def takeSnapshot():
+    return web3.provider.make_request("evm_snapshot", [])['result']
+
+# =========================================================================================================================================
+def restoreSnapshot(cached):
+    # A snapshot id is only meaningful on the very chain which produced it,
+    # so the block recorded with it has to still be there with the same hash.
+    try:
+        block = web3.eth.get_block(cached['blockNumber'])
+    except Exception:
+        return False
+    if block is None or block.hash.hex() != cached['blockHash']:
+        return False
+    return web3.provider.make_request("evm_revert", [cached['snapshot']]).get('result', False)
+
+# =========================================================================================================================================
+def loadFixture():
+    global values
+    path = cacheFile()
+
+    cached = None
+    if os.path.exists(path):
+        with open(path) as fileHandle:
+            cached = json.load(fileHandle)
+
+    if cached is not None and restoreSnapshot(cached):
+        print("\nReverted to the cached fixture", os.path.basename(path))
+        values = cached['values']
+    else:
+        print("\nNo usable fixture in cache, deploying everything...")
+        values = deployFixture()
+
+    # `evm_revert` consumes the snapshot, so a fresh one is always stored for the next run.
+    latest = web3.eth.get_block('latest')
+    cached = {
+        'snapshot': takeSnapshot(),
+        'blockNumber': latest.number,
+        'blockHash': latest.hash.hex(),
+        'values': values
+    }
+    os.makedirs(fixtureDir, exist_ok=True)
+    with open(path, "w") as fileHandle:
+        json.dump(cached, fileHandle, indent=4)
+
+    # The in session snapshot is taken after the cached one, so reverting to it leaves the cached one intact.
+    chain.snapshot()
+    return values
+
+# =========================================================================================================================================
+def revertToFixture():
+    chain.revert()
+    return values
+
+# =========================================================================================================================================
+def deployFixture():
+    with open(templateFile) as fileHandle:
+        fixtureValues = json.load(fileHandle)
+
+    decimal = 18
+    tokenAmount = 1000000000 * (10 ** decimal)
+    waitedTS = chain.time() + (7*24*60*60)
+
+    token = acct.deploy(Token, tokenAmount, "Origins Fixture Token", "OFT", decimal)
+
+    stakingLogic = acct.deploy(Staking)
+    staking = acct.deploy(StakingProxy, token)
+    staking.setImplementation(stakingLogic)
+    staking = Contract.from_abi("Staking", address=staking.address, abi=Staking.abi, owner=acct)
+    feeSharing = acct.deploy(FeeSharingProxy, "0x0000000000000000000000000000000000000000", staking)
+
+    vestingLogic = acct.deploy(VestingLogic)
+    vestingFactory = acct.deploy(VestingFactory, vestingLogic)
+    vestingRegistry = acct.deploy(VestingRegistry3, vestingFactory, token, staking, feeSharing, acct)
+    vestingFactory.transferOwnership(vestingRegistry)
+
+    lockedFund = acct.deploy(LockedFund, waitedTS, token, vestingRegistry, [acct])
+    vestingRegistry.addAdmin(lockedFund)
+
+    origins = acct.deploy(OriginsBase, [acct], token, acct)
+    origins.setLockedFund(lockedFund)
+    lockedFund.addAdmin(origins)
+    origins.addVerifier(acct)
+
+    fixtureValues['token'] = str(token)
+    fixtureValues['decimal'] = str(decimal)
+    fixtureValues['multisig'] = str(acct)
+    fixtureValues['originsVerifiers'] = [str(acct)]
+    fixtureValues['depositAddress'] = str(acct)
+    fixtureValues['waitedTimestamp'] = str(waitedTS)
+    fixtureValues['staking'] = str(staking)
+    fixtureValues['feeSharing'] = str(feeSharing)
+    fixtureValues['vestingRegistry'] = str(vestingRegistry)
+    fixtureValues['lockedFund'] = str(lockedFund)
+    fixtureValues['origins'] = str(origins)
+    fixtureValues['tiers'] = [fixtureValues['tiers'][0], fixtureTier(3, 2), fixtureTier(1, 1)]
+    fixtureValues['toVerify'] = [str(account) for account in accounts[1:6]]
+    fixtureValues['verified'] = []
+    return fixtureValues
+
+# =========================================================================================================================================
+def fixtureTier(transferType, verificationType):
+    # The sale start is left empty here and set to the chain time when the scenario creates the tier.
+    return {
+        "minimumAmount": "1",
+        "maximumAmount": str(10 ** 18),
+        "tokensForSale": "1000000",
+        "saleStartTimestamp": "",
+        "saleEnd": str(3*24*60*60),
+        "unlockedBP": "5000",
+        "vestOrLockCliff": "1",
+        "vestOrLockDuration": "11",
+        "depositRate": "100",
+        "depositToken": "0x0000000000000000000000000000000000000000",
+        "depositType": "0",
+        "verificationType": str(verificationType),
+        "saleEndDurationOrTimestamp": "2",
+        "transferType": str(transferType)
+    }
+
+# =========================================================================================================================================
+def getOrigins():
+    return Contract.from_abi("OriginsBase", address=values['origins'], abi=OriginsBase.abi, owner=acct)
+
+# =========================================================================================================================================
+def createTier(tierID):
+    origins = getOrigins()
+    token = Contract.from_abi("Token", address=values['token'], abi=Token.abi, owner=acct)
+    tier = values['tiers'][tierID]
+    remainingTokens = int(tier['tokensForSale']) * (10 ** int(values['decimal']))
+
+    token.approve(origins, remainingTokens)
+    origins.createTier(
+        tier['maximumAmount'], remainingTokens, chain.time(), tier['saleEnd'], tier['unlockedBP'],
+        tier['vestOrLockCliff'], tier['vestOrLockDuration'], tier['depositRate'], tier['depositType'],
+        tier['verificationType'], tier['saleEndDurationOrTimestamp'], tier['transferType']
+    )
+    return origins.getTierCount()
+
+# =========================================================================================================================================
+def scenarioCreateTier():
+    createTier(1)
+    createTier(2)
+    assert getOrigins().getTierCount() == 2
+
+# =========================================================================================================================================
+def scenarioVerification():
+    tierID = createTier(1)
+    origins = getOrigins()
+    origins.multipleAddressSingleTierVerification(values['toVerify'], tierID)
+    for address in values['toVerify']:
+        assert origins.isAddressApproved(address, tierID)
+
+# =========================================================================================================================================
+def scenarioBuy():
+    tierID = createTier(2)
+    origins = getOrigins()
+    token = Contract.from_abi("Token", address=values['token'], abi=Token.abi, owner=acct)
+    origins.buy(tierID, 0, {'from': accounts[1], 'value': 10 ** 16})
+    assert token.balanceOf(accounts[1]) == (10 ** 16) * int(values['tiers'][tierID]['depositRate'])
+
+# =========================================================================================================================================
+def scenarioVesting():
+    tierID = createTier(1)
+    origins = getOrigins()
+    lockedFund = Contract.from_abi("LockedFund", address=values['lockedFund'], abi=LockedFund.abi, owner=acct)
+    origins.addressVerification(accounts[1], tierID)
+    origins.buy(tierID, 0, {'from': accounts[1], 'value': 10 ** 16})
+
+    chain.sleep(int(values['waitedTimestamp']) - chain.time() + 1)
+    chain.mine()
+    lockedFund.withdrawAndStakeTokens(accounts[1], {'from': accounts[1]})
+    assert lockedFund.getVestedBalance(accounts[1]) == 0
+    assert lockedFund.getWaitedUnlockedBalance(accounts[1]) == 0
+
+# =========================================================================================================================================
+def scenarioList():
+    return [
+        ("Tier Creation", scenarioCreateTier),
+        ("Verification", scenarioVerification),
+        ("Buy", scenarioBuy),
+        ("Vesting", scenarioVesting)
+    ]
+
+# =========================================================================================================================================
+def runScenarios(scenarios):
+    results = []
+    for name, scenario in scenarios:
+        revertToFixture()
+        timeBefore = time.time()
+        try:
+            scenario()
+            status = "Passed"
+        except Exception as e:
+            print("\nScenario", name, "failed:", e)
+            status = "Failed"
+        results.append({'name': name, 'status': status, 'time': round(time.time() - timeBefore, 2)})
+    revertToFixture()
+    return results
@@ -0,0 +1,75 @@
+from brownie import *
+from concurrent.futures import ThreadPoolExecutor
+
+import os
+import requests
+
+# Calls per JSON-RPC batch, and how many batches are in flight at the same time.
+rpcBatchSize = int(os.environ.get('RPC_BATCH_SIZE', 50))
+rpcWorkers = int(os.environ.get('RPC_WORKERS', 4))
+# Blocks per `eth_getLogs` request, nodes refuse ranges which are too wide.
+logChunkSize = int(os.environ.get('LOG_CHUNK_SIZE', 5000))
+
+# =========================================================================================================================================
+def eventTopic(signature):
+    return web3.keccak(text=signature).hex()
+
+# =========================================================================================================================================
+def addressTopic(address):
+    return '0x' + address[2:].lower().rjust(64, '0')
+
+# =========================================================================================================================================
+def topicAddress(topic):
+    return '0x' + topic.hex()[-40:]
+
+# =========================================================================================================================================
+def getLogs(address, topics, fromBlock, toBlock):
+    logs = []
+    start = fromBlock
+    while start <= toBlock:
+        end = min(start + logChunkSize - 1, toBlock)
+        logs += web3.eth.get_logs({'address': address, 'topics': topics, 'fromBlock': start, 'toBlock': end})
+        start = end + 1
+    return logs
+
+# =========================================================================================================================================
+def selector(signature):
+    return web3.keccak(text=signature)[:4].hex()
+
+# =========================================================================================================================================
+def encodeArgs(args):
+    # Only address and uint256 arguments are needed here, both are a single padded word.
+    encoded = ''
+    for arg in args:
+        if isinstance(arg, str):
+            encoded += arg[2:].lower().rjust(64, '0')
+        else:
+            encoded += hex(arg)[2:].rjust(64, '0')
+    return encoded
+
+# =========================================================================================================================================
+def batchCall(calls, block):
+    # One JSON-RPC batch of `eth_call`s pinned to `block`, answers as raw hex in the order of `calls`.
+    # Providers without an HTTP endpoint (websocket) fall back to one call at a time.
+    blockTag = hex(block)
+    payload = [
+        {'jsonrpc': '2.0', 'id': index, 'method': 'eth_call', 'params': [{'to': to, 'data': data}, blockTag]}
+        for index, (to, data) in enumerate(calls)
+    ]
+    endpoint = getattr(web3.provider, 'endpoint_uri', None)
+    if endpoint is not None and str(endpoint).startswith('http'):
+        response = sorted(requests.post(endpoint, json=payload, timeout=120).json(), key=lambda item: item['id'])
+    else:
+        response = [web3.provider.make_request(item['method'], item['params']) for item in payload]
+    for item in response:
+        if 'error' in item:
+            raise Exception("Batched call failed: " + str(item['error']))
+    return [item['result'] for item in response]
+
+# =========================================================================================================================================
+def concurrentCalls(calls, block):
+    # Splits the calls into batches of `rpcBatchSize` which are sent by `rpcWorkers` threads at the same time.
+    batches = [calls[start:start + rpcBatchSize] for start in range(0, len(calls), rpcBatchSize)]
+    with ThreadPoolExecutor(max_workers=rpcWorkers) as executor:
+        results = executor.map(lambda batch: batchCall(batch, block), batches)
+    return [result for batch in results for result in batch]
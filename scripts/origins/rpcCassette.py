@@ -0,0 +1,195 @@
+from brownie import *
+from web3 import Web3
+from web3.providers.base import BaseProvider
+
+import os
+import sys
+import json
+import time
+import gzip
+import atexit
+import hashlib
+
+# Run `brownie run scripts/origins/rpcCassette.py --network [NETWORK]` to record the read operations against a node,
+# and `python scripts/origins/rpcCassette.py [CASSETTE] [ITERATIONS]` to replay them offline.
+defaultCassette = './build/cassettes/origins.json.gz'
+originsBuild = './build/contracts/OriginsBase.json'
+
+def main():
+    loadConfig()
+
+    recorder = installRecorder(defaultCassette)
+    origins = web3.eth.contract(address=Web3.toChecksumAddress(values['origins']), abi=OriginsBase.abi)
+
+    timeBefore = time.time()
+    printReads(readAll(origins))
+    timeAfter = time.time()
+    recorder.save()
+
+    print("\n=============================================================")
+    print("Recorded Requests:   ", recorder.count)
+    print("Time Taken:          ", round(timeAfter - timeBefore, 4), "seconds")
+    print("Cassette:            ", defaultCassette)
+    print("=============================================================")
+
+# =========================================================================================================================================
+def loadConfig():
+    global values, thisNetwork
+    thisNetwork = network.show_active()
+
+    if thisNetwork == "development":
+        configFile = open('./scripts/origins/values/development.json')
+    elif thisNetwork == "testnet" or thisNetwork == "testnet-ws" or thisNetwork == "rsk-testnet":
+        configFile = open('./scripts/origins/values/testnet.json')
+    elif thisNetwork == "rsk-mainnet":
+        configFile = open('./scripts/origins/values/mainnet.json')
+    else:
+        raise Exception("Network not supported.")
+
+    # Load deployment parameters and contracts addresses
+    values = json.load(configFile)
+
+# =========================================================================================================================================
+def toSerializable(item):
+    if isinstance(item, (bytes, bytearray)):
+        return '0x' + bytes(item).hex()
+    if isinstance(item, dict):
+        return dict(item)
+    raise TypeError("Cannot serialize " + str(type(item)))
+
+# =========================================================================================================================================
+def contentKey(item):
+    # Identical requests (or responses) always map to the same key, which is what makes the cassette content-addressed.
+    encoded = json.dumps(item, sort_keys=True, separators=(',', ':'), default=toSerializable)
+    return hashlib.sha256(encoded.encode()).hexdigest()[:32]
+
+# =========================================================================================================================================
+def requestKey(method, params):
+    return contentKey({'method': method, 'params': params})
+
+# =========================================================================================================================================
+class RecordingProvider(BaseProvider):
+    # Passes every request to the wrapped provider and keeps the response.
+    # A request which is repeated with different answers (`eth_blockNumber` for example) keeps every answer in order.
+
+    def __init__(self, provider, path):
+        super().__init__()
+        self.provider = provider
+        self.path = path
+        self.requests = {}
+        self.responses = {}
+        self.count = 0
+
+    def make_request(self, method, params):
+        response = self.provider.make_request(method, params)
+        stored = {key: response[key] for key in ('result', 'error') if key in response}
+        responseKey = contentKey(stored)
+        self.responses[responseKey] = stored
+        self.requests.setdefault(requestKey(method, params), []).append(responseKey)
+        self.count += 1
+        return response
+
+    def isConnected(self):
+        return self.provider.isConnected()
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        cassette = {'version': 1, 'requests': self.requests, 'responses': self.responses}
+        with gzip.open(self.path, 'wt') as fileHandle:
+            json.dump(cassette, fileHandle, separators=(',', ':'))
+
+# =========================================================================================================================================
+class ReplayProvider(BaseProvider):
+    # Answers from a cassette only, no request ever leaves the process.
+
+    def __init__(self, path):
+        super().__init__()
+        with gzip.open(path, 'rt') as fileHandle:
+            cassette = json.load(fileHandle)
+        self.requests = cassette['requests']
+        self.responses = cassette['responses']
+        self.position = {}
+        self.count = 0
+
+    def make_request(self, method, params):
+        key = requestKey(method, params)
+        if key not in self.requests:
+            raise Exception("Request " + method + " was not recorded in the cassette.")
+        # Answers are replayed in the order they were recorded, the last one is repeated afterwards.
+        answers = self.requests[key]
+        index = self.position.get(key, 0)
+        self.position[key] = min(index + 1, len(answers) - 1)
+        self.count += 1
+        response = {'jsonrpc': '2.0', 'id': self.count}
+        response.update(self.responses[answers[index]])
+        return response
+
+    def isConnected(self):
+        return True
+
+    def rewind(self):
+        self.position = {}
+
+# =========================================================================================================================================
+def installRecorder(path):
+    recorder = RecordingProvider(web3.provider, path)
+    web3.provider = recorder
+    atexit.register(recorder.save)
+    return recorder
+
+# =========================================================================================================================================
+def installReplay(path):
+    replay = ReplayProvider(path)
+    web3.provider = replay
+    return replay
+
+# =========================================================================================================================================
+def readAll(origins):
+    tierCount = origins.functions.getTierCount().call()
+    reads = {
+        'tierCount': tierCount,
+        'owners': origins.functions.getOwners().call(),
+        'verifiers': origins.functions.getVerifiers().call(),
+        'tiers': {}
+    }
+    for tierID in range(1, tierCount + 1):
+        reads['tiers'][tierID] = origins.functions.readTierPartA(tierID).call() + origins.functions.readTierPartB(tierID).call()
+    return reads
+
+# =========================================================================================================================================
+def printReads(reads):
+    print("\n=============================================================")
+    print("Tier Count:          ", reads['tierCount'])
+    print("Owner List:          ", reads['owners'])
+    print("Verifier List:       ", reads['verifiers'])
+    for tierID, tier in reads['tiers'].items():
+        print("Tier", tierID, "Details:     ", tier)
+    print("=============================================================")
+
+# =========================================================================================================================================
+def replay(path, iterations):
+    provider = ReplayProvider(path)
+    with open(originsBuild) as fileHandle:
+        abi = json.load(fileHandle)['abi']
+    with open('./scripts/origins/values/' + os.environ.get('ORIGINS_VALUES', 'mainnet') + '.json') as fileHandle:
+        address = json.load(fileHandle)['origins']
+    origins = Web3(provider).eth.contract(address=Web3.toChecksumAddress(address), abi=abi)
+
+    first = readAll(origins)
+    printReads(first)
+
+    timeBefore = time.time()
+    for iteration in range(iterations):
+        provider.rewind()
+        if readAll(origins) != first:
+            raise Exception("Replay was not deterministic on iteration " + str(iteration) + ".")
+    timeTaken = time.time() - timeBefore
+
+    print("\n=============================================================")
+    print("Iterations:          ", iterations)
+    print("Requests Replayed:   ", provider.count)
+    print("Time per Iteration:  ", round(timeTaken / max(iterations, 1) * 1000, 4), "ms")
+    print("=============================================================")
+
+if __name__ == "__main__":
+    replay(sys.argv[1] if len(sys.argv) > 1 else defaultCassette, int(sys.argv[2]) if len(sys.argv) > 2 else 100)
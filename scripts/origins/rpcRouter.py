@@ -0,0 +1,319 @@
+from brownie import *
+from web3.providers.base import BaseProvider
+from scripts.origins.asyncRpc import retryCodes, percentile, startProxy, endpointOf
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from collections import deque
+
+import os
+import time
+import random
+import socket
+import threading
+import requests
+import subprocess
+
+# Latencies and outcomes kept per endpoint.
+routerWindow = int(os.environ.get('ROUTER_WINDOW', 100))
+# A read still running at this percentile of its endpoint's latencies is sent to the next endpoint as well.
+hedgePercentile = float(os.environ.get('ROUTER_HEDGE_PERCENTILE', 0.9))
+hedgeMinDelay = float(os.environ.get('ROUTER_HEDGE_MIN_DELAY', 0.05))
+# Used until an endpoint has answered `hedgeMinSamples` times.
+hedgeDefaultDelay = float(os.environ.get('ROUTER_HEDGE_DEFAULT_DELAY', 0.5))
+hedgeMinSamples = 20
+# An endpoint failing more than this share of its recent requests is left out for `routerCooldown` seconds.
+maxErrorRate = float(os.environ.get('ROUTER_MAX_ERROR_RATE', 0.5))
+routerCooldown = float(os.environ.get('ROUTER_COOLDOWN', 30))
+routerTimeout = float(os.environ.get('ROUTER_TIMEOUT', 30))
+# Every this many reads go to a random healthy endpoint first, so a node which was slow for a while gets measured again.
+probeInterval = int(os.environ.get('ROUTER_PROBE_INTERVAL', 20))
+# Seconds a known block number of an endpoint is trusted before it is asked again.
+headInterval = float(os.environ.get('ROUTER_HEAD_INTERVAL', 0.5))
+
+# Requests which have to see the same node every time: what is sent, the nonces and gas estimates it is based on,
+# and its receipts. Other reads only go to nodes which reached the block of the last receipt seen on that node.
+pinnedMethods = [
+    'eth_sendTransaction', 'eth_sendRawTransaction', 'eth_getTransactionCount', 'eth_getTransactionReceipt',
+    'eth_getTransactionByHash', 'eth_estimateGas', 'eth_accounts', 'eth_sign', 'eth_signTypedData', 'personal_sign'
+]
+pinnedPrefixes = ['evm_', 'miner_', 'personal_']
+
+def main():
+    # Shows the health of the endpoints of `RPC_ENDPOINTS` after a few reads.
+    router = installRouter(os.environ['RPC_ENDPOINTS'].split(','))
+    for iteration in range(20):
+        web3.eth.block_number
+    printHealth(router)
+
+# =========================================================================================================================================
+class NodeFailure(Exception):
+    pass
+
+# =========================================================================================================================================
+class Endpoint:
+
+    def __init__(self, url):
+        self.url = url
+        self.session = requests.Session()
+        self.lock = threading.Lock()
+        self.latencies = deque(maxlen=routerWindow)
+        self.outcomes = deque(maxlen=routerWindow)
+        self.unhealthyUntil = 0
+        self.head = 0
+        self.headCheckedAt = 0
+        self.requests = 0
+        self.errors = 0
+        self.wins = 0
+
+    def post(self, method, params, requestId):
+        # Transport errors, rate limits and overloaded answers are failures of the node. Other JSON-RPC errors
+        # (a revert for example) are answers, and are passed on as they are.
+        timeBefore = time.time()
+        try:
+            response = self.session.post(self.url, json={'jsonrpc': '2.0', 'id': requestId, 'method': method, 'params': params}, timeout=routerTimeout)
+            if response.status_code != 200:
+                raise NodeFailure(self.url + " answered HTTP " + str(response.status_code))
+            body = response.json()
+            if 'error' in body and body['error'].get('code') in retryCodes:
+                raise NodeFailure(self.url + " answered " + str(body['error']))
+        except (requests.RequestException, ValueError, NodeFailure) as e:
+            self.record(time.time() - timeBefore, False)
+            raise NodeFailure(str(e))
+        self.record(time.time() - timeBefore, True)
+        return body
+
+    def record(self, seconds, success):
+        with self.lock:
+            self.requests += 1
+            self.outcomes.append(success)
+            if success:
+                self.latencies.append(seconds)
+            else:
+                self.errors += 1
+                if len(self.outcomes) >= 5 and self.outcomes.count(False) / len(self.outcomes) > maxErrorRate:
+                    self.unhealthyUntil = time.time() + routerCooldown
+                    self.outcomes.clear()
+
+    def median(self):
+        # A single stall does not move the median, the hedge takes care of those.
+        return percentile(list(self.latencies), 0.5)
+
+    def healthy(self):
+        return time.time() >= self.unhealthyUntil
+
+    def reached(self, block):
+        # Whether the node is at `block` or later, its block number is asked at most every `headInterval` seconds.
+        if self.head < block and time.time() - self.headCheckedAt >= headInterval:
+            self.headCheckedAt = time.time()
+            try:
+                self.head = int(self.post('eth_blockNumber', [], 0)['result'], 16)
+            except (NodeFailure, KeyError, ValueError):
+                return False
+        return self.head >= block
+
+    def hedgeDelay(self):
+        if len(self.latencies) < hedgeMinSamples:
+            return hedgeDefaultDelay
+        return max(hedgeMinDelay, percentile(list(self.latencies), hedgePercentile))
+
+# =========================================================================================================================================
+class RoutingProvider(BaseProvider):
+    # Sends reads to the fastest healthy endpoint, and hedges a read which runs longer than usual on that endpoint
+    # with the next one, taking whichever answers first. Transactions and everything they depend on stay on one node.
+
+    def __init__(self, urls):
+        super().__init__()
+        self.endpoints = [Endpoint(url) for url in urls]
+        self.executor = ThreadPoolExecutor(max_workers=4 * len(self.endpoints))
+        self.lock = threading.Lock()
+        self.requestId = 0
+        self.pinned = None
+        self.minBlock = 0
+        self.hedges = 0
+        self.pinnedRequests = {}
+
+    def nextId(self):
+        with self.lock:
+            self.requestId += 1
+            return self.requestId
+
+    def ranked(self, probe=False, synced=False):
+        # Healthy endpoints by their median latency (unknown ones first, to measure them), then the others as a last resort.
+        # With `synced`, only endpoints which reached the block of the last pinned receipt, or the pinned node itself.
+        endpoints = self.endpoints
+        if synced and self.minBlock > 0:
+            endpoints = [endpoint for endpoint in endpoints if endpoint is self.pinned or endpoint.reached(self.minBlock)]
+        healthy = sorted([endpoint for endpoint in endpoints if endpoint.healthy()], key=lambda endpoint: endpoint.median())
+        if probe and len(healthy) > 1:
+            healthy.insert(0, healthy.pop(random.randrange(1, len(healthy))))
+        return healthy + [endpoint for endpoint in endpoints if not endpoint.healthy()]
+
+    def pinnedEndpoint(self):
+        with self.lock:
+            if self.pinned is None or not self.pinned.healthy():
+                self.pinned = self.ranked()[0]
+            return self.pinned
+
+    def make_request(self, method, params):
+        if method in pinnedMethods or any(method.startswith(prefix) for prefix in pinnedPrefixes):
+            return self.sendPinned(method, params)
+        return self.sendHedged(method, params)
+
+    def sendPinned(self, method, params):
+        # A failed submission is not sent elsewhere, as it may have reached the node. The pinned node is only replaced
+        # once it is left out as unhealthy.
+        endpoint = self.pinnedEndpoint()
+        self.pinnedRequests[endpoint.url] = self.pinnedRequests.get(endpoint.url, 0) + 1
+        response = endpoint.post(method, params, self.nextId())
+        if method == 'eth_getTransactionReceipt' and isinstance(response.get('result'), dict):
+            block = int(response['result'].get('blockNumber') or '0x0', 16)
+            with self.lock:
+                self.minBlock = max(self.minBlock, block)
+            endpoint.head = max(endpoint.head, block)
+        return response
+
+    def sendHedged(self, method, params):
+        requestId = self.nextId()
+        candidates = self.ranked(requestId % probeInterval == 0, True)
+        running = {}
+        lastError = None
+
+        def start(endpoint):
+            running[self.executor.submit(endpoint.post, method, params, requestId)] = endpoint
+
+        start(candidates.pop(0))
+        firstDelay = list(running.values())[0].hedgeDelay()
+        done, pending = wait(running, timeout=firstDelay)
+        while True:
+            for future in done:
+                endpoint = running.pop(future)
+                try:
+                    result = future.result()
+                    endpoint.wins += 1
+                    return result
+                except NodeFailure as e:
+                    lastError = e
+            # Hedge a slow read, or move on after a failure.
+            if len(candidates) > 0 and (len(pending) == 0 or len(running) == 1):
+                if len(pending) > 0:
+                    self.hedges += 1
+                start(candidates.pop(0))
+            if len(running) == 0:
+                raise lastError
+            done, pending = wait(running, return_when=FIRST_COMPLETED)
+
+    def isConnected(self):
+        return any(endpoint.healthy() for endpoint in self.endpoints)
+
+# =========================================================================================================================================
+def installRouter(urls):
+    router = RoutingProvider([url.strip() for url in urls if url.strip() != ''])
+    web3.provider = router
+    return router
+
+# =========================================================================================================================================
+def printHealth(router):
+    print("\n=============================================================")
+    print("Endpoint".ljust(32), "Requests".rjust(9), "Errors".rjust(7), "Wins".rjust(6), "p50 ms".rjust(8), "p90 ms".rjust(8), "Healthy".rjust(8))
+    for endpoint in router.endpoints:
+        latencies = list(endpoint.latencies)
+        print(
+            endpoint.url[-32:].ljust(32), str(endpoint.requests).rjust(9), str(endpoint.errors).rjust(7), str(endpoint.wins).rjust(6),
+            str(round(percentile(latencies, 0.5) * 1000, 1)).rjust(8), str(round(percentile(latencies, 0.9) * 1000, 1)).rjust(8),
+            str(endpoint.healthy()).rjust(8)
+        )
+    print("-------------------------------------------------------------")
+    print("Hedged Reads:        ", router.hedges)
+    print("Pinned Requests:     ", router.pinnedRequests)
+    print("=============================================================")
+
+# =========================================================================================================================================
+def startFork(target, port):
+    # A second local chain, forking the development chain with the same (unlocked) accounts.
+    command = os.environ.get('ROUTER_GANACHE', 'ganache-cli').split() + ['--port', str(port), '--fork', target, '--mnemonic', 'brownie', '--chainId', str(web3.eth.chain_id)]
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    for attempt in range(100):
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise Exception("The forked chain did not start on port " + str(port) + ".")
+
+# =========================================================================================================================================
+def simulate():
+    # Runs two chains: the development chain and a fork of it, which start with the same state but are separate
+    # processes, as separate nodes would be. Proxies with different delays are put in front of them: a fast and a slow
+    # one in front of the development chain, one which stalls on a share of its requests and one which fails a share
+    # of them in front of the fork. The same reads are timed through the stalling proxy alone and through the router,
+    # and a few transactions check that submission stays on one chain: the other one keeps the nonce it started with.
+    from scripts.origins import fixtureCache
+    from web3 import Web3, HTTPProvider
+
+    if network.show_active() != "development":
+        raise Exception("Simulation is only supported on development.")
+    fixtureCache.loadConfig()
+    fixtureValues = fixtureCache.loadFixture()
+    acct = fixtureCache.acct
+    origins = Contract.from_abi("OriginsBase", address=fixtureValues['origins'], abi=OriginsBase.abi, owner=acct)
+    token = Contract.from_abi("Token", address=fixtureValues['token'], abi=Token.abi, owner=acct)
+
+    basePort = int(os.environ.get('ROUTER_BASE_PORT', 8610))
+    forkPort = int(os.environ.get('ROUTER_FORK_PORT', 8620))
+    target = endpointOf(web3.provider)
+    fork = startFork(target, forkPort)
+    forkTarget = 'http://127.0.0.1:' + str(forkPort)
+    chains = {'development': target, 'fork': forkTarget}
+    profiles = [
+        ('fast', target, 0.01, 0, 0, 0),
+        ('slow', target, 0.08, 0, 0, 0),
+        ('stalling', forkTarget, 0.01, 0, 0.05, 1.5),
+        ('failing', forkTarget, 0.01, 0.3, 0, 0)
+    ]
+    servers = [startProxy(chain, basePort + index, latency, errorRate, stallRate, stallLatency) for index, (name, chain, latency, errorRate, stallRate, stallLatency) in enumerate(profiles)]
+    urls = ['http://127.0.0.1:' + str(basePort + index) for index in range(len(profiles))]
+    readCount = int(os.environ.get('ROUTER_READS', 200))
+    transactionCount = 5
+
+    def timedReads():
+        latencies = []
+        for index in range(readCount):
+            timeBefore = time.time()
+            [origins.getTierCount, origins.getOwners, lambda: token.balanceOf(acct)][index % 3]()
+            latencies.append(time.time() - timeBefore)
+        return latencies
+
+    def nonces():
+        return {name: Web3(HTTPProvider(url)).eth.get_transaction_count(acct.address) for name, url in chains.items()}
+
+    provider = web3.provider
+    try:
+        noncesBefore = nonces()
+        web3.provider = HTTPProvider(urls[2])
+        single = timedReads()
+
+        router = installRouter(urls)
+        routed = timedReads()
+        for index in range(transactionCount):
+            token.approve(origins, index + 1)
+        # Reads after the transactions, which only go to nodes that have their blocks.
+        for index in range(20):
+            if token.allowance(acct, origins) != transactionCount:
+                raise Exception("A read after the transactions saw an older state.")
+        noncesAfter = nonces()
+    finally:
+        web3.provider = provider
+        for server in servers:
+            server.shutdown()
+        fork.terminate()
+        fixtureCache.revertToFixture()
+
+    print("\n=============================================================")
+    print("Reads".ljust(24), "p50 ms".rjust(8), "p95 ms".rjust(8), "p99 ms".rjust(8), "Max ms".rjust(8))
+    for name, latencies in [('Stalling node alone', single), ('Router', routed)]:
+        print(name.ljust(24), *[str(round(value * 1000, 1)).rjust(8) for value in [percentile(latencies, 0.5), percentile(latencies, 0.95), percentile(latencies, 0.99), max(latencies)]])
+    printHealth(router)
+    sent = sorted(noncesAfter[name] - noncesBefore[name] for name in chains)
+    print("Transactions per Chain:", {name: noncesAfter[name] - noncesBefore[name] for name in chains})
+    if sent != [0, transactionCount]:
+        raise Exception("Transactions were split between the chains.")
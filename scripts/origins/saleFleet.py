@@ -0,0 +1,308 @@
+from brownie import *
+from concurrent.futures import ThreadPoolExecutor
+
+import os
+import time
+import json
+import threading
+
+# Upper bound on the sales handled at the same time, each worker holds one RPC connection busy.
+fleetWorkers = int(os.environ.get('FLEET_WORKERS', 8))
+snapshotDir = './build/fleet'
+# Deployed addresses are written back to the JSON file of the network, except while simulating.
+saveValues = True
+
+def main():
+    loadConfig()
+
+    repeat = True
+    while(repeat):
+        print("\nOptions:")
+        print("1 for Deploying the missing Origins instances of `sales`.")
+        print("2 for Creating the missing Tiers of every sale.")
+        print("3 for Verifying `toVerify` of every sale.")
+        print("4 for getting the Status of every sale.")
+        print("5 for Writing a Snapshot of every sale.")
+        print("6 for Handing every sale over to the multisig (removes me as Verifier and Owner).")
+        print("7 to exit.")
+        selection = int(input("Enter the choice: "))
+        timeBefore = time.time()
+        if(selection == 1):
+            deployFleet()
+        elif(selection == 2):
+            createFleetTiers()
+        elif(selection == 3):
+            verifyFleet()
+        elif(selection == 4):
+            printStatus(fleetStatus())
+        elif(selection == 5):
+            writeSnapshot(fleetStatus())
+        elif(selection == 6):
+            handOverFleet()
+        elif(selection == 7):
+            repeat = False
+            continue
+        else:
+            print("\nSmarter people have written this, enter valid selection ;)\n")
+            continue
+        print("\nDone for", len(values['sales']), "sales in", round(time.time() - timeBefore, 2), "seconds.")
+
+# =========================================================================================================================================
+def loadConfig():
+    global values, acct, thisNetwork, pipeline
+    thisNetwork = network.show_active()
+
+    if thisNetwork == "development":
+        acct = accounts[0]
+        configFile = open('./scripts/origins/values/development.json')
+    elif thisNetwork == "testnet" or thisNetwork == "testnet-ws":
+        acct = accounts.load("rskdeployer")
+        configFile = open('./scripts/origins/values/testnet.json')
+    elif thisNetwork == "rsk-testnet":
+        acct = accounts.load("rskdeployer")
+        configFile = open('./scripts/origins/values/testnet.json')
+    elif thisNetwork == "rsk-mainnet":
+        acct = accounts.load("rskdeployer")
+        configFile = open('./scripts/origins/values/mainnet.json')
+    else:
+        raise Exception("Network not supported.")
+
+    # Load deployment parameters and contracts addresses
+    values = json.load(configFile)
+    pipeline = TxPipeline(acct)
+
+# =========================================================================================================================================
+class TxPipeline:
+    # Hands out the nonces of the deployer, so transactions for many sales can be sent without waiting for
+    # each other. Sending happens under the lock to keep the nonces in order, waiting for receipts does not.
+
+    def __init__(self, acct):
+        self.acct = acct
+        self.lock = threading.Lock()
+        self.nonce = acct.nonce
+
+    def send(self, function, args, value=0):
+        with self.lock:
+            tx = function(*args, {'from': self.acct, 'nonce': self.nonce, 'value': value, 'required_confs': 0})
+            self.nonce += 1
+        return tx
+
+# =========================================================================================================================================
+def runAll(function, sales):
+    # Runs `function(sale)` for every sale on the bounded worker pool, results in the order of `sales`.
+    with ThreadPoolExecutor(max_workers=fleetWorkers) as executor:
+        return list(executor.map(function, sales))
+
+# =========================================================================================================================================
+def waitAll(transactions):
+    def wait(tx):
+        tx.wait(1)
+        if tx.status != 1:
+            raise Exception("Transaction " + tx.txid + " failed.")
+        return tx
+    return runAll(wait, transactions)
+
+# =========================================================================================================================================
+def getOrigins(sale):
+    return Contract.from_abi("OriginsBase", address=sale['origins'], abi=OriginsBase.abi, owner=acct)
+
+# =========================================================================================================================================
+def saleTiers(sale):
+    # A sale without its own `tiers` uses the tiers of the JSON file.
+    return sale.get('tiers', values['tiers'])
+
+# =========================================================================================================================================
+def deployFleet():
+    # Every instance shares the token and the LockedFund of the JSON file, and has to be one of its admins.
+    # The multisig and the deployer are the owners, as in `deployOrigins.py`, until `handOverFleet` removes the deployer.
+    sales = [sale for sale in values['sales'] if sale.get('origins', '') == '']
+    if len(sales) == 0:
+        print("All the sales are already deployed.")
+        return
+
+    deployments = [
+        pipeline.send(OriginsBase.deploy, [[values['multisig'], acct], values['token'], sale.get('depositAddress', values['depositAddress'])])
+        for sale in sales
+    ]
+    waitAll(deployments)
+    for sale, tx in zip(sales, deployments):
+        sale['origins'] = tx.contract_address
+    if saveValues:
+        writeToJSON()
+
+    lockedFund = Contract.from_abi("LockedFund", address=values['lockedFund'], abi=LockedFund.abi, owner=acct)
+    transactions = []
+    for sale in sales:
+        origins = getOrigins(sale)
+        transactions.append(pipeline.send(origins.setLockedFund, [values['lockedFund']]))
+        transactions.append(pipeline.send(lockedFund.addAdmin, [origins.address]))
+        for verifier in sale.get('originsVerifiers', values['originsVerifiers']):
+            transactions.append(pipeline.send(origins.addVerifier, [verifier]))
+    waitAll(transactions)
+
+    for sale in sales:
+        print(sale['name'], "deployed at", sale['origins'])
+
+# =========================================================================================================================================
+def createFleetTiers():
+    token = Contract.from_abi("Token", address=values['token'], abi=Token.abi, owner=acct)
+    decimal = int(values['decimal'])
+    tierCounts = runAll(lambda sale: getOrigins(sale).getTierCount(), values['sales'])
+
+    # Tier IDs follow the JSON index, so only the tiers after the current count are created.
+    newTiers = [(getOrigins(sale), saleTiers(sale)[tierCount + 1:]) for sale, tierCount in zip(values['sales'], tierCounts)]
+    newTiers = [(origins, tiers) for origins, tiers in newTiers if len(tiers) > 0]
+
+    # The approvals are mined in a round of their own, as brownie estimates the gas of `createTier` against the
+    # mined state, which only has the allowance once they are. Each sale gets one approval for all its new tiers.
+    approvals = []
+    for origins, tiers in newTiers:
+        total = sum(int(tier['tokensForSale']) for tier in tiers) * (10 ** decimal)
+        approvals.append(pipeline.send(token.approve, [origins.address, total]))
+    waitAll(approvals)
+
+    transactions = []
+    for origins, tiers in newTiers:
+        for tier in tiers:
+            remainingTokens = int(tier['tokensForSale']) * (10 ** decimal)
+            transactions.append(pipeline.send(origins.createTier, [
+                tier['maximumAmount'], remainingTokens, tier['saleStartTimestamp'], tier['saleEnd'], tier['unlockedBP'],
+                tier['vestOrLockCliff'], tier['vestOrLockDuration'], tier['depositRate'], tier['depositType'],
+                tier['verificationType'], tier['saleEndDurationOrTimestamp'], tier['transferType']
+            ]))
+    waitAll(transactions)
+    print("Created", len(transactions), "tiers.")
+
+# =========================================================================================================================================
+def verifyFleet():
+    # Each sale lists its own `toVerify` and the `verifyTier` they are verified on.
+    transactions = []
+    for sale in values['sales']:
+        if len(sale.get('toVerify', [])) == 0:
+            continue
+        origins = getOrigins(sale)
+        transactions.append(pipeline.send(origins.multipleAddressSingleTierVerification, [sale['toVerify'], sale['verifyTier']]))
+    waitAll(transactions)
+    print("Sent", len(transactions), "verification transactions.")
+
+# =========================================================================================================================================
+def handOverFleet():
+    # Removes the deployer as verifier and owner of every deployed sale, leaving the multisig in charge.
+    # The verifier is removed first, as only an owner can do it.
+    sales = [sale for sale in values['sales'] if sale.get('origins', '') != '']
+    roles = runAll(lambda sale: (getOrigins(sale).getVerifiers(), getOrigins(sale).getOwners()), sales)
+    transactions = []
+    for sale, (verifiers, owners) in zip(sales, roles):
+        origins = getOrigins(sale)
+        if str(acct) in verifiers:
+            transactions.append(pipeline.send(origins.removeVerifier, [acct]))
+        if str(acct) in owners:
+            transactions.append(pipeline.send(origins.removeOwner, [acct]))
+    waitAll(transactions)
+    print("Handed", len(sales), "sales over to the multisig", values['multisig'])
+
+# =========================================================================================================================================
+def saleStatus(sale, block):
+    origins = getOrigins(sale)
+    tiers = []
+    for tierID in range(1, origins.getTierCount(block_identifier=block) + 1):
+        tiers.append({
+            'tierID': tierID,
+            'tokensSold': origins.getTokensSoldPerTier(tierID, block_identifier=block),
+            'wallets': origins.getParticipatingWalletCountPerTier(tierID, block_identifier=block),
+            'remainingTokens': origins.readTierPartA(tierID, block_identifier=block)[2],
+            'saleEnded': origins.checkSaleEnded(tierID, block_identifier=block)
+        })
+    return {
+        'name': sale['name'],
+        'origins': sale['origins'],
+        'rbtcBalance': web3.eth.get_balance(sale['origins'], block),
+        'tiers': tiers
+    }
+
+# =========================================================================================================================================
+def fleetStatus():
+    # All sales are read at the same block, so the figures add up.
+    block = web3.eth.block_number
+    sales = [sale for sale in values['sales'] if sale.get('origins', '') != '']
+    return {'block': block, 'sales': runAll(lambda sale: saleStatus(sale, block), sales)}
+
+# =========================================================================================================================================
+def printStatus(status):
+    print("\n=============================================================")
+    print("Sales at Block", status['block'])
+    print("=============================================================")
+    print("Sale".ljust(20), "Tiers".rjust(6), "Tokens Sold".rjust(28), "Wallets".rjust(9), "RBTC Balance".rjust(24))
+    totals = [0, 0, 0, 0]
+    for sale in status['sales']:
+        row = [
+            len(sale['tiers']),
+            sum(tier['tokensSold'] for tier in sale['tiers']),
+            sum(tier['wallets'] for tier in sale['tiers']),
+            sale['rbtcBalance']
+        ]
+        totals = [total + item for total, item in zip(totals, row)]
+        print(sale['name'][:20].ljust(20), str(row[0]).rjust(6), str(row[1]).rjust(28), str(row[2]).rjust(9), str(row[3]).rjust(24))
+    print("-------------------------------------------------------------")
+    print("Total".ljust(20), str(totals[0]).rjust(6), str(totals[1]).rjust(28), str(totals[2]).rjust(9), str(totals[3]).rjust(24))
+    print("=============================================================")
+
+# =========================================================================================================================================
+def writeSnapshot(status):
+    os.makedirs(snapshotDir, exist_ok=True)
+    path = os.path.join(snapshotDir, thisNetwork + '-' + str(status['block']) + '.json')
+    with open(path, "w") as fileHandle:
+        json.dump(status, fileHandle, indent=4, default=str)
+    print("Snapshot written to", path)
+
+# =========================================================================================================================================
+def simulate():
+    # Deploys `FLEET_SIZE` sales on a fresh fixture, and compares the status read of one sale with all of them.
+    global values, saveValues
+    from scripts.origins import fixtureCache
+
+    loadConfig()
+    if thisNetwork != "development":
+        raise Exception("Simulation is only supported on development.")
+    fixtureCache.loadConfig()
+    values = fixtureCache.loadFixture()
+    # The fixture deployer is also its multisig, and Origins takes each owner only once.
+    values['multisig'] = str(accounts[9])
+    tier = dict(values['tiers'][1], saleStartTimestamp=chain.time())
+    values['sales'] = [
+        {'name': 'Sale ' + str(index), 'origins': '', 'tiers': [values['tiers'][0], tier], 'toVerify': values['toVerify'], 'verifyTier': 1}
+        for index in range(int(os.environ.get('FLEET_SIZE', 10)))
+    ]
+    saveValues = False
+    pipeline.nonce = acct.nonce
+
+    timings = []
+    for name, function in [('Deploy', deployFleet), ('Create Tiers', createFleetTiers), ('Verify', verifyFleet), ('Hand Over', handOverFleet)]:
+        timeBefore = time.time()
+        function()
+        timings.append((name, time.time() - timeBefore))
+
+    allSales = values['sales']
+    values['sales'] = allSales[:1]
+    timeBefore = time.time()
+    fleetStatus()
+    timings.append(('Status of 1 sale', time.time() - timeBefore))
+    values['sales'] = allSales
+    timeBefore = time.time()
+    status = fleetStatus()
+    timings.append(('Status of ' + str(len(allSales)) + ' sales', time.time() - timeBefore))
+
+    printStatus(status)
+    for name, seconds in timings:
+        print(name.ljust(24), round(seconds, 2), "seconds")
+    fixtureCache.revertToFixture()
+
+# =========================================================================================================================================
+def writeToJSON():
+    if thisNetwork == "development":
+        fileHandle = open('./scripts/origins/values/development.json', "w")
+    elif thisNetwork == "testnet" or thisNetwork == "rsk-testnet" or thisNetwork == "testnet-ws":
+        fileHandle = open('./scripts/origins/values/testnet.json', "w")
+    elif thisNetwork == "rsk-mainnet":
+        fileHandle = open('./scripts/origins/values/mainnet.json', "w")
+    json.dump(values, fileHandle, indent=4)
@@ -0,0 +1,220 @@
+from brownie import *
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import os
+import time
+import json
+import threading
+
+metricsPort = int(os.environ.get('METRICS_PORT', 9100))
+pollInterval = float(os.environ.get('METRICS_POLL_INTERVAL', 5))
+# The buy rate is measured over this many seconds of `TokenBuy` events.
+rateWindow = int(os.environ.get('METRICS_RATE_WINDOW', 600))
+
+# Events after which the views of the tier in the event have to be read again.
+tierEvents = [
+    'TokenBuy', 'TierSaleEnded', 'TierSaleUpdatedMinimum', 'TierSaleUpdatedMaximum', 'TierTokenAmountUpdated', 'TierTokenLimitUpdated',
+    'TierTimeUpdated', 'RemainingTokenWithdrawn'
+]
+# Events after which the contract balances have to be read again.
+balanceEvents = ['TokenBuy', 'ProceedingWithdrawn', 'RemainingTokenWithdrawn', 'TierTokenAmountUpdated']
+# The `SaleEndDurationOrTS` types (Duration, Timestamp) whose sale ends at `saleEnd`, without an event.
+timedEndTypes = [2, 3]
+
+def main():
+    loadConfig()
+
+    exporter = SaleMetrics(values['origins'])
+    exporter.refreshAll()
+
+    server = ThreadingHTTPServer(('127.0.0.1', metricsPort), metricsHandler(exporter))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print("\nServing sale metrics on http://127.0.0.1:" + str(metricsPort) + "/metrics")
+
+    try:
+        while True:
+            exporter.poll()
+            time.sleep(pollInterval)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+# =========================================================================================================================================
+def loadConfig():
+    global values, thisNetwork
+    thisNetwork = network.show_active()
+
+    if thisNetwork == "development":
+        configFile = open('./scripts/origins/values/development.json')
+    elif thisNetwork == "testnet" or thisNetwork == "testnet-ws" or thisNetwork == "rsk-testnet":
+        configFile = open('./scripts/origins/values/testnet.json')
+    elif thisNetwork == "rsk-mainnet":
+        configFile = open('./scripts/origins/values/mainnet.json')
+    else:
+        raise Exception("Network not supported.")
+
+    # Load deployment parameters and contracts addresses
+    values = json.load(configFile)
+
+# =========================================================================================================================================
+class SaleMetrics:
+    # Keeps the sale figures in memory and only reads a view again when an event says it may have changed.
+    # Apart from the event logs, an idle sale costs one `eth_blockNumber` per poll.
+
+    def __init__(self, originsAddress):
+        self.origins = Contract.from_abi("OriginsBase", address=originsAddress, abi=OriginsBase.abi)
+        self.token = Contract.from_abi("Token", address=self.origins.getToken(), abi=Token.abi)
+        self.eventNames = {}
+        for item in OriginsBase.abi:
+            if item['type'] == 'event':
+                signature = item['name'] + '(' + ','.join(arg['type'] for arg in item['inputs']) + ')'
+                self.eventNames[web3.keccak(text=signature).hex()] = item['name']
+        self.eventContract = web3.eth.contract(abi=OriginsBase.abi)
+        self.lock = threading.Lock()
+        self.lastBlock = web3.eth.block_number
+        # The timestamp of `lastBlock`. Buys are stamped with block timestamps, so the rate window is measured in chain time.
+        self.chainTime = 0
+        self.tiers = {}
+        self.buys = {}
+        self.blockTimes = {}
+        self.rbtcBalance = 0
+        self.tokenBalance = 0
+        self.viewCalls = 0
+        self.events = 0
+
+    def refreshTier(self, tierID, timestamp):
+        # `checkSaleEnded` only turns true with the next transaction on the tier, so a sale whose end time is before
+        # `timestamp` is reported as ended already, as `_saleAllowed` would find it.
+        partA = self.origins.readTierPartA(tierID)
+        timedEnd = self.origins.readTierPartB(tierID)[3] in timedEndTypes
+        tier = {
+            'tokensSold': self.origins.getTokensSoldPerTier(tierID),
+            'wallets': self.origins.getParticipatingWalletCountPerTier(tierID),
+            'remainingTokens': partA[2],
+            'saleEnd': partA[4] if timedEnd else 0,
+            'saleEnded': self.origins.checkSaleEnded(tierID) or (timedEnd and partA[4] < timestamp)
+        }
+        self.viewCalls += 5
+        with self.lock:
+            self.tiers[tierID] = tier
+
+    def refreshBalances(self):
+        rbtcBalance = web3.eth.get_balance(self.origins.address)
+        tokenBalance = self.token.balanceOf(self.origins.address)
+        self.viewCalls += 2
+        with self.lock:
+            self.rbtcBalance = rbtcBalance
+            self.tokenBalance = tokenBalance
+
+    def refreshAll(self):
+        timestamp = web3.eth.get_block(self.lastBlock).timestamp
+        with self.lock:
+            self.chainTime = timestamp
+        for tierID in range(1, self.origins.getTierCount() + 1):
+            self.refreshTier(tierID, timestamp)
+        self.refreshBalances()
+
+    def blockTime(self, blockNumber):
+        if blockNumber not in self.blockTimes:
+            self.blockTimes[blockNumber] = web3.eth.get_block(blockNumber).timestamp
+        return self.blockTimes[blockNumber]
+
+    def poll(self):
+        latest = web3.eth.block_number
+        if latest <= self.lastBlock:
+            return
+
+        logs = web3.eth.get_logs({'address': self.origins.address, 'fromBlock': self.lastBlock + 1, 'toBlock': latest})
+        self.lastBlock = latest
+
+        dirtyTiers = set()
+        dirtyBalances = False
+        for log in logs:
+            name = self.eventNames.get(log['topics'][0].hex())
+            if name is None:
+                continue
+            self.events += 1
+            event = getattr(self.eventContract.events, name)().processLog(log)
+            tierID = event['args'].get('_tierID')
+            if name == 'NewTierCreated' or (name in tierEvents and tierID is not None):
+                dirtyTiers.add(tierID)
+            if name in balanceEvents:
+                dirtyBalances = True
+            if name == 'TokenBuy':
+                with self.lock:
+                    self.buys.setdefault(tierID, []).append((self.blockTime(log['blockNumber']), event['args']['_tokensBought']))
+
+        # Tiers whose end time passed without an event, so that `sale_ended` and the projection follow.
+        with self.lock:
+            timedTiers = [(tierID, tier['saleEnd']) for tierID, tier in self.tiers.items() if tier['saleEnd'] != 0 and not tier['saleEnded']]
+        timestamp = self.blockTime(latest)
+        dirtyTiers.update(tierID for tierID, saleEnd in timedTiers if saleEnd < timestamp)
+
+        # Buys which left the rate window are not needed anymore.
+        with self.lock:
+            self.chainTime = timestamp
+            cutoff = timestamp - rateWindow
+            for tierID in self.buys:
+                self.buys[tierID] = [buy for buy in self.buys[tierID] if buy[0] > cutoff]
+        self.blockTimes = {}
+
+        for tierID in dirtyTiers:
+            self.refreshTier(tierID, timestamp)
+        if dirtyBalances:
+            self.refreshBalances()
+
+    def buyRate(self, tierID, now):
+        buys = [amount for timestamp, amount in self.buys.get(tierID, []) if timestamp > now - rateWindow]
+        return sum(buys) / rateWindow
+
+    def render(self):
+        lines = []
+        with self.lock:
+            now = self.chainTime
+            def metric(name, help, samples, kind="gauge"):
+                lines.append("# HELP origins_" + name + " " + help)
+                lines.append("# TYPE origins_" + name + " " + kind)
+                for labels, value in samples:
+                    lines.append("origins_" + name + labels + " " + str(value))
+
+            tierItems = sorted(self.tiers.items())
+            metric("tokens_sold", "Tokens sold per tier.", [('{tier="%d"}' % tierID, tier['tokensSold']) for tierID, tier in tierItems])
+            metric("participating_wallets", "Participating wallets per tier.", [('{tier="%d"}' % tierID, tier['wallets']) for tierID, tier in tierItems])
+            metric("remaining_tokens", "Tokens remaining for sale per tier.", [('{tier="%d"}' % tierID, tier['remainingTokens']) for tierID, tier in tierItems])
+            metric("sale_ended", "1 if the tier sale ended.", [('{tier="%d"}' % tierID, int(tier['saleEnded'])) for tierID, tier in tierItems])
+
+            rates = [(tierID, self.buyRate(tierID, now)) for tierID, tier in tierItems]
+            metric("buy_rate_tokens_per_second", "Tokens bought per second over the rate window.", [('{tier="%d"}' % tierID, rate) for tierID, rate in rates])
+            # Projected sell out is only reported for tiers which are still selling.
+            projections = []
+            for tierID, rate in rates:
+                tier = self.tiers[tierID]
+                if rate > 0 and not tier['saleEnded'] and tier['remainingTokens'] > 0:
+                    projections.append(('{tier="%d"}' % tierID, int(now + tier['remainingTokens'] / rate)))
+            metric("projected_sellout_timestamp", "Unix time at which the tier sells out at the current buy rate.", projections)
+
+            metric("rbtc_balance", "RBTC balance of the Origins contract.", [('', self.rbtcBalance)])
+            metric("token_balance", "Token balance of the Origins contract.", [('', self.tokenBalance)])
+            metric("last_block", "Last block processed.", [('', self.lastBlock)])
+            metric("view_calls_total", "View calls made by the exporter.", [('', self.viewCalls)], "counter")
+            metric("events_total", "Origins events processed by the exporter.", [('', self.events)], "counter")
+        return "\n".join(lines) + "\n"
+
+# =========================================================================================================================================
+def metricsHandler(exporter):
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != '/metrics':
+                self.send_response(404)
+                self.end_headers()
+                return
+            body = exporter.render().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return MetricsHandler
@@ -0,0 +1,204 @@
+from brownie import *
+from scripts.origins.rpcBatch import eventTopic, addressTopic, getLogs, selector, encodeArgs, concurrentCalls
+
+import os
+import csv
+import json
+import time
+import numpy as np
+
+# Requires NumPy in the brownie environment (`pip install numpy`).
+reportFile = './build/reconciliation/mismatches.csv'
+
+maxBasisPoint = 10000
+zeroAddress = '0x0000000000000000000000000000000000000000'
+
+def main():
+    loadConfig()
+
+    timeBefore = time.time()
+    data = fetchSaleData(values['origins'], values['lockedFund'], values['token'], int(values.get('originsDeployBlock', 0)))
+    timeFetched = time.time()
+    mismatches = reconcile(data)
+    timeReconciled = time.time()
+
+    writeReport(mismatches)
+
+    print("\n=============================================================")
+    print("Sale Reconciliation at Block", data['block'])
+    print("=============================================================")
+    print("Buyers:                      ", len(data['buyers']))
+    print("Buy Events:                  ", len(data['buyBuyer']))
+    print("Mismatching Rows:            ", len(mismatches))
+    print("Fetch Time:                  ", round(timeFetched - timeBefore, 2), "seconds")
+    print("Reconciliation Time:         ", round(timeReconciled - timeFetched, 4), "seconds")
+    print("Report:                      ", reportFile)
+    print("=============================================================")
+
+# =========================================================================================================================================
+def loadConfig():
+    global values, thisNetwork
+    thisNetwork = network.show_active()
+
+    if thisNetwork == "development":
+        configFile = open('./scripts/origins/values/development.json')
+    elif thisNetwork == "testnet" or thisNetwork == "testnet-ws" or thisNetwork == "rsk-testnet":
+        configFile = open('./scripts/origins/values/testnet.json')
+    elif thisNetwork == "rsk-mainnet":
+        configFile = open('./scripts/origins/values/mainnet.json')
+    else:
+        raise Exception("Network not supported.")
+
+    # Load deployment parameters and contracts addresses
+    values = json.load(configFile)
+
+# == Fetching =============================================================================================================================
+def fetchSaleData(originsAddress, lockedFundAddress, tokenAddress, fromBlock):
+    block = web3.eth.block_number
+    origins = Contract.from_abi("OriginsBase", address=originsAddress, abi=OriginsBase.abi)
+
+    # Tier parameters, index 0 is unused as tier IDs start at 1.
+    tierCount = origins.getTierCount()
+    unlockedBP = np.zeros(tierCount + 1, dtype=object)
+    transferType = np.zeros(tierCount + 1, dtype=np.int64)
+    for tierID in range(1, tierCount + 1):
+        unlockedBP[tierID] = origins.readTierPartA(tierID, block_identifier=block)[5]
+        transferType[tierID] = origins.readTierPartB(tierID, block_identifier=block)[4]
+
+    # Every buy, from the `TokenBuy` events.
+    buyLogs = getLogs(originsAddress, [eventTopic("TokenBuy(address,uint256,uint256)")], fromBlock, block)
+    buyBuyer = np.array(['0x' + log['topics'][1].hex()[-40:] for log in buyLogs], dtype=object)
+    buyTier = np.array([int(log['data'][2:66], 16) for log in buyLogs], dtype=np.int64)
+    buyAmount = np.array([int(log['data'][66:130], 16) for log in buyLogs], dtype=object)
+
+    # Withdrawals out of LockedFund have to be added back to compare with the deposits.
+    withdrawn = {}
+    for signature, column in [
+        ("WithdrawnWaitedUnlockedBalance(address,address,uint256)", 'waitedUnlocked'),
+        ("WithdrawnUnlockedBalance(address,address,uint256)", 'unlocked'),
+        ("TokenStaked(address,address,uint256)", 'vested')
+    ]:
+        logs = getLogs(lockedFundAddress, [eventTopic(signature)], fromBlock, block)
+        withdrawn[column] = (
+            np.array(['0x' + log['topics'][1].hex()[-40:] for log in logs], dtype=object),
+            np.array([int(log['data'][2:66], 16) for log in logs], dtype=object)
+        )
+
+    # Tokens sent straight to the buyers for `Unlocked` tiers. The proceeds and remaining tokens sent to the deposit address
+    # by `withdrawSaleDeposit` are Transfers out of Origins as well, so the transactions which withdrew are left out.
+    withdrawals = set()
+    for signature in ["ProceedingWithdrawn(address,address,uint256,uint8,uint256)", "RemainingTokenWithdrawn(address,address,uint256,uint256)"]:
+        withdrawals.update(log['transactionHash'] for log in getLogs(originsAddress, [eventTopic(signature)], fromBlock, block))
+    transferLogs = getLogs(tokenAddress, [eventTopic("Transfer(address,address,uint256)"), addressTopic(originsAddress)], fromBlock, block)
+    transferLogs = [log for log in transferLogs if log['transactionHash'] not in withdrawals]
+    transferTo = np.array(['0x' + log['topics'][2].hex()[-40:] for log in transferLogs], dtype=object)
+    transferAmount = np.array([int(log['data'][2:66], 16) for log in transferLogs], dtype=object)
+
+    buyers, buyerIndex = np.unique(buyBuyer, return_inverse=True) if len(buyBuyer) > 0 else (np.array([], dtype=object), np.array([], dtype=np.int64))
+
+    # On chain state, one batched read per source.
+    pairs = np.unique(np.stack([buyerIndex, buyTier], axis=1), axis=0) if len(buyBuyer) > 0 else np.zeros((0, 2), dtype=np.int64)
+    boughtSignature = selector("getTokensBoughtByAddressOnTier(address,uint256)")
+    bought = [int(result, 16) for result in concurrentCalls([(originsAddress, boughtSignature + encodeArgs([buyers[pair[0]], int(pair[1])])) for pair in pairs], block)]
+
+    balances = {}
+    for column, signature in [
+        ('vested', "vestedBalances(address)"),
+        ('waitedUnlocked', "waitedUnlockedBalances(address)"),
+        ('unlocked', "unlockedBalances(address)")
+    ]:
+        functionSelector = selector(signature)
+        results = concurrentCalls([(lockedFundAddress, functionSelector + encodeArgs([buyer])) for buyer in buyers], block)
+        balances[column] = np.array([int(result, 16) for result in results], dtype=object)
+
+    return {
+        'block': block,
+        'unlockedBP': unlockedBP,
+        'transferType': transferType,
+        'buyers': buyers,
+        'buyBuyer': buyBuyer,
+        'buyIndex': buyerIndex,
+        'buyTier': buyTier,
+        'buyAmount': buyAmount,
+        'pairs': pairs,
+        'bought': np.array(bought, dtype=object),
+        'balances': balances,
+        'withdrawn': withdrawn,
+        'transferTo': transferTo,
+        'transferAmount': transferAmount
+    }
+
+# == Reconciliation =======================================================================================================================
+def sumBy(index, amounts, size):
+    # Sums `amounts` per `index` in one pass. Amounts are kept as Python integers (object arrays) as they do not fit into 64 bits.
+    totals = np.zeros(size, dtype=object)
+    if len(index) > 0:
+        np.add.at(totals, index, amounts)
+    return totals
+
+# =========================================================================================================================================
+def lookup(buyers, addresses):
+    # Position of every address in the sorted `buyers`, -1 if it did not buy at all.
+    if len(addresses) == 0 or len(buyers) == 0:
+        return np.full(len(addresses), -1, dtype=np.int64)
+    lowered = np.array([address.lower() for address in addresses], dtype=object)
+    position = np.searchsorted(buyers, lowered)
+    position = np.minimum(position, len(buyers) - 1)
+    return np.where(buyers[position] == lowered, position, -1)
+
+# =========================================================================================================================================
+def reconcile(data):
+    buyers = data['buyers']
+    size = len(buyers)
+    mismatches = []
+
+    # 1. `getTokensBoughtByAddressOnTier` against the sum of `TokenBuy` events, per buyer and tier.
+    tierCount = len(data['transferType'])
+    pairKey = data['buyIndex'] * tierCount + data['buyTier']
+    expectedBought = sumBy(pairKey, data['buyAmount'], size * tierCount)
+    pairs = data['pairs']
+    if len(pairs) > 0:
+        expectedPairs = expectedBought[pairs[:, 0] * tierCount + pairs[:, 1]]
+        for row in np.nonzero(expectedPairs != data['bought'])[0]:
+            mismatches.append((buyers[pairs[row, 0]], int(pairs[row, 1]), 'tokensBought', expectedPairs[row], data['bought'][row]))
+
+    # 2. The split of every buy, following the LockedFund deposit of its tier's transfer type.
+    # Rounding happens per deposit in the contract, so the split is computed per event before summing.
+    bp = data['unlockedBP'][data['buyTier']] if len(data['buyTier']) > 0 else np.array([], dtype=object)
+    kind = data['transferType'][data['buyTier']] if len(data['buyTier']) > 0 else np.array([], dtype=np.int64)
+    unlockedPart = data['buyAmount'] * bp // maxBasisPoint if len(bp) > 0 else bp
+    lockedPart = data['buyAmount'] - unlockedPart if len(bp) > 0 else bp
+    zero = np.zeros(len(kind), dtype=object)
+
+    expected = {
+        # WaitedUnlock: BP goes to unlocked, the rest to waited unlocked. Vested: BP goes to waited unlocked, the rest is vested.
+        'unlocked': sumBy(data['buyIndex'], np.where(kind == 2, unlockedPart, zero), size),
+        'waitedUnlocked': sumBy(data['buyIndex'], np.where(kind == 2, lockedPart, np.where(kind == 3, unlockedPart, zero)), size),
+        'vested': sumBy(data['buyIndex'], np.where(kind == 3, lockedPart, zero), size),
+        'received': sumBy(data['buyIndex'], np.where(kind == 1, data['buyAmount'], zero), size)
+    }
+
+    for column in ['vested', 'waitedUnlocked', 'unlocked']:
+        addresses, amounts = data['withdrawn'][column]
+        index = lookup(buyers, addresses)
+        known = index >= 0
+        actual = data['balances'][column] + sumBy(index[known], amounts[known], size)
+        for row in np.nonzero(expected[column] != actual)[0]:
+            mismatches.append((buyers[row], '', column, expected[column][row], actual[row]))
+
+    index = lookup(buyers, data['transferTo'])
+    known = index >= 0
+    received = sumBy(index[known], data['transferAmount'][known], size)
+    for row in np.nonzero(expected['received'] != received)[0]:
+        mismatches.append((buyers[row], '', 'received', expected['received'][row], received[row]))
+
+    return mismatches
+
+# =========================================================================================================================================
+def writeReport(mismatches):
+    os.makedirs(os.path.dirname(reportFile), exist_ok=True)
+    with open(reportFile, "w", newline='') as fileHandle:
+        writer = csv.writer(fileHandle)
+        writer.writerow(['address', 'tierID', 'check', 'expected', 'actual'])
+        for row in mismatches:
+            writer.writerow([web3.toChecksumAddress(row[0])] + [str(item) for item in row[1:]])
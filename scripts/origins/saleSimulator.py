@@ -0,0 +1,232 @@
+from brownie import *
+from scripts.origins import fixtureCache
+
+import os
+import time
+import json
+import random
+import hashlib
+
+scenarioFile = os.environ.get('SIMULATION_SCENARIO', './scripts/origins/values/simulation.json')
+resultDir = './build/simulation'
+verifyChunk = int(os.environ.get('SIMULATION_VERIFY_CHUNK', 100))
+
+def main():
+    loadConfig()
+    with open(scenarioFile) as fileHandle:
+        scenario = json.load(fileHandle)
+
+    # Everything happens on top of a snapshot, so the chain is left as it was found.
+    chain.snapshot()
+    try:
+        simulator = SaleSimulator(scenario)
+        simulator.run()
+    finally:
+        chain.revert()
+
+    printPhases(simulator.phases)
+    printUserCosts(simulator)
+    printDistribution(simulator.distribution)
+    compareWithLast(simulator.phases)
+    writeResult(simulator)
+
+# =========================================================================================================================================
+def loadConfig():
+    global acct, thisNetwork
+    thisNetwork = network.show_active()
+
+    # Time travel only exists on a local chain.
+    if thisNetwork == "development":
+        acct = accounts[0]
+    else:
+        raise Exception("Network not supported.")
+
+# =========================================================================================================================================
+class SaleSimulator:
+    # Drives a whole sale: deploy, tiers, verification, buys, waited unlock and staking of the vested tokens.
+    # Each phase records the transactions it sent (from the brownie `history`), their gas and the wall time.
+
+    def __init__(self, scenario):
+        self.scenario = scenario
+        self.random = random.Random(scenario['seed'])
+        self.phases = []
+        self.buyers = []
+        self.purchases = {}
+        self.distribution = {}
+
+    def phase(self, name, function):
+        print("\nPhase:", name)
+        start = len(history)
+        timeBefore = time.time()
+        function()
+        transactions = list(history[start:])
+        self.phases.append({
+            'name': name,
+            'transactions': len(transactions),
+            'gas': sum(tx.gas_used for tx in transactions),
+            'time': round(time.time() - timeBefore, 2),
+            'perSender': gasPerSender(transactions)
+        })
+
+    def run(self):
+        self.phase("Deploy", self.deploy)
+        self.phase("Create Tiers", self.createTiers)
+        self.phase("Fund Buyers", self.fundBuyers)
+        self.phase("Verify", self.verify)
+        self.phase("Buy", self.buy)
+        self.advanceTime()
+        self.phase("Withdraw Proceeds", self.withdrawProceeds)
+        self.phase("Claim", self.claim)
+        self.distribution = self.readDistribution()
+
+    def deploy(self):
+        fixtureCache.loadConfig()
+        self.values = fixtureCache.deployFixture()
+        self.origins = Contract.from_abi("OriginsBase", address=self.values['origins'], abi=OriginsBase.abi, owner=acct)
+        self.lockedFund = Contract.from_abi("LockedFund", address=self.values['lockedFund'], abi=LockedFund.abi, owner=acct)
+        self.token = Contract.from_abi("Token", address=self.values['token'], abi=Token.abi, owner=acct)
+
+    def createTiers(self):
+        decimal = int(self.values['decimal'])
+        self.tiers = self.scenario['tiers']
+        for tier in self.tiers[1:]:
+            remainingTokens = int(tier['tokensForSale']) * (10 ** decimal)
+            self.token.approve(self.origins, remainingTokens)
+            self.origins.createTier(
+                tier['maximumAmount'], remainingTokens, chain.time(), tier['saleEnd'], tier['unlockedBP'],
+                tier['vestOrLockCliff'], tier['vestOrLockDuration'], tier['depositRate'], tier['depositType'],
+                tier['verificationType'], tier['saleEndDurationOrTimestamp'], tier['transferType']
+            )
+
+    def fundBuyers(self):
+        # Buyers are local accounts derived from the seed, so a scenario always produces the same population.
+        for index in range(int(self.scenario['buyers'])):
+            privateKey = hashlib.sha256((str(self.scenario['seed']) + ":" + str(index)).encode()).hexdigest()
+            buyer = accounts.add(privateKey)
+            acct.transfer(buyer, int(self.scenario['buyerFunding']))
+            self.buyers.append(buyer)
+            tierIDs = self.random.sample(range(1, len(self.tiers)), min(int(self.scenario['tiersPerBuyer']), len(self.tiers) - 1))
+            self.purchases[buyer.address] = [
+                (tierID, self.random.randint(int(self.scenario['depositMin']), int(self.scenario['depositMax'])))
+                for tierID in tierIDs
+            ]
+
+    def verify(self):
+        for tierID in range(1, len(self.tiers)):
+            if int(self.tiers[tierID]['verificationType']) != 2:
+                continue
+            addresses = [address for address, purchases in self.purchases.items() if tierID in [purchase[0] for purchase in purchases]]
+            for start in range(0, len(addresses), verifyChunk):
+                self.origins.multipleAddressSingleTierVerification(addresses[start:start + verifyChunk], tierID)
+
+    def buy(self):
+        for buyer in self.buyers:
+            for tierID, deposit in self.purchases[buyer.address]:
+                self.origins.buy(tierID, 0, {'from': buyer, 'value': deposit})
+
+    def advanceTime(self):
+        # Past the waited timestamp and the end of every tier with an end.
+        target = self.lockedFund.getWaitedTS()
+        for tierID in range(1, len(self.tiers)):
+            target = max(target, self.origins.readTierPartA(tierID)[4])
+        chain.sleep(target - chain.time() + 1)
+        chain.mine()
+
+    def withdrawProceeds(self):
+        self.origins.withdrawSaleDeposit()
+
+    def claim(self):
+        share = float(self.scenario['withdrawAndStakeShare'])
+        zeroAddress = "0x0000000000000000000000000000000000000000"
+        for buyer in self.buyers:
+            vested = self.lockedFund.getVestedBalance(buyer)
+            waitedUnlocked = self.lockedFund.getWaitedUnlockedBalance(buyer)
+            if vested > 0 and self.random.random() < share:
+                self.lockedFund.withdrawAndStakeTokens(zeroAddress, {'from': buyer})
+                continue
+            if waitedUnlocked > 0:
+                self.lockedFund.withdrawWaitedUnlockedBalance(zeroAddress, {'from': buyer})
+            if vested > 0:
+                self.lockedFund.createVestingAndStake({'from': buyer})
+
+    def readDistribution(self):
+        buyers = [buyer.address for buyer in self.buyers]
+        return {
+            'buyerWallets': sum(self.token.balanceOf(buyer) for buyer in buyers),
+            'staked': self.token.balanceOf(self.values['staking']),
+            'lockedFundVested': sum(self.lockedFund.getVestedBalance(buyer) for buyer in buyers),
+            'lockedFundWaitedUnlocked': sum(self.lockedFund.getWaitedUnlockedBalance(buyer) for buyer in buyers),
+            # There is no withdrawal for the unlocked balance yet, so it stays in LockedFund.
+            'lockedFundUnlocked': sum(self.lockedFund.getUnlockedBalance(buyer) for buyer in buyers),
+            'originsRemaining': self.token.balanceOf(self.origins),
+            'sold': sum(self.origins.getTokensSoldPerTier(tierID) for tierID in range(1, len(self.tiers)))
+        }
+
+# =========================================================================================================================================
+def gasPerSender(transactions):
+    senders = {}
+    for tx in transactions:
+        sender = str(tx.sender)
+        senders[sender] = senders.get(sender, 0) + tx.gas_used
+    return senders
+
+# =========================================================================================================================================
+def printPhases(phases):
+    print("\n=============================================================")
+    print("Sale Lifecycle")
+    print("=============================================================")
+    print("Phase".ljust(20), "Transactions".rjust(13), "Gas".rjust(12), "Seconds".rjust(9))
+    for phase in phases:
+        print(phase['name'].ljust(20), str(phase['transactions']).rjust(13), str(phase['gas']).rjust(12), str(phase['time']).rjust(9))
+    print("Total".ljust(20), str(sum(phase['transactions'] for phase in phases)).rjust(13), str(sum(phase['gas'] for phase in phases)).rjust(12), str(round(sum(phase['time'] for phase in phases), 2)).rjust(9))
+    print("=============================================================")
+
+# =========================================================================================================================================
+def printUserCosts(simulator):
+    # What a single buyer pays in gas, over the buy and the claim.
+    gasPrice = web3.eth.gas_price
+    phases = [phase for phase in simulator.phases if phase['name'] in ("Buy", "Claim")]
+    costs = []
+    for buyer in simulator.buyers:
+        # Only buyers who sent a transaction in these phases, a scenario may leave some (or all) of them out.
+        if any(buyer.address in phase['perSender'] for phase in phases):
+            costs.append(sum(phase['perSender'].get(buyer.address, 0) for phase in phases))
+    costs.sort()
+    print("Gas per Buyer (Buy + Claim)")
+    if len(costs) == 0:
+        print("No buyer sent a transaction.")
+    else:
+        print("Minimum:             ", costs[0])
+        print("Median:              ", costs[len(costs) // 2])
+        print("Maximum:             ", costs[-1])
+        print("Median Cost (wei):   ", costs[len(costs) // 2] * gasPrice)
+    print("=============================================================")
+
+# =========================================================================================================================================
+def printDistribution(distribution):
+    print("Final Token Distribution")
+    for key, amount in distribution.items():
+        print((key + ":").ljust(28), amount)
+    print("=============================================================")
+
+# =========================================================================================================================================
+def compareWithLast(phases):
+    # Gas differences against the previous run, as the regression check after contract or script changes.
+    lastFile = os.path.join(resultDir, 'last.json')
+    if not os.path.exists(lastFile):
+        return
+    with open(lastFile) as fileHandle:
+        last = {phase['name']: phase for phase in json.load(fileHandle)['phases']}
+    print("Gas Change Against the Last Run")
+    for phase in phases:
+        if phase['name'] in last:
+            print(phase['name'].ljust(20), str(phase['gas'] - last[phase['name']]['gas']).rjust(12))
+    print("=============================================================")
+
+# =========================================================================================================================================
+def writeResult(simulator):
+    os.makedirs(resultDir, exist_ok=True)
+    result = {'scenario': scenarioFile, 'phases': simulator.phases, 'distribution': simulator.distribution}
+    for fileName in [time.strftime("%Y%m%d-%H%M%S") + '.json', 'last.json']:
+        with open(os.path.join(resultDir, fileName), "w") as fileHandle:
+            json.dump(result, fileHandle, indent=4, default=str)
@@ -0,0 +1,188 @@
+from brownie import *
+from brownie._config import CONFIG
+from scripts.origins import fixtureCache
+
+import os
+import time
+import json
+import queue
+import itertools
+import multiprocessing
+
+# Each worker launches its own development chain, on consecutive ports after the base one.
+workerCount = int(os.environ.get('RUNNER_WORKERS', os.cpu_count() or 1))
+basePort = int(os.environ.get('RUNNER_BASE_PORT', 8546))
+reportFile = './build/scenarios/report.json'
+
+# The tier template values which are combined into scenarios.
+transferTypes = {1: "Unlocked", 2: "WaitedUnlock", 3: "Vested"}
+depositTypes = {0: "RBTC", 1: "Token"}
+verificationTypes = {1: "Everyone", 2: "ByAddress"}
+saleEndTypes = {1: "UntilSupply", 2: "Duration", 3: "Timestamp"}
+
+maxBasisPoint = 10000
+unlockedBP = 5000
+depositRate = 100
+deposit = 10 ** 16
+
+def main():
+    if network.show_active() != "development":
+        raise Exception("Network not supported.")
+
+    scenarios = scenarioMatrix()
+    workers = max(1, min(workerCount, len(scenarios)))
+    # Forked workers inherit the loaded project, and only swap the chain they are connected to.
+    context = multiprocessing.get_context('fork')
+    tasks = context.Queue()
+    results = context.Queue()
+    for scenario in scenarios:
+        tasks.put(scenario)
+    for index in range(workers):
+        tasks.put(None)
+
+    timeBefore = time.time()
+    processes = [context.Process(target=worker, args=(basePort + index, tasks, results)) for index in range(workers)]
+    for process in processes:
+        process.start()
+
+    collected = []
+    while len(collected) < len(scenarios):
+        try:
+            collected.append(results.get(timeout=5))
+        except queue.Empty:
+            if not any(process.is_alive() for process in processes):
+                break
+    for process in processes:
+        process.join()
+    wallTime = time.time() - timeBefore
+
+    printReport(collected, len(scenarios), workers, wallTime)
+    writeReport(collected, workers, wallTime)
+
+# =========================================================================================================================================
+def scenarioMatrix():
+    return [
+        {'transferType': transferType, 'depositType': depositType, 'verificationType': verificationType, 'saleEndType': saleEndType}
+        for transferType, depositType, verificationType, saleEndType in itertools.product(transferTypes, depositTypes, verificationTypes, saleEndTypes)
+    ]
+
+# =========================================================================================================================================
+def scenarioName(scenario):
+    return "/".join([
+        transferTypes[scenario['transferType']],
+        depositTypes[scenario['depositType']],
+        verificationTypes[scenario['verificationType']],
+        saleEndTypes[scenario['saleEndType']]
+    ])
+
+# =========================================================================================================================================
+def worker(port, tasks, results):
+    # The forked process drops the chain of the parent (without killing it) and launches its own on `port`.
+    network.disconnect(kill_rpc=False)
+    CONFIG.networks['development']['cmd_settings']['port'] = port
+    network.connect('development')
+    try:
+        fixtureCache.fixtureDir = os.path.join('./build/fixtures', 'port-' + str(port))
+        fixtureCache.loadConfig()
+        fixtureCache.loadFixture()
+        while True:
+            scenario = tasks.get()
+            if scenario is None:
+                break
+            results.put(runScenario(scenario, port))
+    finally:
+        network.disconnect()
+
+# =========================================================================================================================================
+def runScenario(scenario, port):
+    fixtureCache.revertToFixture()
+    timeBefore = time.time()
+    gas = {}
+    try:
+        gas = playScenario(scenario)
+        status = "Passed"
+    except Exception as e:
+        print("\nScenario", scenarioName(scenario), "failed:", e)
+        status = "Failed"
+    return {
+        'name': scenarioName(scenario),
+        'scenario': scenario,
+        'status': status,
+        'gas': gas,
+        'time': round(time.time() - timeBefore, 2),
+        'port': port
+    }
+
+# =========================================================================================================================================
+def playScenario(scenario):
+    # Creates a tier with the scenario's types, buys on it with one user, and checks where the tokens ended up.
+    acct = fixtureCache.acct
+    values = fixtureCache.values
+    buyer = accounts[1]
+    origins = fixtureCache.getOrigins()
+    token = Contract.from_abi("Token", address=values['token'], abi=Token.abi, owner=acct)
+    lockedFund = Contract.from_abi("LockedFund", address=values['lockedFund'], abi=LockedFund.abi, owner=acct)
+    gas = {}
+
+    now = chain.time()
+    saleEnd = {1: 0, 2: 3*24*60*60, 3: now + 3*24*60*60}[scenario['saleEndType']]
+    remainingTokens = 1000000 * (10 ** 18)
+    token.approve(origins, remainingTokens)
+    tx = origins.createTier(
+        10 ** 18, remainingTokens, now, saleEnd, unlockedBP, 1, 11, depositRate, 0,
+        scenario['verificationType'], scenario['saleEndType'], scenario['transferType']
+    )
+    gas['createTier'] = tx.gas_used
+    tierID = origins.getTierCount()
+
+    if scenario['verificationType'] == 2:
+        gas['addressVerification'] = origins.addressVerification(buyer, tierID).gas_used
+
+    if scenario['depositType'] == 1:
+        depositToken = acct.deploy(Token, 10 ** 24, "Deposit Token", "DEP", 18)
+        gas['setTierDeposit'] = origins.setTierDeposit(tierID, depositRate, depositToken, 1).gas_used
+        depositToken.transfer(buyer, deposit)
+        depositToken.approve(origins, deposit, {'from': buyer})
+        tx = origins.buy(tierID, deposit, {'from': buyer})
+    else:
+        tx = origins.buy(tierID, 0, {'from': buyer, 'value': deposit})
+    gas['buy'] = tx.gas_used
+
+    bought = deposit * depositRate
+    share = bought * unlockedBP // maxBasisPoint
+    if scenario['transferType'] == 1:
+        assert token.balanceOf(buyer) == bought, "Tokens were not sent to the buyer."
+    elif scenario['transferType'] == 2:
+        assert lockedFund.getUnlockedBalance(buyer) == share, "Unlocked balance does not match."
+        assert lockedFund.getWaitedUnlockedBalance(buyer) == bought - share, "Waited unlocked balance does not match."
+    else:
+        assert lockedFund.getWaitedUnlockedBalance(buyer) == share, "Waited unlocked balance does not match."
+        assert lockedFund.getVestedBalance(buyer) == bought - share, "Vested balance does not match."
+    return gas
+
+# =========================================================================================================================================
+def printReport(results, scenarioCount, workers, wallTime):
+    results = sorted(results, key=lambda result: result['name'])
+    print("\n=============================================================")
+    print("Scenario Results")
+    print("=============================================================")
+    print("Scenario".ljust(40), "Status".ljust(8), "createTier".rjust(11), "buy".rjust(9), "Seconds".rjust(8), "Port".rjust(6))
+    for result in results:
+        print(
+            result['name'].ljust(40), result['status'].ljust(8), str(result['gas'].get('createTier', '-')).rjust(11),
+            str(result['gas'].get('buy', '-')).rjust(9), str(result['time']).rjust(8), str(result['port']).rjust(6)
+        )
+    print("=============================================================")
+    scenarioTime = sum(result['time'] for result in results)
+    print("Passed:              ", len([result for result in results if result['status'] == "Passed"]), "of", scenarioCount)
+    print("Workers:             ", workers)
+    print("Wall Time:           ", round(wallTime, 2), "seconds")
+    print("Summed Scenario Time:", round(scenarioTime, 2), "seconds")
+    print("Throughput:          ", round(len(results) / wallTime, 2), "scenarios per second")
+    print("=============================================================")
+
+# =========================================================================================================================================
+def writeReport(results, workers, wallTime):
+    os.makedirs(os.path.dirname(reportFile), exist_ok=True)
+    with open(reportFile, "w") as fileHandle:
+        json.dump({'workers': workers, 'wallTime': wallTime, 'results': sorted(results, key=lambda result: result['name'])}, fileHandle, indent=4)
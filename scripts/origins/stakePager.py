@@ -0,0 +1,228 @@
+from brownie import *
+from scripts.origins.rpcBatch import selector, encodeArgs, concurrentCalls
+
+import os
+import csv
+import json
+import time
+import random
+
+resultDir = './build/stakes'
+# Lock dates read per call, 26 is a year of lock dates.
+pageSize = int(os.environ.get('STAKE_PAGE_SIZE', 26))
+# Accounts paged together, the progress is saved after each chunk.
+chunkSize = int(os.environ.get('STAKE_CHUNK_SIZE', 1000))
+# A file with one account per line, the vestings of the vesting inventory if not set.
+accountsFile = os.environ.get('STAKE_ACCOUNTS')
+# Only the stakes unlocking after this timestamp, all of them if 0.
+fromDate = int(os.environ.get('STAKE_FROM', 0))
+
+twoWeeks = 1209600
+
+def main():
+    loadConfig()
+    pager = StakePager(values['staking'], readAccounts(), thisNetwork)
+    timeBefore = time.time()
+    pager.run()
+    print("\n=============================================================")
+    print("Stakes at Block", pager.state['block'])
+    print("=============================================================")
+    print("Accounts:                    ", len(pager.accounts))
+    print("Calls:                       ", pager.calls)
+    print("Stake Rows Written:          ", pager.rows)
+    print("Time:                        ", round(time.time() - timeBefore, 2), "seconds")
+    print("Result:                      ", pager.path)
+    print("=============================================================")
+
+# =========================================================================================================================================
+def loadConfig():
+    global values, thisNetwork
+    thisNetwork = network.show_active()
+
+    if thisNetwork == "development":
+        configFile = open('./scripts/origins/values/development.json')
+    elif thisNetwork == "testnet" or thisNetwork == "testnet-ws" or thisNetwork == "rsk-testnet":
+        configFile = open('./scripts/origins/values/testnet.json')
+    elif thisNetwork == "rsk-mainnet":
+        configFile = open('./scripts/origins/values/mainnet.json')
+    else:
+        raise Exception("Network not supported.")
+
+    # Load deployment parameters and contracts addresses
+    values = json.load(configFile)
+
+# =========================================================================================================================================
+def readAccounts():
+    if accountsFile is not None:
+        with open(accountsFile) as fileHandle:
+            return [line.strip() for line in fileHandle if line.strip() != '']
+    path = os.path.join('./build/vestings', values['lockedFund'].lower(), 'vestings.json')
+    if not os.path.exists(path):
+        raise Exception("Set STAKE_ACCOUNTS, or run the vesting inventory first.")
+    with open(path) as fileHandle:
+        return [vesting for user, vesting in json.load(fileHandle)['vestings']]
+
+# =========================================================================================================================================
+def pageCall(staking, account, cursor, size=pageSize):
+    return (staking, selector("getNonEmptyStakes(address,uint256,uint256)") + encodeArgs([account, cursor, size]))
+
+# =========================================================================================================================================
+def decodePage(result):
+    dates, stakes, cursor = web3.codec.decode_abi(['uint256[]', 'uint96[]', 'uint256'], bytes.fromhex(result[2:]))
+    return list(zip(dates, stakes)), cursor
+
+# =========================================================================================================================================
+def pageAll(staking, accounts, block, onPage):
+    # Pages through the stakes of all `accounts` together: every round reads the next page of every account which
+    # has one left, concurrently, and hands each page to `onPage(account, rows)` as it is decoded.
+    cursors = {account: fromDate for account in accounts}
+    calls = 0
+    while len(cursors) > 0:
+        pending = list(cursors.items())
+        results = concurrentCalls([pageCall(staking, account, cursor) for account, cursor in pending], block)
+        calls += len(pending)
+        for (account, cursor), result in zip(pending, results):
+            rows, cursors[account] = decodePage(result)
+            onPage(account, rows)
+            if cursors[account] == 0:
+                del cursors[account]
+    return calls
+
+# =========================================================================================================================================
+class StakePager:
+    # Streams (account, lock date, stake) rows to `[NETWORK]-stakes.csv`. `[NETWORK]-stakes.json` pins the run to one
+    # block and keeps how many accounts and bytes of the file are complete, so an interrupted run drops the rows of the
+    # unfinished chunk and continues with it.
+
+    def __init__(self, stakingAddress, accounts, networkName):
+        self.staking = stakingAddress
+        self.accounts = accounts
+        os.makedirs(resultDir, exist_ok=True)
+        self.path = os.path.join(resultDir, networkName + '-stakes.csv')
+        self.statePath = os.path.join(resultDir, networkName + '-stakes.json')
+        self.state = None
+        if os.path.exists(self.statePath):
+            with open(self.statePath) as fileHandle:
+                self.state = json.load(fileHandle)
+        if self.state is None or self.state['complete'] or self.state['accounts'] != len(accounts) or self.state['from'] != fromDate:
+            self.state = {'block': web3.eth.block_number, 'accounts': len(accounts), 'from': fromDate, 'done': 0, 'offset': 0, 'complete': False}
+        self.calls = 0
+        self.rows = 0
+
+    def writeState(self):
+        with open(self.statePath + '.tmp', "w") as fileHandle:
+            json.dump(self.state, fileHandle)
+        os.replace(self.statePath + '.tmp', self.statePath)
+
+    def run(self):
+        with open(self.path, 'a+' if self.state['offset'] > 0 else 'w', newline='') as fileHandle:
+            fileHandle.truncate(self.state['offset'])
+            fileHandle.seek(self.state['offset'])
+            writer = csv.writer(fileHandle)
+            if self.state['offset'] == 0:
+                writer.writerow(['account', 'date', 'stake'])
+
+            def onPage(account, rows):
+                for date, stake in rows:
+                    writer.writerow([account, date, stake])
+                self.rows += len(rows)
+
+            for start in range(self.state['done'], len(self.accounts), chunkSize):
+                chunk = self.accounts[start:start + chunkSize]
+                self.calls += pageAll(self.staking, chunk, self.state['block'], onPage)
+                fileHandle.flush()
+                self.state['done'] = start + len(chunk)
+                self.state['offset'] = fileHandle.tell()
+                self.writeState()
+                print("Paged the stakes of", self.state['done'], "of", len(self.accounts), "accounts.")
+
+        self.state['complete'] = True
+        self.writeState()
+
+# =========================================================================================================================================
+def measure(staking, account, block, fromTimestamp):
+    # Gas and latency of reading the stakes of `account` with one `getStakes` call, and page by page from `fromTimestamp`.
+    data = selector("getStakes(address)") + encodeArgs([account])
+    timeBefore = time.time()
+    full = web3.eth.call({'to': staking, 'data': data}, block)
+    fullTime = time.time() - timeBefore
+    fullGas = web3.eth.estimate_gas({'to': staking, 'data': data})
+    dates, stakes = web3.codec.decode_abi(['uint256[]', 'uint96[]'], bytes(full))
+    expected = [(date, stake) for date, stake in zip(dates, stakes) if date >= fromTimestamp]
+
+    rows, cursor, pages, pagedGas, pagedTime = [], fromTimestamp, 0, 0, 0
+    while True:
+        to, data = pageCall(staking, account, cursor)
+        timeBefore = time.time()
+        result = web3.eth.call({'to': to, 'data': data}, block)
+        pagedTime += time.time() - timeBefore
+        pagedGas += web3.eth.estimate_gas({'to': to, 'data': data})
+        pages += 1
+        page, cursor = decodePage('0x' + bytes(result).hex())
+        rows += page
+        if cursor == 0:
+            break
+    if rows != expected:
+        raise Exception("The pages of " + account + " do not match getStakes.")
+    return {'fullGas': fullGas, 'fullTime': fullTime, 'pages': pages, 'pagedGas': pagedGas, 'pagedTime': pagedTime}
+
+# =========================================================================================================================================
+def compare():
+    # Stakes a few lock dates for `STAKE_COMPARE_ACCOUNTS` (20) addresses on the fixture, then compares `getStakes`
+    # with the pages of `getNonEmptyStakes`, right away and again after `STAKE_COMPARE_YEARS` (1,3) years have passed.
+    from scripts.origins import fixtureCache
+
+    loadConfig()
+    if thisNetwork != "development":
+        raise Exception("Comparison is only supported on development.")
+    fixtureCache.loadConfig()
+    fixtureValues = fixtureCache.loadFixture()
+    acct = fixtureCache.acct
+    generator = random.Random(int(os.environ.get('STAKE_SEED', 1)))
+    staking = Contract.from_abi("Staking", address=fixtureValues['staking'], abi=Staking.abi, owner=acct)
+    token = Contract.from_abi("Token", address=fixtureValues['token'], abi=Token.abi, owner=acct)
+    token.approve(staking, 10 ** 27)
+
+    stakers = ['0x' + generator.getrandbits(160).to_bytes(20, 'big').hex() for index in range(int(os.environ.get('STAKE_COMPARE_ACCOUNTS', 20)))]
+    stakers = [web3.toChecksumAddress(staker) for staker in stakers]
+    for staker in stakers:
+        for until in generator.sample(range(2, 78), 4):
+            staking.stake(generator.randint(1, 1000) * (10 ** 18), chain.time() + until * twoWeeks, staker, staker)
+    chain.mine()
+
+    years = [0] + [int(year) for year in os.environ.get('STAKE_COMPARE_YEARS', '1,3').split(',')]
+    results = []
+    try:
+        for index, year in enumerate(years):
+            if index > 0:
+                chain.sleep((year - years[index - 1]) * 365 * 24 * 60 * 60)
+                chain.mine()
+            block = web3.eth.block_number
+            now = web3.eth.get_block(block).timestamp
+            allPages = [measure(staking.address, staker, block, 0) for staker in stakers]
+            remaining = [measure(staking.address, staker, block, now) for staker in stakers]
+
+            # The bulk read of all stakers, as the vesting inventory reads them and as the pager does.
+            timeBefore = time.time()
+            concurrentCalls([(staking.address, selector("getStakes(address)") + encodeArgs([staker])) for staker in stakers], block)
+            bulkFull = time.time() - timeBefore
+            timeBefore = time.time()
+            pageAll(staking.address, stakers, block, lambda account, rows: None)
+            bulkPaged = time.time() - timeBefore
+            results.append((year, allPages, remaining, bulkFull, bulkPaged))
+    finally:
+        fixtureCache.revertToFixture()
+
+    def mean(items, key):
+        return sum(item[key] for item in items) / len(items)
+
+    print("\n=============================================================")
+    print("Stakes of", len(stakers), "Accounts, Pages of", pageSize, "Lock Dates")
+    print("=============================================================")
+    print("Years".ljust(6), "Read".ljust(20), "Pages".rjust(6), "Gas".rjust(10), "ms".rjust(8), "Bulk s".rjust(8))
+    for year, allPages, remaining, bulkFull, bulkPaged in results:
+        print(str(year).ljust(6), "getStakes".ljust(20), "1".rjust(6), str(int(mean(allPages, 'fullGas'))).rjust(10), str(round(mean(allPages, 'fullTime') * 1000, 2)).rjust(8), str(round(bulkFull, 3)).rjust(8))
+        print("".ljust(6), "pages from kickoff".ljust(20), str(round(mean(allPages, 'pages'), 1)).rjust(6), str(int(mean(allPages, 'pagedGas'))).rjust(10), str(round(mean(allPages, 'pagedTime') * 1000, 2)).rjust(8), str(round(bulkPaged, 3)).rjust(8))
+        print("".ljust(6), "pages from now".ljust(20), str(round(mean(remaining, 'pages'), 1)).rjust(6), str(int(mean(remaining, 'pagedGas'))).rjust(10), str(round(mean(remaining, 'pagedTime') * 1000, 2)).rjust(8), "".rjust(8))
+    print("=============================================================")
+    print("Gas is the estimate of the calls per account, ms the mean latency per account.")
@@ -0,0 +1,264 @@
+from brownie import *
+from scripts.origins.rpcBatch import eventTopic, getLogs
+
+import os
+import time
+import json
+import heapq
+
+pollInterval = float(os.environ.get('SCHEDULER_POLL_INTERVAL', 2))
+# Seconds before the close-out of a tier which failed is tried again.
+retryInterval = float(os.environ.get('SCHEDULER_RETRY_INTERVAL', 60))
+
+# Used when the values JSON has no `closeOut` entry.
+defaultCloseOut = {
+    "withdrawProceeds": True,
+    "openNextTier": False,
+    "useMultisig": False
+}
+
+def main():
+    loadConfig()
+    scheduler = TierScheduler(values, acct)
+    scheduler.loadTiers()
+    scheduler.printTimers()
+    while True:
+        # A failed poll (a node not answering, for example) is logged, and the next one picks up from the same block.
+        try:
+            scheduler.runOnce()
+        except Exception as e:
+            print("Poll failed:", e)
+        time.sleep(pollInterval)
+
+# =========================================================================================================================================
+def loadConfig():
+    global values, acct, thisNetwork
+    thisNetwork = network.show_active()
+
+    if thisNetwork == "development":
+        acct = accounts[0]
+        configFile = open('./scripts/origins/values/development.json')
+    elif thisNetwork == "testnet" or thisNetwork == "testnet-ws":
+        acct = accounts.load("rskdeployer")
+        configFile = open('./scripts/origins/values/testnet.json')
+    elif thisNetwork == "rsk-testnet":
+        acct = accounts.load("rskdeployer")
+        configFile = open('./scripts/origins/values/testnet.json')
+    elif thisNetwork == "rsk-mainnet":
+        acct = accounts.load("rskdeployer")
+        configFile = open('./scripts/origins/values/mainnet.json')
+    else:
+        raise Exception("Network not supported.")
+
+    # Load deployment parameters and contracts addresses
+    values = json.load(configFile)
+
+# =========================================================================================================================================
+class TierScheduler:
+    # Keeps the upcoming sale start/end boundaries of every tier in a time ordered heap, and fires the
+    # configured close-out actions as soon as a boundary passed (or `TierSaleEnded` was seen).
+    # `TierTimeUpdated`/`NewTierCreated` reschedule the tier, so manual edits are picked up as well.
+
+    def __init__(self, values, acct):
+        self.values = values
+        self.acct = acct
+        self.closeOut = dict(defaultCloseOut, **values.get('closeOut', {}))
+        self.origins = Contract.from_abi("OriginsBase", address=values['origins'], abi=OriginsBase.abi, owner=acct)
+        self.eventContract = web3.eth.contract(abi=OriginsBase.abi)
+        self.eventNames = {}
+        for item in OriginsBase.abi:
+            if item['type'] == 'event':
+                signature = item['name'] + '(' + ','.join(arg['type'] for arg in item['inputs']) + ')'
+                self.eventNames[web3.keccak(text=signature).hex()] = item['name']
+        self.lastBlock = web3.eth.block_number
+        self.timers = []
+        # Every (re)schedule gets a new generation, so stale heap entries of a rescheduled tier are skipped.
+        self.generation = {}
+        # A tier is closed once all its actions succeeded. Until then it is due, with the actions done so far, the
+        # time of its next try, and whether it waits for another tier to get a sale start.
+        self.closed = set()
+        self.due = {}
+        # Tiers whose proceeds or remaining tokens were withdrawn, which need no close-out anymore.
+        self.withdrawn = set()
+        self.actions = []
+
+    def loadTiers(self):
+        # `closed` only lives in memory, so after a restart the withdrawals on chain tell which tiers were settled already.
+        fromBlock = int(self.values.get('originsDeployBlock', 0))
+        for signature in ["ProceedingWithdrawn(address,address,uint256,uint8,uint256)", "RemainingTokenWithdrawn(address,address,uint256,uint256)"]:
+            for log in getLogs(self.origins.address, [eventTopic(signature)], fromBlock, self.lastBlock):
+                self.withdrawn.add(int(log['data'][2:66], 16))
+        for tierID in range(1, self.origins.getTierCount() + 1):
+            self.scheduleTier(tierID)
+
+    def settled(self, tierID, remainingTokens=None):
+        if tierID in self.withdrawn:
+            return True
+        if remainingTokens is None:
+            remainingTokens = self.origins.readTierPartA(tierID)[2]
+        return remainingTokens == 0
+
+    def scheduleTier(self, tierID):
+        partA = self.origins.readTierPartA(tierID)
+        partB = self.origins.readTierPartB(tierID)
+        saleStartTS = partA[3]
+        saleEnd = partA[4]
+        saleEndDurationOrTS = partB[3]
+        generation = self.generation.get(tierID, 0) + 1
+        self.generation[tierID] = generation
+
+        now = chain.time()
+        if saleStartTS > now:
+            heapq.heappush(self.timers, (saleStartTS, tierID, 'start', generation))
+        # `UntilSupply` tiers have no end boundary, they only end with `TierSaleEnded`. Duration was already turned into a timestamp by the contract.
+        if saleEndDurationOrTS in (2, 3) and saleEnd != 0 and tierID not in self.closed and not self.settled(tierID, partA[2]):
+            heapq.heappush(self.timers, (saleEnd + 1, tierID, 'end', generation))
+
+    def printTimers(self):
+        print("\n=============================================================")
+        print("Scheduled Boundaries")
+        print("=============================================================")
+        for timestamp, tierID, kind, generation in sorted(self.timers):
+            if generation == self.generation[tierID]:
+                print("Tier", tierID, kind.ljust(6), "at", timestamp)
+        print("=============================================================")
+
+    def runOnce(self):
+        self.processEvents()
+        now = chain.time()
+        while len(self.timers) > 0 and self.timers[0][0] <= now:
+            timestamp, tierID, kind, generation = heapq.heappop(self.timers)
+            if generation != self.generation.get(tierID):
+                continue
+            if kind == 'start':
+                print("\nTier", tierID, "sale started at", timestamp)
+            else:
+                self.closeTier(tierID)
+
+        # A failing close-out is logged and tried again after `retryInterval`, the other tiers go on.
+        for tierID in sorted(self.due.keys()):
+            if self.due[tierID]['retryAt'] > time.time() or self.due[tierID]['blocked']:
+                continue
+            try:
+                self.runCloseOut(tierID)
+            except Exception as e:
+                self.due[tierID]['retryAt'] = time.time() + retryInterval
+                print("Close-out of Tier", tierID, "failed, trying again in", retryInterval, "seconds:", e)
+
+    def processEvents(self):
+        latest = web3.eth.block_number
+        if latest <= self.lastBlock:
+            return
+        logs = web3.eth.get_logs({'address': self.origins.address, 'fromBlock': self.lastBlock + 1, 'toBlock': latest})
+
+        for log in logs:
+            name = self.eventNames.get(log['topics'][0].hex())
+            if name == 'TierSaleEnded':
+                tierID = getattr(self.eventContract.events, name)().processLog(log)['args']['_tierID']
+                self.closeTier(tierID)
+            elif name == 'TierTimeUpdated' or name == 'NewTierCreated':
+                tierID = getattr(self.eventContract.events, name)().processLog(log)['args']['_tierID']
+                self.scheduleTier(tierID)
+                # The tier may have been the one whose missing sale start kept `withdrawSaleDeposit` from running.
+                for item in self.due.values():
+                    item['blocked'] = False
+            elif name == 'ProceedingWithdrawn' or name == 'RemainingTokenWithdrawn':
+                self.withdrawn.add(getattr(self.eventContract.events, name)().processLog(log)['args']['_tierID'])
+        # Only once all were handled, handling an event twice does no harm.
+        self.lastBlock = latest
+
+    def closeTier(self, tierID):
+        # The actions run with the next `runOnce`.
+        if tierID in self.closed or tierID in self.due:
+            return
+        if self.settled(tierID):
+            print("\nTier", tierID, "sale ended, and was settled already.")
+            self.closed.add(tierID)
+            return
+        print("\nTier", tierID, "sale ended, running the close-out actions...")
+        self.due[tierID] = {'done': set(), 'retryAt': 0, 'blocked': False}
+
+    def runCloseOut(self, tierID):
+        # Actions which succeeded in an earlier try are not sent again.
+        done = self.due[tierID]['done']
+
+        # The next tier is opened first, as `withdrawSaleDeposit` reverts while any tier has no sale start set.
+        # A next tier with a sale start is running or finished already, and is left alone.
+        nextTier = tierID + 1
+        if self.closeOut['openNextTier'] and 'open' not in done:
+            if nextTier < len(self.values['tiers']) and nextTier <= self.origins.getTierCount() and self.origins.readTierPartA(nextTier)[3] == 0:
+                tier = self.values['tiers'][nextTier]
+                # A duration based tier starts right away, a timestamp based one keeps its configured end.
+                self.send(
+                    self.origins.setTierTime,
+                    [nextTier, chain.time(), tier['saleEnd'], tier['saleEndDurationOrTimestamp']],
+                    "Open Tier " + str(nextTier)
+                )
+            done.add('open')
+
+        if self.closeOut['withdrawProceeds'] and 'withdraw' not in done:
+            unstarted = self.unstartedTiers()
+            if len(unstarted) > 0:
+                # Retrying cannot help, so this is reported once and waits for a `TierTimeUpdated`/`NewTierCreated`.
+                self.due[tierID]['blocked'] = True
+                print("Withdrawing the proceeds of Tier", tierID, "waits for a sale start on Tier(s)", unstarted, "as withdrawSaleDeposit reverts until then.")
+                return
+            self.send(self.origins.withdrawSaleDeposit, [], "Withdraw proceeds of Tier " + str(tierID))
+            done.add('withdraw')
+
+        del self.due[tierID]
+        self.closed.add(tierID)
+
+    def unstartedTiers(self):
+        # Tiers which make `withdrawSaleDeposit` revert: no sale start, and not ended.
+        unstarted = []
+        for tierID in range(1, self.origins.getTierCount() + 1):
+            if self.origins.readTierPartA(tierID)[3] == 0 and not self.origins.checkSaleEnded(tierID):
+                unstarted.append(tierID)
+        return unstarted
+
+    def send(self, function, args, description):
+        if self.closeOut['useMultisig']:
+            multisig = Contract.from_abi("MultiSig", address=self.values['multisig'], abi=MultiSigWallet.abi, owner=self.acct)
+            tx = multisig.submitTransaction(self.origins.address, 0, function.encode_input(*args))
+            print(description, "submitted to multisig with Transaction ID:", tx.events["Submission"]["transactionId"])
+        else:
+            tx = function(*args)
+            print(description, "done in", tx.txid)
+        self.actions.append((chain.time(), description, tx.txid))
+
+# =========================================================================================================================================
+def simulate():
+    # Two tiers on a fresh fixture, the second one waiting to be opened. Time is moved to each boundary with `chain.sleep`.
+    global values
+    from scripts.origins import fixtureCache
+
+    loadConfig()
+    if thisNetwork != "development":
+        raise Exception("Simulation is only supported on development.")
+    fixtureCache.loadConfig()
+    values = fixtureCache.loadFixture()
+    values['closeOut'] = {"withdrawProceeds": True, "openNextTier": True, "useMultisig": False}
+
+    origins = fixtureCache.getOrigins()
+    firstTier = fixtureCache.createTier(2)
+    secondTier = fixtureCache.createTier(2)
+    origins.setTierTime(secondTier, 0, 0, 0)
+    origins.buy(firstTier, 0, {'from': accounts[1], 'value': 10 ** 16})
+
+    scheduler = TierScheduler(values, acct)
+    scheduler.loadTiers()
+    scheduler.printTimers()
+
+    boundary = scheduler.timers[0][0]
+    chain.sleep(boundary - chain.time())
+    chain.mine()
+    timeBefore = time.time()
+    scheduler.runOnce()
+    print("\nClose-out took", round(time.time() - timeBefore, 2), "seconds after the boundary.")
+
+    assert origins.readTierPartA(secondTier)[3] != 0, "Next tier was not opened."
+    assert web3.eth.get_balance(origins.address) == 0, "Proceeds were not withdrawn."
+    for timestamp, description, txid in scheduler.actions:
+        print(timestamp, description, txid)
+    fixtureCache.revertToFixture()
@@ -0,0 +1,276 @@
+from brownie import *
+
+import os
+import csv
+import json
+import math
+
+costModelFile = './build/verification/costModel.json'
+# Leaves room under the RSK block gas limit of 6.8M.
+gasCap = 6000000
+
+# Rough figures used until `calibrate` was run, gas = fixed + perEntry * entries.
+defaultCostModel = {
+    'addressVerification': {'fixed': 48000, 'perEntry': 0},
+    'singleAddressMultipleTierVerification': {'fixed': 29000, 'perEntry': 23500},
+    'multipleAddressSingleTierVerification': {'fixed': 29000, 'perEntry': 23500},
+    'multipleAddressAndTierVerification': {'fixed': 29500, 'perEntry': 24100}
+}
+
+def main():
+    loadConfig()
+
+    fileName = input("Enter the CSV file with `address,tierID` rows: ")
+    mapping = readMapping(fileName)
+    model = loadCostModel()
+    plan = planVerification(mapping, model)
+    printPlan(plan, mapping, model)
+
+    print("\n1 for sending the plan as direct transactions.")
+    print("2 for submitting the plan to the multisig.")
+    print("Anything else for exit.")
+    selection = int(input("Enter Choice: "))
+    if(selection == 1):
+        executePlan(plan)
+    elif(selection == 2):
+        submitPlanToMultisig(plan)
+
+# =========================================================================================================================================
+def loadConfig():
+    global values, acct, thisNetwork
+    thisNetwork = network.show_active()
+
+    if thisNetwork == "development":
+        acct = accounts[0]
+        configFile = open('./scripts/origins/values/development.json')
+    elif thisNetwork == "testnet" or thisNetwork == "testnet-ws":
+        acct = accounts.load("rskdeployer")
+        configFile = open('./scripts/origins/values/testnet.json')
+    elif thisNetwork == "rsk-testnet":
+        acct = accounts.load("rskdeployer")
+        configFile = open('./scripts/origins/values/testnet.json')
+    elif thisNetwork == "rsk-mainnet":
+        acct = accounts.load("rskdeployer")
+        configFile = open('./scripts/origins/values/mainnet.json')
+    else:
+        raise Exception("Network not supported.")
+
+    # Load deployment parameters and contracts addresses
+    values = json.load(configFile)
+
+# =========================================================================================================================================
+def readMapping(fileName):
+    # Returns address -> sorted list of tiers, duplicates removed.
+    mapping = {}
+    with open(fileName) as fileHandle:
+        for row in csv.reader(fileHandle):
+            if len(row) < 2 or not row[1].strip().isdigit():
+                continue
+            mapping.setdefault(web3.toChecksumAddress(row[0].strip()), set()).add(int(row[1]))
+    return {address: sorted(tiers) for address, tiers in mapping.items()}
+
+# == Cost Model ===========================================================================================================================
+def loadCostModel():
+    if os.path.exists(costModelFile):
+        with open(costModelFile) as fileHandle:
+            return json.load(fileHandle)
+    print("\nNo calibrated cost model found, using the default estimates. Run `calibrate` on development for better plans.")
+    return defaultCostModel
+
+# =========================================================================================================================================
+def callGas(model, functionName, entries):
+    return model[functionName]['fixed'] + model[functionName]['perEntry'] * entries
+
+# =========================================================================================================================================
+def maxEntries(model, functionName):
+    if model[functionName]['perEntry'] == 0:
+        return 1
+    return max(1, (gasCap - model[functionName]['fixed']) // model[functionName]['perEntry'])
+
+# =========================================================================================================================================
+def calibrate():
+    # Measures every verification function on a fresh fixture with 1 and `sample` entries and fits a line through them.
+    from scripts.origins import fixtureCache
+
+    loadConfig()
+    if thisNetwork != "development":
+        raise Exception("Calibration is only supported on development.")
+    fixtureCache.loadConfig()
+    fixtureCache.loadFixture()
+    tierList = [fixtureCache.createTier(1), fixtureCache.createTier(2)]
+    origins = fixtureCache.getOrigins()
+
+    sample = 20
+    def freshAddresses(count):
+        return [web3.toChecksumAddress('0x' + os.urandom(20).hex()) for index in range(count)]
+
+    def fit(measure):
+        small = measure(1)
+        large = measure(sample)
+        perEntry = (large - small) // (sample - 1)
+        return {'fixed': small - perEntry, 'perEntry': perEntry}
+
+    model = {}
+    model['addressVerification'] = {'fixed': origins.addressVerification(freshAddresses(1)[0], tierList[0]).gas_used, 'perEntry': 0}
+    model['singleAddressMultipleTierVerification'] = fit(
+        lambda count: origins.singleAddressMultipleTierVerification(freshAddresses(1)[0], list(range(1, count + 1))).gas_used
+    )
+    model['multipleAddressSingleTierVerification'] = fit(
+        lambda count: origins.multipleAddressSingleTierVerification(freshAddresses(count), tierList[0]).gas_used
+    )
+    model['multipleAddressAndTierVerification'] = fit(
+        lambda count: origins.multipleAddressAndTierVerification(freshAddresses(count), [tierList[index % 2] for index in range(count)]).gas_used
+    )
+    fixtureCache.revertToFixture()
+
+    os.makedirs(os.path.dirname(costModelFile), exist_ok=True)
+    with open(costModelFile, "w") as fileHandle:
+        json.dump(model, fileHandle, indent=4)
+    print("\nCalibrated Cost Model:", json.dumps(model, indent=4))
+
+# == Planner ==============================================================================================================================
+def chunkedCost(model, functionName, entries):
+    if entries == 0:
+        return 0, 0
+    txCount = math.ceil(entries / maxEntries(model, functionName))
+    return model[functionName]['fixed'] * txCount + model[functionName]['perEntry'] * entries, txCount
+
+# =========================================================================================================================================
+def addressCallCost(model, tiers):
+    if len(tiers) == 1:
+        return callGas(model, 'addressVerification', 1), 1
+    return chunkedCost(model, 'singleAddressMultipleTierVerification', len(tiers))
+
+# =========================================================================================================================================
+def mixedCallCost(model, pairs):
+    if pairs == 1:
+        return callGas(model, 'addressVerification', 1), 1
+    return chunkedCost(model, 'multipleAddressAndTierVerification', pairs)
+
+# =========================================================================================================================================
+def residualList(mapping, grouped):
+    # The address/tier pairs not covered by single tier calls, addresses with the most tiers first.
+    residual = [(address, [tierID for tierID in tiers if tierID not in grouped]) for address, tiers in mapping.items()]
+    return sorted([item for item in residual if len(item[1]) > 0], key=lambda item: (-len(item[1]), item[0]))
+
+# =========================================================================================================================================
+def planVerification(mapping, model):
+    # Tiers with the largest address groups get single tier calls, the addresses with the most leftover tiers
+    # get single address calls and whatever remains goes into mixed calls. Every split is tried and the cheapest
+    # one (by gas, then by transaction count) wins.
+    tierGroups = {}
+    for address, tiers in mapping.items():
+        for tierID in tiers:
+            tierGroups.setdefault(tierID, []).append(address)
+    tierOrder = sorted(tierGroups.keys(), key=lambda tierID: (-len(tierGroups[tierID]), tierID))
+
+    best = None
+    for tierCutoff in range(len(tierOrder) + 1):
+        grouped = set(tierOrder[:tierCutoff])
+        gas = 0
+        txCount = 0
+        for tierID in grouped:
+            callCost, callCount = chunkedCost(model, 'multipleAddressSingleTierVerification', len(tierGroups[tierID]))
+            gas += callCost
+            txCount += callCount
+
+        residual = residualList(mapping, grouped)
+        remainingPairs = sum(len(tiers) for address, tiers in residual)
+        for addressCutoff in range(len(residual) + 1):
+            mixedGas, mixedCount = mixedCallCost(model, remainingPairs)
+            candidate = (gas + mixedGas, txCount + mixedCount, tierCutoff, addressCutoff)
+            if best is None or candidate[:2] < best[:2]:
+                best = candidate
+            # Once the remaining addresses have a single tier, giving them their own call can only cost more.
+            if addressCutoff == len(residual) or len(residual[addressCutoff][1]) < 2:
+                break
+            callCost, callCount = addressCallCost(model, residual[addressCutoff][1])
+            gas += callCost
+            txCount += callCount
+            remainingPairs -= len(residual[addressCutoff][1])
+
+    return buildPlan(mapping, model, tierGroups, tierOrder[:best[2]], best[3])
+
+# =========================================================================================================================================
+def buildPlan(mapping, model, tierGroups, groupedTiers, addressCutoff):
+    plan = []
+    grouped = set(groupedTiers)
+    for tierID in groupedTiers:
+        step = maxEntries(model, 'multipleAddressSingleTierVerification')
+        addressList = tierGroups[tierID]
+        for start in range(0, len(addressList), step):
+            plan.append(('multipleAddressSingleTierVerification', [addressList[start:start + step], tierID]))
+
+    residual = residualList(mapping, grouped)
+    for address, tiers in residual[:addressCutoff]:
+        if len(tiers) == 1:
+            plan.append(('addressVerification', [address, tiers[0]]))
+        else:
+            step = maxEntries(model, 'singleAddressMultipleTierVerification')
+            for start in range(0, len(tiers), step):
+                plan.append(('singleAddressMultipleTierVerification', [address, tiers[start:start + step]]))
+
+    pairs = [(address, tierID) for address, tiers in residual[addressCutoff:] for tierID in tiers]
+    if len(pairs) == 1:
+        plan.append(('addressVerification', [pairs[0][0], pairs[0][1]]))
+    else:
+        step = maxEntries(model, 'multipleAddressAndTierVerification')
+        for start in range(0, len(pairs), step):
+            chunk = pairs[start:start + step]
+            plan.append(('multipleAddressAndTierVerification', [[pair[0] for pair in chunk], [pair[1] for pair in chunk]]))
+    return plan
+
+# =========================================================================================================================================
+def planEntries(functionName, args):
+    if functionName == 'addressVerification':
+        return 1
+    if functionName == 'singleAddressMultipleTierVerification':
+        return len(args[1])
+    return len(args[0])
+
+# =========================================================================================================================================
+def planGas(plan, model):
+    return sum(callGas(model, functionName, planEntries(functionName, args)) for functionName, args in plan)
+
+# =========================================================================================================================================
+def printPlan(plan, mapping, model):
+    # The current scripts send one `multipleAddressSingleTierVerification` per tier, which is the baseline here.
+    baseline = []
+    tierGroups = {}
+    for address, tiers in mapping.items():
+        for tierID in tiers:
+            tierGroups.setdefault(tierID, []).append(address)
+    for tierID, addressList in tierGroups.items():
+        baseline.append(('multipleAddressSingleTierVerification', [addressList, tierID]))
+
+    print("\n=============================================================")
+    print("Verification Plan")
+    print("=============================================================")
+    for functionName, args in plan:
+        print(functionName.ljust(40), "Entries:", planEntries(functionName, args))
+    print("=============================================================")
+    print("Addresses:                   ", len(mapping))
+    print("Address/Tier Pairs:          ", sum(len(tiers) for tiers in mapping.values()))
+    print("Planned Transactions:        ", len(plan))
+    print("Planned Gas (estimate):      ", planGas(plan, model))
+    print("Per Tier Transactions:       ", len(baseline))
+    print("Per Tier Gas (estimate):     ", planGas(baseline, model))
+    print("=============================================================")
+
+# =========================================================================================================================================
+def executePlan(plan):
+    origins = Contract.from_abi("OriginsBase", address=values['origins'], abi=OriginsBase.abi, owner=acct)
+    for functionName, args in plan:
+        tx = getattr(origins, functionName)(*args)
+        print(functionName, "sent, Gas Used:", tx.gas_used)
+
+# =========================================================================================================================================
+def submitPlanToMultisig(plan):
+    # The multisig has to be a verifier of Origins for these to go through once confirmed.
+    origins = Contract.from_abi("OriginsBase", address=values['origins'], abi=OriginsBase.abi, owner=acct)
+    multisig = Contract.from_abi("MultiSig", address=values['multisig'], abi=MultiSigWallet.abi, owner=acct)
+    for functionName, args in plan:
+        data = getattr(origins, functionName).encode_input(*args)
+        tx = multisig.submitTransaction(origins.address, 0, data)
+        txId = tx.events["Submission"]["transactionId"]
+        print(functionName, "submitted to multisig with Transaction ID:", txId)
@@ -0,0 +1,258 @@
+from brownie import *
+
+import os
+import time
+import json
+import random
+import sqlite3
+import tempfile
+import threading
+
+# A batch is flushed once it holds `batchSize` addresses, or once its oldest address waited `batchWindow` seconds.
+batchSize = int(os.environ.get('VERIFY_BATCH_SIZE', 100))
+batchWindow = float(os.environ.get('VERIFY_BATCH_WINDOW', 30))
+pollInterval = float(os.environ.get('VERIFY_POLL_INTERVAL', 1))
+queueFile = os.environ.get('VERIFY_QUEUE', './build/verification/queue.db')
+# A batch which reverted or was lost this many times is marked as failed instead of being queued again.
+maxAttempts = int(os.environ.get('VERIFY_MAX_ATTEMPTS', 3))
+# A batch without a receipt after this many seconds is queued again if the node does not know its transaction.
+receiptTimeout = float(os.environ.get('VERIFY_RECEIPT_TIMEOUT', 300))
+
+def main():
+    loadConfig()
+    runDaemon()
+
+# =========================================================================================================================================
+def loadConfig():
+    global values, acct, thisNetwork
+    thisNetwork = network.show_active()
+
+    if thisNetwork == "development":
+        acct = accounts[0]
+        configFile = open('./scripts/origins/values/development.json')
+    elif thisNetwork == "testnet" or thisNetwork == "testnet-ws":
+        acct = accounts.load("rskdeployer")
+        configFile = open('./scripts/origins/values/testnet.json')
+    elif thisNetwork == "rsk-testnet":
+        acct = accounts.load("rskdeployer")
+        configFile = open('./scripts/origins/values/testnet.json')
+    elif thisNetwork == "rsk-mainnet":
+        acct = accounts.load("rskdeployer")
+        configFile = open('./scripts/origins/values/mainnet.json')
+    else:
+        raise Exception("Network not supported.")
+
+    # Load deployment parameters and contracts addresses
+    values = json.load(configFile)
+
+# == Queue ================================================================================================================================
+def openQueue():
+    os.makedirs(os.path.dirname(queueFile) or '.', exist_ok=True)
+    connection = sqlite3.connect(queueFile, timeout=30)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("""
+        CREATE TABLE IF NOT EXISTS approvals (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            address TEXT NOT NULL,
+            tierID INTEGER NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            enqueuedAt REAL NOT NULL,
+            submittedAt REAL,
+            verifiedAt REAL,
+            txHash TEXT,
+            attempts INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    connection.execute("CREATE INDEX IF NOT EXISTS approvalsStatus ON approvals (status, id)")
+    connection.commit()
+    return connection
+
+# =========================================================================================================================================
+def enqueue(connection, addressList, tierID):
+    now = time.time()
+    connection.executemany(
+        "INSERT INTO approvals (address, tierID, enqueuedAt) VALUES (?, ?, ?)",
+        [(str(address), int(tierID), now) for address in addressList]
+    )
+    connection.commit()
+
+# =========================================================================================================================================
+def enqueueToVerify():
+    # Moves the `toVerify` list of the values JSON into the queue.
+    loadConfig()
+    tierID = int(input("Enter the Tier ID (Based on JSON File): "))
+    connection = openQueue()
+    enqueue(connection, values['toVerify'], tierID)
+    print("Queued", len(values['toVerify']), "addresses for Tier ID", tierID)
+
+# == Daemon ===============================================================================================================================
+def runDaemon(stopEvent=None):
+    origins = Contract.from_abi("OriginsBase", address=values['origins'], abi=OriginsBase.abi, owner=acct)
+    if not origins.checkVerifier(acct):
+        raise Exception("Account " + str(acct) + " is not a verifier of Origins.")
+
+    connection = openQueue()
+    # Rows which were submitted by a previous run but never confirmed are checked again before anything else.
+    inFlight = {}
+    for txHash, submittedAt in connection.execute("SELECT txHash, MIN(submittedAt) FROM approvals WHERE status = 'submitted' GROUP BY txHash"):
+        inFlight[txHash] = submittedAt
+    nonce = acct.nonce
+
+    print("\nVerifier daemon started. Batch Size:", batchSize, "Batch Window:", batchWindow, "seconds.")
+    while stopEvent is None or not stopEvent.is_set():
+        nonce = flushBatches(connection, origins, inFlight, nonce, stopEvent is not None and stopEvent.is_set())
+        if confirmBatches(connection, inFlight):
+            # A lost transaction leaves a gap at its nonce, the next batch fills it.
+            nonce = web3.eth.get_transaction_count(acct.address, 'pending')
+        time.sleep(pollInterval)
+
+    # Drain whatever is left once asked to stop. Lost batches are queued again after `receiptTimeout`, and batches
+    # still pending by then are left as submitted for the next run.
+    nonce = flushBatches(connection, origins, inFlight, nonce, True)
+    drainUntil = time.time() + receiptTimeout
+    while len(inFlight) > 0 and time.time() < drainUntil:
+        confirmBatches(connection, inFlight)
+        time.sleep(pollInterval)
+    if len(inFlight) > 0:
+        print(len(inFlight), "batches are still pending, they are checked again on the next run.")
+    printLatency(connection)
+
+# =========================================================================================================================================
+def flushBatches(connection, origins, inFlight, nonce, force):
+    while True:
+        rows = connection.execute(
+            "SELECT id, address, tierID, enqueuedAt FROM approvals WHERE status = 'pending' ORDER BY id LIMIT ?",
+            (batchSize,)
+        ).fetchall()
+        if len(rows) == 0:
+            return nonce
+        if len(rows) < batchSize and time.time() - rows[0][3] < batchWindow and not force:
+            return nonce
+
+        ids = [row[0] for row in rows]
+        addressList = [row[1] for row in rows]
+        tierList = [row[2] for row in rows]
+
+        # Nonces are assigned locally so the next batch does not wait for this one to be mined.
+        txParams = {'from': acct, 'nonce': nonce, 'required_confs': 0}
+        try:
+            if len(set(tierList)) == 1:
+                tx = origins.multipleAddressSingleTierVerification(addressList, tierList[0], txParams)
+            else:
+                tx = origins.multipleAddressAndTierVerification(addressList, tierList, txParams)
+        except Exception as e:
+            # The rows stay in the queue and count an attempt, so a batch which can never be sent ends up failed.
+            # The nonce is read again, as a nonce error is one of the reasons, and the next poll tries again.
+            connection.executemany(
+                "UPDATE approvals SET attempts = attempts + 1, status = CASE WHEN attempts + 1 >= ? THEN 'failed' ELSE status END WHERE id = ?",
+                [(maxAttempts, rowID) for rowID in ids]
+            )
+            connection.commit()
+            print("Sending", len(ids), "addresses failed, they stay in the queue (up to", maxAttempts, "attempts):", e)
+            try:
+                return web3.eth.get_transaction_count(acct.address, 'pending')
+            except Exception:
+                return nonce
+        nonce += 1
+
+        inFlight[tx.txid] = time.time()
+        connection.executemany(
+            "UPDATE approvals SET status = 'submitted', submittedAt = ?, txHash = ?, attempts = attempts + 1 WHERE id = ?",
+            [(time.time(), tx.txid, rowID) for rowID in ids]
+        )
+        connection.commit()
+        print("Submitted", len(ids), "addresses in", tx.txid, "with nonce", nonce - 1)
+
+# =========================================================================================================================================
+def requeue(connection, txHash, reason):
+    # The addresses of a batch go back to the queue, unless they were submitted `maxAttempts` times already.
+    failed = connection.execute(
+        "SELECT COUNT(*) FROM approvals WHERE txHash = ? AND attempts >= ?", (txHash, maxAttempts)
+    ).fetchone()[0]
+    connection.execute("UPDATE approvals SET status = 'failed' WHERE txHash = ? AND attempts >= ?", (txHash, maxAttempts))
+    connection.execute("UPDATE approvals SET status = 'pending', txHash = NULL WHERE txHash = ? AND status = 'submitted'", (txHash,))
+    connection.commit()
+    if failed > 0:
+        print(reason, txHash, ",", failed, "addresses failed", maxAttempts, "times and are marked as failed.")
+    else:
+        print(reason, txHash, ", putting the addresses back to the queue.")
+
+# =========================================================================================================================================
+def confirmBatches(connection, inFlight):
+    # Returns True if a transaction was lost, which leaves a gap in the nonces.
+    lost = False
+    for txHash in list(inFlight.keys()):
+        try:
+            receipt = web3.eth.get_transaction_receipt(txHash)
+        except Exception:
+            receipt = None
+        if receipt is None:
+            # A transaction which was dropped, replaced, or sent on another (or a reset) chain never gets a receipt.
+            if time.time() - inFlight[txHash] < receiptTimeout:
+                continue
+            try:
+                web3.eth.get_transaction(txHash)
+                continue
+            except Exception:
+                del inFlight[txHash]
+                requeue(connection, txHash, "Lost")
+                lost = True
+                continue
+
+        del inFlight[txHash]
+        if receipt.status == 1:
+            connection.execute("UPDATE approvals SET status = 'verified', verifiedAt = ? WHERE txHash = ?", (time.time(), txHash))
+            connection.commit()
+            print("Confirmed", txHash, "in block", receipt.blockNumber)
+        else:
+            # A reverted batch goes back to the queue and will be picked up with the next flush, up to `maxAttempts` times.
+            requeue(connection, txHash, "Reverted")
+    return lost
+
+# =========================================================================================================================================
+def printLatency(connection):
+    latency = sorted(row[0] for row in connection.execute(
+        "SELECT verifiedAt - enqueuedAt FROM approvals WHERE status = 'verified'"
+    ))
+    print("\n=============================================================")
+    print("Time to Verified")
+    print("=============================================================")
+    print("Addresses Verified:  ", len(latency))
+    if len(latency) > 0:
+        print("Median (seconds):    ", round(latency[len(latency) // 2], 2))
+        print("95th % (seconds):    ", round(latency[min(len(latency) - 1, int(len(latency) * 0.95))], 2))
+        print("Maximum (seconds):   ", round(latency[-1], 2))
+    print("=============================================================")
+
+# == Synthetic Producer ===================================================================================================================
+def producer(total=500, meanInterval=0.05, tierList=None):
+    # Emulates KYC approvals trickling in, each approval for one random tier.
+    connection = openQueue()
+    tierList = tierList or [1]
+    for index in range(total):
+        enqueue(connection, [web3.toChecksumAddress('0x' + os.urandom(20).hex())], random.choice(tierList))
+        time.sleep(random.expovariate(1 / meanInterval))
+    print("Producer queued", total, "approvals.")
+
+# =========================================================================================================================================
+def simulate():
+    # Runs a synthetic producer against the daemon on a fresh fixture, and reports the time-to-verified latency.
+    global values, queueFile
+    from scripts.origins import fixtureCache
+
+    loadConfig()
+    if thisNetwork != "development":
+        raise Exception("Simulation is only supported on development.")
+
+    fixtureCache.loadConfig()
+    values = fixtureCache.loadFixture()
+    tierList = [fixtureCache.createTier(1), fixtureCache.createTier(2)]
+    # The synthetic addresses go to a queue of their own, never to the real one.
+    queueFile = os.path.join(tempfile.mkdtemp(), 'queue.db')
+
+    stopEvent = threading.Event()
+    daemon = threading.Thread(target=runDaemon, args=(stopEvent,))
+    daemon.start()
+    producer(tierList=tierList)
+    stopEvent.set()
+    daemon.join()
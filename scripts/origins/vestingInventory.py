@@ -0,0 +1,209 @@
+from brownie import *
+from scripts.origins.rpcBatch import eventTopic, topicAddress, getLogs, selector, concurrentCalls
+
+import os
+import json
+import time
+import numpy as np
+
+# Requires NumPy in the brownie environment (`pip install numpy`).
+inventoryDir = './build/vestings'
+# Vestings are fetched and stored in parts of this size, a run which stops resumes at the first missing part.
+partSize = int(os.environ.get('INVENTORY_PART_SIZE', 1000))
+
+zeroAddress = '0x0000000000000000000000000000000000000000'
+
+def main():
+    loadConfig()
+
+    inventory = VestingInventory(values['lockedFund'], values['vestingRegistry'], int(values.get('lockedFundDeployBlock', 0)))
+    timeBefore = time.time()
+    inventory.discover()
+    timeDiscovered = time.time()
+    inventory.fetchStakes()
+    timeFetched = time.time()
+
+    columns = inventory.load()
+    printSummary(inventory, columns)
+    print("Discovery Time:              ", round(timeDiscovered - timeBefore, 2), "seconds")
+    print("Stake Fetch Time:            ", round(timeFetched - timeDiscovered, 2), "seconds")
+    print("=============================================================")
+
+# =========================================================================================================================================
+def loadConfig():
+    global values, thisNetwork
+    thisNetwork = network.show_active()
+
+    if thisNetwork == "development":
+        configFile = open('./scripts/origins/values/development.json')
+    elif thisNetwork == "testnet" or thisNetwork == "testnet-ws" or thisNetwork == "rsk-testnet":
+        configFile = open('./scripts/origins/values/testnet.json')
+    elif thisNetwork == "rsk-mainnet":
+        configFile = open('./scripts/origins/values/mainnet.json')
+    else:
+        raise Exception("Network not supported.")
+
+    # Load deployment parameters and contracts addresses
+    values = json.load(configFile)
+
+# =========================================================================================================================================
+class VestingInventory:
+    # `vestings.json` keeps the discovered (user, vesting) pairs and the last scanned block, so discovery is incremental.
+    # `run.json` pins a stake fetch to one block and vesting count, and each `part-N.npz` holds the stakes of `partSize` vestings.
+    # Once all parts of a run are there they are merged into `inventory.npz`, and the next run starts at a new block.
+
+    def __init__(self, lockedFundAddress, vestingRegistryAddress, startBlock):
+        self.lockedFund = lockedFundAddress
+        self.registry = Contract.from_abi("VestingRegistry3", address=vestingRegistryAddress, abi=VestingRegistry3.abi)
+        self.staking = self.registry.staking()
+        self.directory = os.path.join(inventoryDir, lockedFundAddress.lower())
+        os.makedirs(self.directory, exist_ok=True)
+
+        self.discovered = self.readJson('vestings.json', {'lastBlock': startBlock - 1, 'vestings': [], 'pending': []})
+        self.run = self.readJson('run.json', {'block': 0, 'complete': True})
+
+    def readJson(self, fileName, default):
+        path = os.path.join(self.directory, fileName)
+        if not os.path.exists(path):
+            return default
+        with open(path) as fileHandle:
+            return json.load(fileHandle)
+
+    def writeJson(self, fileName, item):
+        path = os.path.join(self.directory, fileName)
+        with open(path + '.tmp', "w") as fileHandle:
+            json.dump(item, fileHandle)
+        os.replace(path + '.tmp', path)
+
+    def partFile(self, index):
+        return os.path.join(self.directory, 'part-' + str(index).rjust(5, '0') + '.npz')
+
+    def discover(self):
+        # Vestings created through LockedFund come with `VestingCreated`. Users with a vested deposit but no such event
+        # (a vesting created on the registry directly) are looked up with `getVesting`, until they have one.
+        latest = web3.eth.block_number
+        fromBlock = self.discovered['lastBlock'] + 1
+        known = set(user for user, vesting in self.discovered['vestings'])
+        pending = set(self.discovered['pending'])
+
+        for log in getLogs(self.lockedFund, [eventTopic("VestingCreated(address,address,address)")], fromBlock, latest):
+            user = topicAddress(log['topics'][2])
+            if user not in known:
+                known.add(user)
+                self.discovered['vestings'].append([user, topicAddress(log['topics'][3])])
+        for log in getLogs(self.lockedFund, [eventTopic("VestedDeposited(address,address,uint256,uint256,uint256,uint256)")], fromBlock, latest):
+            pending.add(topicAddress(log['topics'][2]))
+
+        pending = sorted(pending - known)
+        getVesting = selector("getVesting(address)")
+        results = concurrentCalls([(self.registry.address, getVesting + user[2:].rjust(64, '0')) for user in pending], latest)
+        stillPending = []
+        for user, result in zip(pending, results):
+            vesting = '0x' + result[-40:]
+            if vesting == zeroAddress:
+                stillPending.append(user)
+            else:
+                self.discovered['vestings'].append([user, vesting])
+
+        self.discovered['pending'] = stillPending
+        self.discovered['lastBlock'] = latest
+        self.writeJson('vestings.json', self.discovered)
+
+    def fetchStakes(self):
+        if self.run['complete']:
+            for fileName in os.listdir(self.directory):
+                if fileName.startswith('part-'):
+                    os.remove(os.path.join(self.directory, fileName))
+            self.run = {'block': web3.eth.block_number, 'vestingCount': len(self.discovered['vestings']), 'complete': False}
+            self.writeJson('run.json', self.run)
+
+        # Vestings discovered while a run is resumed are left for the next run, so the parts keep their content.
+        vestings = self.discovered['vestings'][:self.run['vestingCount']]
+        getStakes = selector("getStakes(address)")
+        for index in range((len(vestings) + partSize - 1) // partSize):
+            if os.path.exists(self.partFile(index)):
+                continue
+            part = vestings[index * partSize:(index + 1) * partSize]
+            results = concurrentCalls([(self.staking, getStakes + vesting[2:].rjust(64, '0')) for user, vesting in part], self.run['block'])
+            self.writePart(index, part, results)
+            print("Fetched stakes of", min((index + 1) * partSize, len(vestings)), "of", len(vestings), "vestings.")
+
+        self.merge((len(vestings) + partSize - 1) // partSize)
+        self.run['complete'] = True
+        self.writeJson('run.json', self.run)
+
+    def writePart(self, index, part, results):
+        # One row per (vesting, lock date). Stakes are uint96, so they are kept as two 64 bit words.
+        users, vestings, dates, stakes = [], [], [], []
+        for (user, vesting), result in zip(part, results):
+            decoded = web3.codec.decode_abi(['uint256[]', 'uint96[]'], bytes.fromhex(result[2:]))
+            for date, stake in zip(decoded[0], decoded[1]):
+                users.append(bytes.fromhex(user[2:]))
+                vestings.append(bytes.fromhex(vesting[2:]))
+                dates.append(date)
+                stakes.append(stake)
+        np.savez(
+            self.partFile(index) + '.tmp.npz',
+            user=np.array(users, dtype='S20'),
+            vesting=np.array(vestings, dtype='S20'),
+            date=np.array(dates, dtype=np.int64),
+            stakeHigh=np.array([stake >> 64 for stake in stakes], dtype=np.uint64),
+            stakeLow=np.array([stake & (2 ** 64 - 1) for stake in stakes], dtype=np.uint64)
+        )
+        os.replace(self.partFile(index) + '.tmp.npz', self.partFile(index))
+
+    def merge(self, partCount):
+        parts = [np.load(self.partFile(index)) for index in range(partCount)]
+        columns = {}
+        for name, dtype in [('user', 'S20'), ('vesting', 'S20'), ('date', np.int64), ('stakeHigh', np.uint64), ('stakeLow', np.uint64)]:
+            columns[name] = np.concatenate([part[name] for part in parts]) if len(parts) > 0 else np.array([], dtype=dtype)
+        np.savez(os.path.join(self.directory, 'inventory.tmp.npz'), block=np.array([self.run['block']]), **columns)
+        os.replace(os.path.join(self.directory, 'inventory.tmp.npz'), os.path.join(self.directory, 'inventory.npz'))
+
+    def load(self):
+        inventory = np.load(os.path.join(self.directory, 'inventory.npz'))
+        columns = {name: inventory[name] for name in inventory.files}
+        # Exact stakes as Python integers (object array) for summing.
+        columns['stake'] = columns['stakeHigh'].astype(object) * (2 ** 64) + columns['stakeLow'].astype(object)
+        return columns
+
+# =========================================================================================================================================
+def stakedPerDate(columns):
+    dates, index = np.unique(columns['date'], return_inverse=True)
+    totals = np.zeros(len(dates), dtype=object)
+    np.add.at(totals, index, columns['stake'])
+    return dates, totals
+
+# =========================================================================================================================================
+def userSchedule(columns, user, after=0):
+    # The remaining lock dates (after `after`) and stakes of one user, over all their vestings.
+    selected = (columns['user'] == bytes.fromhex(user[2:].lower())) & (columns['date'] > after)
+    order = np.argsort(columns['date'][selected])
+    return list(zip(columns['date'][selected][order], columns['stake'][selected][order]))
+
+# =========================================================================================================================================
+def printSummary(inventory, columns):
+    dates, totals = stakedPerDate(columns)
+    print("\n=============================================================")
+    print("Vesting Inventory at Block", inventory.run['block'])
+    print("=============================================================")
+    print("Vestings:                    ", inventory.run['vestingCount'])
+    print("Users without Vesting yet:   ", len(inventory.discovered['pending']))
+    print("Stake Rows:                  ", len(columns['date']))
+    print("Total Staked:                ", sum(totals))
+    print("-------------------------------------------------------------")
+    print("Lock Date".ljust(14), "Staked".rjust(32))
+    for date, total in zip(dates, totals):
+        print(time.strftime("%Y-%m-%d", time.gmtime(int(date))).ljust(14), str(total).rjust(32))
+    print("=============================================================")
+
+# =========================================================================================================================================
+def query():
+    loadConfig()
+    inventory = VestingInventory(values['lockedFund'], values['vestingRegistry'], int(values.get('lockedFundDeployBlock', 0)))
+    columns = inventory.load()
+    user = input("Enter the user address: ")
+    now = web3.eth.get_block('latest').timestamp
+    print("\nRemaining schedule of", user)
+    for date, stake in userSchedule(columns, user, now):
+        print(time.strftime("%Y-%m-%d", time.gmtime(int(date))).ljust(14), str(stake).rjust(32))
@@ -0,0 +1,176 @@
+from brownie import *
+from web3.providers.base import BaseProvider
+from collections import OrderedDict
+
+import os
+import json
+import rlp
+import time
+
+cacheSize = int(os.environ.get('VIEW_CACHE_SIZE', 1024))
+# How long the latest block number is trusted before it is asked again. Our own transactions always force a new check.
+blockInterval = float(os.environ.get('VIEW_CACHE_BLOCK_INTERVAL', 1))
+
+# Requests whose answer only depends on the state at a block.
+cachedMethods = ['eth_call', 'eth_getBalance', 'eth_getCode']
+transactionMethods = ['eth_sendTransaction', 'eth_sendRawTransaction']
+# Requests which move the chain to another state or time on development, after which no entry can be trusted.
+resetMethods = ['evm_revert', 'evm_snapshot', 'evm_mine', 'evm_increaseTime', 'evm_setNextBlockTimestamp']
+
+def main():
+    # Reads the same views twice, to show the cache answering the second round.
+    loadConfig()
+    cache = installCache()
+    origins = Contract.from_abi("OriginsBase", address=values['origins'], abi=OriginsBase.abi)
+    token = Contract.from_abi("Token", address=values['token'], abi=Token.abi)
+
+    for iteration in range(2):
+        timeBefore = time.time()
+        origins.getOwners()
+        origins.getVerifiers()
+        tierCount = origins.getTierCount()
+        for tierID in range(1, tierCount + 1):
+            origins.readTierPartA(tierID)
+            origins.readTierPartB(tierID)
+        token.balanceOf(origins.address)
+        print("Round", iteration + 1, "took", round(time.time() - timeBefore, 4), "seconds.")
+
+    printStats(cache)
+
+# =========================================================================================================================================
+def loadConfig():
+    global values, thisNetwork
+    thisNetwork = network.show_active()
+
+    if thisNetwork == "development":
+        configFile = open('./scripts/origins/values/development.json')
+    elif thisNetwork == "testnet" or thisNetwork == "testnet-ws" or thisNetwork == "rsk-testnet":
+        configFile = open('./scripts/origins/values/testnet.json')
+    elif thisNetwork == "rsk-mainnet":
+        configFile = open('./scripts/origins/values/mainnet.json')
+    else:
+        raise Exception("Network not supported.")
+
+    # Load deployment parameters and contracts addresses
+    values = json.load(configFile)
+
+# =========================================================================================================================================
+def blockNumberOf(blockIdentifier):
+    if isinstance(blockIdentifier, int):
+        return blockIdentifier
+    if isinstance(blockIdentifier, str) and blockIdentifier.startswith('0x'):
+        return int(blockIdentifier, 16)
+    return None
+
+# =========================================================================================================================================
+def transactionTarget(method, params):
+    # The contract a transaction of ours is sent to, None if it cannot be told (contract creation or an unknown encoding).
+    if method == 'eth_sendTransaction':
+        return params[0].get('to')
+    try:
+        fields = rlp.decode(bytes.fromhex(params[0][2:]))
+        return '0x' + fields[3].hex() if len(fields[3]) == 20 else None
+    except Exception:
+        return None
+
+# =========================================================================================================================================
+class CachingProvider(BaseProvider):
+    # Answers repeated view calls from memory, keyed by (method, contract, caller, calldata, block).
+    # Calls for `latest` are pinned to the latest block number, so a new block makes all of them miss.
+    # A transaction of ours drops the entries of the contract it was sent to, and forces a new block number check.
+    # `evm_revert`, `evm_snapshot` and the requests moving time or mining (`evm_mine`, `evm_increaseTime`, `evm_setNextBlockTimestamp`)
+    # drop all entries, pinned ones included, as the same block numbers may come back with another state.
+
+    def __init__(self, provider):
+        super().__init__()
+        self.provider = provider
+        self.entries = OrderedDict()
+        self.latestBlock = None
+        self.checkedAt = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def currentBlock(self):
+        if time.time() - self.checkedAt >= blockInterval:
+            response = self.provider.make_request('eth_blockNumber', [])
+            block = int(response['result'], 16)
+            if block != self.latestBlock:
+                # Entries pinned to an older `latest` can never be hit again.
+                self.entries = OrderedDict((key, value) for key, value in self.entries.items() if key[-1] != 'latest')
+                self.latestBlock = block
+            self.checkedAt = time.time()
+        return self.latestBlock
+
+    def cacheKey(self, method, params):
+        if method == 'eth_call':
+            call, blockIdentifier = params[0], (params[1] if len(params) > 1 else 'latest')
+            target = call.get('to', '').lower()
+            request = (call.get('from', '').lower(), call.get('data', call.get('input', '')), call.get('value', 0))
+        else:
+            target, blockIdentifier = params[0].lower(), (params[1] if len(params) > 1 else 'latest')
+            request = ()
+        block = blockNumberOf(blockIdentifier)
+        if block is not None:
+            return (method, target, request, block, 'pinned')
+        if blockIdentifier != 'latest':
+            return None
+        return (method, target, request, self.currentBlock(), 'latest')
+
+    def make_request(self, method, params):
+        if method in resetMethods:
+            self.invalidate(None)
+            return self.provider.make_request(method, params)
+        if method in transactionMethods:
+            self.invalidate(transactionTarget(method, params))
+            return self.provider.make_request(method, params)
+        if method not in cachedMethods:
+            return self.provider.make_request(method, params)
+
+        key = self.cacheKey(method, params)
+        if key is None:
+            return self.provider.make_request(method, params)
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+
+        self.misses += 1
+        response = self.provider.make_request(method, params)
+        if 'error' not in response:
+            self.entries[key] = response
+            if len(self.entries) > cacheSize:
+                self.entries.popitem(last=False)
+        return response
+
+    def invalidate(self, target):
+        if target is None:
+            self.invalidations += len(self.entries)
+            self.entries = OrderedDict()
+        else:
+            target = target.lower()
+            keys = [key for key in self.entries if key[1] == target and key[-1] == 'latest']
+            for key in keys:
+                del self.entries[key]
+            self.invalidations += len(keys)
+        # The transaction may change other contracts as well (token balances for example), which the next block check catches.
+        self.checkedAt = 0
+
+    def isConnected(self):
+        return self.provider.isConnected()
+
+# =========================================================================================================================================
+def installCache():
+    cache = CachingProvider(web3.provider)
+    web3.provider = cache
+    return cache
+
+# =========================================================================================================================================
+def printStats(cache):
+    total = cache.hits + cache.misses
+    print("=============================================================")
+    print("View Cache Hits:     ", cache.hits)
+    print("View Cache Misses:   ", cache.misses)
+    print("Hit Rate:            ", str(round(cache.hits * 100 / total, 2)) + "%" if total > 0 else "-")
+    print("Invalidated Entries: ", cache.invalidations)
+    print("=============================================================")
@@ -0,0 +1,178 @@
+from brownie import *
+
+import os
+import json
+import time
+import random
+import sqlite3
+
+ledgerDir = './build/ledger'
+# Blocks this deep are considered final, younger ones are picked up by the next sync.
+confirmations = int(os.environ.get('LEDGER_CONFIRMATIONS', 10))
+sampleSize = int(os.environ.get('LEDGER_SAMPLE_SIZE', 20))
+
+minChunk = 10
+maxChunk = 100000
+# The chunk grows while a request returns fewer logs than this, and shrinks when it fails.
+targetLogs = 2000
+
+zeroAddress = '0x0000000000000000000000000000000000000000'
+transferTopic = '0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef'
+
+def main():
+    loadConfig()
+
+    ledger = HolderLedger(values['token'], int(values.get('tokenDeployBlock', 0)))
+    timeBefore = time.time()
+    ledger.sync()
+    print("\nSynced up to block", ledger.lastBlock, "in", round(time.time() - timeBefore, 2), "seconds.")
+
+    printDistribution(ledger)
+    verifySample(ledger)
+
+# =========================================================================================================================================
+def loadConfig():
+    global values, thisNetwork
+    thisNetwork = network.show_active()
+
+    if thisNetwork == "development":
+        configFile = open('./scripts/token/values/development.json')
+    elif thisNetwork == "testnet" or thisNetwork == "testnet-ws":
+        configFile = open('./scripts/token/values/testnet.json')
+    elif thisNetwork == "rsk-testnet":
+        configFile = open('./scripts/token/values/testnet.json')
+    elif thisNetwork == "rsk-mainnet":
+        configFile = open('./scripts/token/values/mainnet.json')
+    else:
+        raise Exception("Network not supported")
+
+    # Load values & deployed contracts addresses.
+    values = json.load(configFile)
+
+# =========================================================================================================================================
+class HolderLedger:
+    # `balances` holds the current balance of every holder and is updated in place with each chunk of `Transfer` logs.
+    # `history` holds the balance of an address after every block it changed in, for point in time queries.
+    # Balances are stored as decimal text, as they do not fit into SQLite integers.
+
+    def __init__(self, tokenAddress, startBlock):
+        os.makedirs(ledgerDir, exist_ok=True)
+        self.token = tokenAddress
+        self.connection = sqlite3.connect(os.path.join(ledgerDir, tokenAddress.lower() + '.db'))
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS balances (address TEXT PRIMARY KEY, balance TEXT NOT NULL) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS history (address TEXT NOT NULL, block INTEGER NOT NULL, balance TEXT NOT NULL, PRIMARY KEY (address, block)) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+        """)
+        row = self.connection.execute("SELECT value FROM meta WHERE key = 'lastBlock'").fetchone()
+        self.lastBlock = int(row[0]) if row is not None else startBlock - 1
+        row = self.connection.execute("SELECT value FROM meta WHERE key = 'chunk'").fetchone()
+        self.chunk = int(row[0]) if row is not None else 1000
+
+    def fetchLogs(self, fromBlock, toBlock):
+        # Adaptive chunking: halve on failure (too many results or a timeout), grow while the answers stay small.
+        while True:
+            end = min(fromBlock + self.chunk - 1, toBlock)
+            try:
+                logs = web3.eth.get_logs({'address': self.token, 'topics': [transferTopic], 'fromBlock': fromBlock, 'toBlock': end})
+            except Exception:
+                if self.chunk <= minChunk:
+                    raise
+                self.chunk = max(minChunk, self.chunk // 2)
+                continue
+            if len(logs) < targetLogs // 2:
+                self.chunk = min(maxChunk, self.chunk * 2)
+            elif len(logs) > targetLogs:
+                self.chunk = max(minChunk, self.chunk // 2)
+            return logs, end
+
+    def apply(self, logs, toBlock):
+        changed = {}
+        touched = {}
+        for log in logs:
+            amount = int(log['data'], 16)
+            sender = '0x' + log['topics'][1].hex()[-40:]
+            receiver = '0x' + log['topics'][2].hex()[-40:]
+            # Mints and burns only move the balance of the real address.
+            for address, delta in ((sender, -amount), (receiver, amount)):
+                if address == zeroAddress:
+                    continue
+                if address not in changed:
+                    row = self.connection.execute("SELECT balance FROM balances WHERE address = ?", (address,)).fetchone()
+                    changed[address] = int(row[0]) if row is not None else 0
+                changed[address] += delta
+                touched[(address, log['blockNumber'])] = changed[address]
+
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO balances (address, balance) VALUES (?, ?) ON CONFLICT(address) DO UPDATE SET balance = excluded.balance",
+                [(address, str(balance)) for address, balance in changed.items()]
+            )
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO history (address, block, balance) VALUES (?, ?, ?)",
+                [(address, block, str(balance)) for (address, block), balance in touched.items()]
+            )
+            self.connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('lastBlock', ?)", (str(toBlock),))
+            self.connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('chunk', ?)", (str(self.chunk),))
+        self.lastBlock = toBlock
+
+    def sync(self):
+        target = web3.eth.block_number - (0 if thisNetwork == "development" else confirmations)
+        while self.lastBlock < target:
+            logs, end = self.fetchLogs(self.lastBlock + 1, target)
+            self.apply(logs, end)
+
+    def balanceOf(self, address):
+        row = self.connection.execute("SELECT balance FROM balances WHERE address = ?", (address.lower(),)).fetchone()
+        return int(row[0]) if row is not None else 0
+
+    def balanceAt(self, address, block):
+        if block > self.lastBlock:
+            raise Exception("Block " + str(block) + " is not synced yet, last synced block is " + str(self.lastBlock) + ".")
+        row = self.connection.execute(
+            "SELECT balance FROM history WHERE address = ? AND block <= ? ORDER BY block DESC LIMIT 1",
+            (address.lower(), block)
+        ).fetchone()
+        return int(row[0]) if row is not None else 0
+
+    def holders(self):
+        rows = self.connection.execute("SELECT address, balance FROM balances").fetchall()
+        return sorted([(address, int(balance)) for address, balance in rows if int(balance) != 0], key=lambda item: -item[1])
+
+# =========================================================================================================================================
+def printDistribution(ledger, top=20):
+    holders = ledger.holders()
+    total = sum(balance for address, balance in holders)
+    print("\n=============================================================")
+    print("Holder Distribution at Block", ledger.lastBlock)
+    print("=============================================================")
+    print("Holders:             ", len(holders))
+    print("Total Held:          ", total)
+    for address, balance in holders[:top]:
+        print(web3.toChecksumAddress(address), str(balance).rjust(32), str(round(balance * 100 / total, 4)) + "%")
+    print("=============================================================")
+
+# =========================================================================================================================================
+def verifySample(ledger):
+    # Compares random holders against `balanceOf` at the last synced block. Needs a node which serves state at that block.
+    token = Contract.from_abi("Token", address=values['token'], abi=Token.abi)
+    holders = ledger.holders()
+    sample = random.sample(holders, min(sampleSize, len(holders)))
+    mismatches = 0
+    for address, balance in sample:
+        onChain = token.balanceOf(web3.toChecksumAddress(address), block_identifier=ledger.lastBlock)
+        ledgerBalance = ledger.balanceAt(address, ledger.lastBlock)
+        if onChain != ledgerBalance:
+            mismatches += 1
+            print("Mismatch for", address, "Ledger:", ledgerBalance, "balanceOf:", onChain)
+    print("\nVerified", len(sample), "random holders against balanceOf,", mismatches, "mismatches.")
+
+# =========================================================================================================================================
+def query():
+    loadConfig()
+    ledger = HolderLedger(values['token'], int(values.get('tokenDeployBlock', 0)))
+    ledger.sync()
+    address = input("Enter the address: ")
+    block = input("Enter the block number (empty for latest synced): ")
+    block = int(block) if block != "" else ledger.lastBlock
+    print("\nBalance of", address, "at block", block, "is", ledger.balanceAt(address, block))
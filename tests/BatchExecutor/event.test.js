@@ -0,0 +1,57 @@
+const {
+	// External Functions
+	expectEvent,
+	assert,
+	// Custom Functions
+	currentTimestamp,
+	createStakeAndVest,
+	// Contract Artifacts
+	Token,
+	LockedFund,
+	OriginsBase,
+	BatchExecutor,
+} = require("../utils");
+
+const { zero } = require("../constants");
+
+let { waitedTS } = require("../variable");
+
+contract("BatchExecutor (Events)", (accounts) => {
+	let token, lockedFund, vestingRegistry, vestingLogic, stakingLogic, originsBase, batchExecutor;
+	let creator, owner, verifier, depositAddr;
+
+	before("Initiating Accounts & Creating Test Contract Instance.", async () => {
+		// Checking if we have enough accounts to test.
+		assert.isAtLeast(accounts.length, 4, "Alteast 4 accounts are required to test the contracts.");
+		[creator, owner, verifier, depositAddr] = accounts;
+
+		waitedTS = await currentTimestamp();
+
+		// Creating the instance of Test Token.
+		token = await Token.new(zero, "Test Token", "TST", 18, { from: creator });
+
+		// Creating the Staking and Vesting
+		[staking, vestingLogic, vestingRegistry] = await createStakeAndVest(creator, token);
+
+		// Creating the instances of BatchExecutor, LockedFund and OriginsBase Contract.
+		batchExecutor = await BatchExecutor.new({ from: owner });
+		lockedFund = await LockedFund.new(waitedTS, token.address, vestingRegistry.address, [batchExecutor.address], { from: creator });
+		originsBase = await OriginsBase.new([batchExecutor.address], token.address, depositAddr, { from: creator });
+	});
+
+	it("Executing a batch should emit BatchExecuted.", async () => {
+		let txReceipt = await batchExecutor.executeBatch(
+			[originsBase.address, lockedFund.address],
+			[0, 0],
+			[
+				originsBase.contract.methods.addVerifier(verifier).encodeABI(),
+				lockedFund.contract.methods.addAdmin(originsBase.address).encodeABI(),
+			],
+			{ from: owner }
+		);
+		expectEvent(txReceipt, "BatchExecuted", {
+			_initiator: owner,
+			_callCount: "2",
+		});
+	});
+});
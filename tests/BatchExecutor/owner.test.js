@@ -0,0 +1,147 @@
+const {
+	// External Functions
+	expectRevert,
+	assert,
+	// Custom Functions
+	currentTimestamp,
+	createStakeAndVest,
+	// Contract Artifacts
+	Token,
+	LockedFund,
+	OriginsBase,
+	BatchExecutor,
+} = require("../utils");
+
+const { zero, zeroAddress } = require("../constants");
+
+let {
+	waitedTS,
+	firstMaxAmount,
+	firstRemainingTokens,
+	firstSaleStartTS,
+	firstSaleEnd,
+	firstUnlockedBP,
+	firstVestOrLockCliff,
+	firstVestOfLockDuration,
+	firstDepositRate,
+	firstDepositType,
+	firstVerificationType,
+	firstSaleEndDurationOrTS,
+	firstTransferType,
+} = require("../variable");
+
+contract("BatchExecutor (Owner Functions)", (accounts) => {
+	let token, lockedFund, vestingRegistry, vestingLogic, stakingLogic, originsBase, batchExecutor;
+	let creator, owner, userOne, userTwo, verifier, depositAddr, newDepositAddr;
+
+	before("Initiating Accounts & Creating Test Token Instance.", async () => {
+		// Checking if we have enough accounts to test.
+		assert.isAtLeast(accounts.length, 7, "Alteast 7 accounts are required to test the contracts.");
+		[creator, owner, userOne, userTwo, verifier, depositAddr, newDepositAddr] = accounts;
+
+		// Creating the instance of Test Token.
+		token = await Token.new(zero, "Test Token", "TST", 18, { from: creator });
+
+		// Creating the Staking and Vesting
+		[staking, vestingLogic, vestingRegistry] = await createStakeAndVest(creator, token);
+	});
+
+	beforeEach("Creating New Contract Instances.", async () => {
+		let timestamp = await currentTimestamp();
+		waitedTS = timestamp;
+		firstSaleStartTS = timestamp;
+
+		// Creating the instance of BatchExecutor Contract.
+		batchExecutor = await BatchExecutor.new({ from: owner });
+
+		// Creating the instance of LockedFund and OriginsBase Contract, with the BatchExecutor as an admin/owner.
+		lockedFund = await LockedFund.new(waitedTS, token.address, vestingRegistry.address, [batchExecutor.address], { from: creator });
+		originsBase = await OriginsBase.new([batchExecutor.address], token.address, depositAddr, { from: creator });
+	});
+
+	it("Owner should be able to execute an Origins and Locked Fund setup in a single batch.", async () => {
+		// The tokens for sale are pulled from the executor by createTier, so it has to hold and approve them first.
+		await token.mint(batchExecutor.address, firstRemainingTokens);
+		let calls = [
+			[originsBase.address, originsBase.contract.methods.setLockedFund(lockedFund.address).encodeABI()],
+			[lockedFund.address, lockedFund.contract.methods.addAdmin(originsBase.address).encodeABI()],
+			[originsBase.address, originsBase.contract.methods.addVerifier(verifier).encodeABI()],
+			[token.address, token.contract.methods.approve(originsBase.address, firstRemainingTokens.toString()).encodeABI()],
+			[
+				originsBase.address,
+				originsBase.contract.methods
+					.createTier(
+						firstMaxAmount.toString(),
+						firstRemainingTokens.toString(),
+						firstSaleStartTS.toString(),
+						firstSaleEnd,
+						firstUnlockedBP,
+						firstVestOrLockCliff,
+						firstVestOfLockDuration,
+						firstDepositRate,
+						firstDepositType,
+						firstVerificationType,
+						firstSaleEndDurationOrTS,
+						firstTransferType
+					)
+					.encodeABI(),
+			],
+		];
+		await batchExecutor.executeBatch(
+			calls.map((call) => call[0]),
+			calls.map(() => 0),
+			calls.map((call) => call[1]),
+			{ from: owner }
+		);
+
+		assert.strictEqual(await originsBase.getLockDetails(), lockedFund.address, "The locked fund does not match.");
+		assert.isTrue(await lockedFund.adminStatus(originsBase.address), "Origins is not an admin of Locked Fund.");
+		assert.isTrue(await originsBase.checkVerifier(verifier), "The verifier was not added.");
+		assert.equal((await originsBase.getTierCount()).toNumber(), 1, "The tier was not created.");
+	});
+
+	it("Owner should not be able to execute a batch where a call fails, and no call should be applied.", async () => {
+		let calls = [
+			[originsBase.address, originsBase.contract.methods.setDepositAddress(newDepositAddr).encodeABI()],
+			[originsBase.address, originsBase.contract.methods.setDepositAddress(zeroAddress).encodeABI()],
+		];
+		await expectRevert(
+			batchExecutor.executeBatch(
+				calls.map((call) => call[0]),
+				calls.map(() => 0),
+				calls.map((call) => call[1]),
+				{ from: owner }
+			),
+			"OriginsBase: Deposit Address cannot be zero."
+		);
+		assert.strictEqual(await originsBase.getDepositAddress(), depositAddr, "The deposit address should not be updated.");
+	});
+
+	it("Owner should not be able to execute an empty batch.", async () => {
+		await expectRevert(batchExecutor.executeBatch([], [], [], { from: owner }), "BatchExecutor: No calls to execute.");
+	});
+
+	it("Owner should not be able to execute a batch with array lengths which do not match.", async () => {
+		await expectRevert(
+			batchExecutor.executeBatch([originsBase.address], [0, 0], ["0x"], { from: owner }),
+			"BatchExecutor: Array lengths do not match."
+		);
+	});
+
+	it("Owner should not be able to execute a batch with a zero address as target.", async () => {
+		await expectRevert(batchExecutor.executeBatch([zeroAddress], [0], ["0x"], { from: owner }), "BatchExecutor: Target Address cannot be zero.");
+	});
+
+	it("Normal user should not be able to execute a batch.", async () => {
+		let data = originsBase.contract.methods.setDepositAddress(newDepositAddr).encodeABI();
+		await expectRevert(batchExecutor.executeBatch([originsBase.address], [0], [data], { from: userOne }), "unauthorized");
+	});
+
+	it("Normal user should not be able to withdraw RBTC from the executor.", async () => {
+		await expectRevert(batchExecutor.withdraw(userOne, 1, { from: userOne }), "unauthorized");
+	});
+
+	it("Owner should not be able to withdraw RBTC to a zero address.", async () => {
+		await expectRevert(batchExecutor.withdraw(zeroAddress, 1, { from: owner }), "BatchExecutor: Receiver Address cannot be zero.");
+	});
+});
@@ -12,7 +12,7 @@ const {
 	VestingRegistry,
 } = require("../utils");
 
-const { zero, zeroAddress, zeroBasisPoint, invalidBasisPoint, unlockTypeWaited } = require("../constants");
+const { zero, zeroAddress, zeroBasisPoint, fiftyBasisPoint, invalidBasisPoint, unlockTypeWaited } = require("../constants");
 
 let { cliff, duration, waitedTS } = require("../variable");
 
@@ -95,6 +95,96 @@ contract("LockedFund (Admin Functions)", (accounts) => {
 		await lockedFund.depositVested(userOne, value, cliff, duration, zeroBasisPoint, unlockTypeWaited, { from: admin });
 	});
 
+	it("Admin should be able to deposit for multiple users using depositVestedMultiple().", async () => {
+		let values = [randomValue(), randomValue()];
+		let total = values[0] + values[1];
+		token.mint(admin, total, { from: creator });
+		token.approve(lockedFund.address, total, { from: admin });
+		let fundBalance = (await token.balanceOf(lockedFund.address)).toNumber();
+		let vestedBalances = [
+			(await lockedFund.getVestedBalance(userTwo)).toNumber(),
+			(await lockedFund.getVestedBalance(userThree)).toNumber(),
+		];
+		let waitedUnlockedBalance = (await lockedFund.getWaitedUnlockedBalance(userThree)).toNumber();
+
+		await lockedFund.depositVestedMultiple(
+			[userTwo, userThree],
+			values,
+			[cliff, cliff],
+			[duration, duration],
+			[zeroBasisPoint, fiftyBasisPoint],
+			unlockTypeWaited,
+			{ from: admin }
+		);
+
+		let unlocked = Math.floor((values[1] * fiftyBasisPoint) / 10000);
+		assert.equal((await token.balanceOf(lockedFund.address)).toNumber(), fundBalance + total, "The total amount was not transferred.");
+		assert.equal(
+			(await lockedFund.getVestedBalance(userTwo)).toNumber(),
+			vestedBalances[0] + values[0],
+			"The vested balance does not match."
+		);
+		assert.equal(
+			(await lockedFund.getVestedBalance(userThree)).toNumber(),
+			vestedBalances[1] + values[1] - unlocked,
+			"The vested balance does not match."
+		);
+		assert.equal(
+			(await lockedFund.getWaitedUnlockedBalance(userThree)).toNumber(),
+			waitedUnlockedBalance + unlocked,
+			"The waited unlocked balance does not match."
+		);
+	});
+
+	it("Admin should not be able to deposit using depositVestedMultiple() with array lengths mismatch.", async () => {
+		let value = randomValue();
+		await expectRevert(
+			lockedFund.depositVestedMultiple(
+				[userTwo, userThree],
+				[value],
+				[cliff, cliff],
+				[duration, duration],
+				[zeroBasisPoint, zeroBasisPoint],
+				unlockTypeWaited,
+				{ from: admin }
+			),
+			"LockedFund: Array lengths do not match."
+		);
+	});
+
+	it("Admin should not be able to deposit using depositVestedMultiple() with the duration as zero for any user.", async () => {
+		let value = randomValue();
+		await expectRevert(
+			lockedFund.depositVestedMultiple(
+				[userTwo, userThree],
+				[value, value],
+				[cliff, cliff],
+				[duration, zero],
+				[zeroBasisPoint, zeroBasisPoint],
+				unlockTypeWaited,
+				{ from: admin }
+			),
+			"LockedFund: Duration cannot be zero."
+		);
+	});
+
+	it("Admin should not be able to deposit using depositVestedMultiple() without approving the total amount.", async () => {
+		let value = randomValue();
+		token.mint(admin, value * 2, { from: creator });
+		await token.approve(lockedFund.address, value, { from: admin });
+		await expectRevert.unspecified(
+			lockedFund.depositVestedMultiple(
+				[userTwo, userThree],
+				[value, value],
+				[cliff, cliff],
+				[duration, duration],
+				[zeroBasisPoint, zeroBasisPoint],
+				unlockTypeWaited,
+				{ from: admin }
+			)
+		);
+	});
+
 	it("Admin should not be able to deposit using depositWaitedUnlocked() with invalid basis point.", async () => {
 		let value = randomValue();
 		token.mint(admin, value, { from: creator });
@@ -106,4 +106,16 @@ contract("LockedFund (Creator Functions)", (accounts) => {
 			"LockedFund: Only admin can call this."
 		);
 	});
+
+	it("Creator should not be able to deposit using depositVestedMultiple().", async () => {
+		let value = randomValue();
+		token.mint(creator, value, { from: creator });
+		token.approve(lockedFund.address, value, { from: creator });
+		await expectRevert(
+			lockedFund.depositVestedMultiple([userOne], [value], [cliff], [duration], [zeroBasisPoint], unlockTypeWaited, {
+				from: creator,
+			}),
+			"LockedFund: Only admin can call this."
+		);
+	});
 });
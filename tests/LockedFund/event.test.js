@@ -101,6 +101,50 @@ contract("LockedFund (Events)", (accounts) => {
 		});
 	});
 
+	it("Depositing using depositVested() should transfer the tokens before emitting VestedDeposited.", async () => {
+		let value = randomValue();
+		await token.mint(admin, value, { from: creator });
+		await token.approve(lockedFund.address, value, { from: admin });
+		let txReceipt = await lockedFund.depositVested(userOne, value, cliff, duration, zeroBasisPoint, unlockTypeWaited, { from: admin });
+		let topics = txReceipt.receipt.rawLogs.map((log) => log.topics[0]);
+		let transferIndex = topics.indexOf(web3.utils.sha3("Transfer(address,address,uint256)"));
+		let depositIndex = topics.indexOf(web3.utils.sha3("VestedDeposited(address,address,uint256,uint256,uint256,uint256)"));
+		assert.notEqual(transferIndex, -1, "Transfer was not emitted.");
+		assert.notEqual(depositIndex, -1, "VestedDeposited was not emitted.");
+		assert.isBelow(transferIndex, depositIndex, "Transfer should be emitted before VestedDeposited.");
+	});
+
+	it("Depositing using depositVestedMultiple() should emit VestedDeposited for every user.", async () => {
+		let values = [randomValue(), randomValue()];
+		token.mint(admin, values[0] + values[1], { from: creator });
+		token.approve(lockedFund.address, values[0] + values[1], { from: admin });
+		let txReceipt = await lockedFund.depositVestedMultiple(
+			[userTwo, userThree],
+			values,
+			[cliff, cliff],
+			[duration, duration],
+			[zeroBasisPoint, fiftyBasisPoint],
+			unlockTypeWaited,
+			{ from: admin }
+		);
+		expectEvent(txReceipt, "VestedDeposited", {
+			_initiator: admin,
+			_userAddress: userTwo,
+			_amount: new BN(values[0]),
+			_cliff: new BN(cliff),
+			_duration: new BN(duration),
+			_basisPoint: new BN(zeroBasisPoint),
+		});
+		expectEvent(txReceipt, "VestedDeposited", {
+			_initiator: admin,
+			_userAddress: userThree,
+			_amount: new BN(values[1]),
+			_cliff: new BN(cliff),
+			_duration: new BN(duration),
+			_basisPoint: new BN(fiftyBasisPoint),
+		});
+	});
+
 	it("Withdrawing waited unlocked balance using withdrawWaitedUnlockedBalance() should emit WithdrawnWaitedUnlockedBalance.", async () => {
 		let value = randomValue();
 		token.mint(admin, value, { from: creator });
@@ -0,0 +1,118 @@
+const {
+	// External Functions
+	expectRevert,
+	assert,
+	// Custom Functions
+	randomValue,
+	createStakeAndVest,
+	// Contract Artifacts
+	Token,
+} = require("../utils");
+
+const { zero } = require("../constants");
+
+const twoWeeks = 2 * 7 * 24 * 60 * 60;
+
+/**
+ * Function to turn the dates and stakes returned by a stake getter into comparable numbers.
+ *
+ * @param result The result of the getter.
+ *
+ * @return [dates, stakes] The dates and stakes as numbers.
+ */
+function toNumbers(result) {
+	return [result.dates.map((date) => date.toNumber()), result.stakes.map((stake) => stake.toNumber())];
+}
+
+contract("Staking (State)", (accounts) => {
+	let token, staking, kickoffTS;
+	let creator, userOne, userTwo;
+	let stakedDates = [4, 5, 9, 30].map((period) => period * twoWeeks);
+
+	before("Initiating Accounts & Creating Test Token Instance.", async () => {
+		// Checking if we have enough accounts to test.
+		assert.isAtLeast(accounts.length, 3, "Alteast 3 accounts are required to test the contracts.");
+		[creator, userOne, userTwo] = accounts;
+
+		// Creating the instance of Test Token.
+		token = await Token.new(zero, "Test Token", "TST", 18, { from: creator });
+
+		// Creating the Staking and Vesting
+		[staking] = await createStakeAndVest(creator, token);
+		kickoffTS = (await staking.kickoffTS()).toNumber();
+		stakedDates = stakedDates.map((period) => kickoffTS + period);
+
+		// Staking for userOne on a few lock dates.
+		await token.mint(creator, 1000000);
+		await token.approve(staking.address, 1000000, { from: creator });
+		for (let i = 0; i < stakedDates.length; i++) {
+			await staking.stake(randomValue(), stakedDates[i], userOne, userOne, { from: creator });
+		}
+	});
+
+	it("Stakes in range should include every lock date of the range, empty ones as zero.", async () => {
+		let from = stakedDates[0] - twoWeeks;
+		let to = stakedDates[2];
+		let [dates, stakes] = toNumbers(await staking.getStakesInRange(userOne, from, to));
+		let [allDates, allStakes] = toNumbers(await staking.getStakes(userOne));
+
+		assert.equal(dates.length, (to - from) / twoWeeks + 1, "The number of lock dates does not match.");
+		for (let i = 0; i < dates.length; i++) {
+			assert.equal(dates[i], from + i * twoWeeks, "The lock date does not match.");
+			let index = allDates.indexOf(dates[i]);
+			assert.equal(stakes[i], index == -1 ? 0 : allStakes[index], "The stake does not match.");
+		}
+	});
+
+	it("Stakes in range should round the start up to the next lock date.", async () => {
+		let result = await staking.getStakesInRange(userOne, stakedDates[0] - twoWeeks + 1, stakedDates[0]);
+		let [dates] = toNumbers(result);
+		assert.deepEqual(dates, [stakedDates[0]], "The lock dates do not match.");
+	});
+
+	it("Stakes in range should be empty for a range before the first lock date.", async () => {
+		let [dates, stakes] = toNumbers(await staking.getStakesInRange(userOne, 0, kickoffTS));
+		assert.equal(dates.length, 0, "The lock dates should be empty.");
+		assert.equal(stakes.length, 0, "The stakes should be empty.");
+	});
+
+	it("Non empty stakes should add up to getStakes when paged through.", async () => {
+		let [allDates, allStakes] = toNumbers(await staking.getStakes(userOne));
+		let dates = [];
+		let stakes = [];
+		let next = 0;
+		let pages = 0;
+		do {
+			let result = await staking.getNonEmptyStakes(userOne, next, 3);
+			let [pageDates, pageStakes] = toNumbers(result);
+			assert.isAtMost(pageDates.length, 3, "A page should have at most maxDates stakes.");
+			dates = dates.concat(pageDates);
+			stakes = stakes.concat(pageStakes);
+			next = result.next.toNumber();
+			pages++;
+		} while (next != 0);
+
+		assert.isAbove(pages, 1, "The stakes should take more than one page.");
+		assert.deepEqual(dates, allDates, "The lock dates do not match.");
+		assert.deepEqual(stakes, allStakes, "The stakes do not match.");
+	});
+
+	it("Non empty stakes should continue after the lock dates read.", async () => {
+		let result = await staking.getNonEmptyStakes(userOne, stakedDates[0], 2);
+		let [dates] = toNumbers(result);
+		assert.deepEqual(dates, [stakedDates[0], stakedDates[1]], "The lock dates do not match.");
+		assert.equal(result.next.toNumber(), stakedDates[0] + 2 * twoWeeks, "The next lock date does not match.");
+	});
+
+	it("Non empty stakes should be empty for an account without stakes.", async () => {
+		let result = await staking.getNonEmptyStakes(userTwo, 0, 1000);
+		let [dates, stakes] = toNumbers(result);
+		assert.equal(dates.length, 0, "The lock dates should be empty.");
+		assert.equal(stakes.length, 0, "The stakes should be empty.");
+		assert.equal(result.next.toNumber(), 0, "There should be no next lock date.");
+	});
+
+	it("Non empty stakes should not be read with zero maxDates.", async () => {
+		await expectRevert(staking.getNonEmptyStakes(userOne, 0, 0), "Staking::getNonEmptyStakes: maxDates should be positive");
+	});
+});
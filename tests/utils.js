@@ -271,6 +271,7 @@ const VestingFactory = artifacts.require("VestingFactory");
 const VestingRegistry = artifacts.require("VestingRegistry3");
 const OriginsAdmin = artifacts.require("OriginsAdmin");
 const OriginsBase = artifacts.require("OriginsBase");
+const BatchExecutor = artifacts.require("BatchExecutor");
 
 module.exports = {
 	// External Functions
@@ -301,4 +302,5 @@ module.exports = {
 	VestingRegistry,
 	OriginsAdmin,
 	OriginsBase,
+	BatchExecutor,
 };